@@ -1,3 +1,91 @@
-from django.contrib import admin
+from django.conf import settings
+from django.contrib import admin, messages
+from django.contrib.admin.utils import model_ngettext
+from django.contrib.auth import forms as auth_forms
+from django.contrib.auth.admin import UserAdmin as BaseUserAdmin
+from django.db import transaction
 
-# Register your models here.
+from accounts.models import User
+from core.admin import EstimatedCountPaginator, batched_pks
+from qna.admin import moderator_deleted
+from qna.models import Answer, Event, Question
+
+
+class UserChangeForm(auth_forms.UserChangeForm):
+    class Meta(auth_forms.UserChangeForm.Meta):
+        model = User
+
+
+class UserCreationForm(auth_forms.AdminUserCreationForm):
+    class Meta(auth_forms.AdminUserCreationForm.Meta):
+        model = User
+        fields = ("email", "username")
+
+
+@admin.register(User)
+class UserAdmin(BaseUserAdmin):
+    form = UserChangeForm
+    add_form = UserCreationForm
+    add_fieldsets = (
+        (
+            None,
+            {
+                "classes": ("wide",),
+                "fields": (
+                    "email",
+                    "username",
+                    "usable_password",
+                    "password1",
+                    "password2",
+                ),
+            },
+        ),
+    )
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+    list_per_page = 50
+    list_display = ["email", "username", "is_active", "is_staff", "date_joined"]
+    list_filter = ["is_active", "is_staff"]
+    readonly_fields = ["date_joined", "last_login"]
+    # Exact lookups use the unique indexes on these columns
+    search_fields = ["email__exact", "username__exact"]
+    ordering = ["-pk"]
+    actions = ["ban_selected"]
+
+    def get_actions(self, request):
+        actions = super().get_actions(request)
+        actions.pop("delete_selected", None)
+        return actions
+
+    @admin.action(description="Ban selected users and soft delete their content")
+    def ban_selected(self, request, queryset):
+        """
+        Deactivates the users, which ends their sessions, and soft deletes
+        their questions, with the answers to them, and their answers like
+        moderators deleting them from the content admin do
+        """
+        users = queryset.filter(is_superuser=False).exclude(pk=request.user.pk)
+        count = 0
+        for pks in batched_pks(users, settings.ADMIN_ACTION_BATCH_SIZE):
+            with transaction.atomic():
+                User.objects.filter(pk__in=pks).update(is_active=False)
+                question_pks = list(
+                    Question.objects.filter(author__in=pks).values_list("pk", flat=True)
+                )
+                answer_pks = list(
+                    Answer.objects.filter(author__in=pks).values_list("pk", flat=True)
+                )
+                Question.bulk_delete({"pk__in": question_pks})
+                Answer.bulk_delete({"pk__in": answer_pks})
+                moderator_deleted(
+                    Question, question_pks, request.user, Event.QUESTION_DELETED
+                )
+                moderator_deleted(
+                    Answer, answer_pks, request.user, Event.ANSWER_DELETED
+                )
+            count += len(pks)
+        self.message_user(
+            request,
+            f"Banned {count} {model_ngettext(self.opts, count)}.",
+            messages.SUCCESS,
+        )
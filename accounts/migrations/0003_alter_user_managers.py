@@ -0,0 +1,21 @@
+# Generated by Django 5.2.18 on 2026-10-19 15:37
+
+from django.db import migrations
+
+import accounts.models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("accounts", "0002_user_follower_count"),
+    ]
+
+    operations = [
+        migrations.AlterModelManagers(
+            name="user",
+            managers=[
+                ("objects", accounts.models.UserManager()),
+            ],
+        ),
+    ]
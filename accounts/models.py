@@ -1,7 +1,17 @@
 from django.db import models
 from django.contrib.auth.models import AbstractUser
+from django.contrib.auth.models import UserManager as BaseUserManager
 from django.utils.translation import gettext_lazy as _
 
+from core.objects import ObjectCacheMixin
+
+
+class UserManager(ObjectCacheMixin, BaseUserManager):
+    """
+    User manager caching the users looked up by primary key, which covers
+    loading the user of each request from its session
+    """
+
 
 class User(AbstractUser):
     email = models.EmailField(_("email address"), unique=True)
@@ -10,6 +20,12 @@ class User(AbstractUser):
     last_name = models.CharField(_("last name"), max_length=150, blank=True)
     is_active = models.BooleanField(_("active"), default=True)
     date_joined = models.DateTimeField(_("date joined"), auto_now_add=True)
+    # Number of `qna.UserFollow` rows following the user, updated along with
+    # them. The questions of users above `FEED_FANOUT_LIMIT` followers are
+    # pulled when the feeds are read instead of copied to every inbox.
+    follower_count = models.PositiveIntegerField(default=0, editable=False)
+
+    objects = UserManager()
 
     USERNAME_FIELD = "email"
     REQUIRED_FIELDS = ["username"]
@@ -0,0 +1,112 @@
+from unittest import mock
+
+from django.urls import reverse
+
+from accounts.models import User
+from core.base_test import BaseTestCase
+from qna.events import event_buffer
+from qna.models import Answer, Event, Question
+
+
+class UserAdminTestCase(BaseTestCase):
+    def setUp(self):
+        super().setUp()
+        self.admin = self.create_user()
+        self.admin.is_staff = self.admin.is_superuser = True
+        self.admin.save()
+        self.authenticate(self.admin)
+        self.spammer = self.create_user()
+        event_buffer.events.clear()
+        self.addCleanup(event_buffer.events.clear)
+
+    def test_changelist(self):
+        """
+        To make sure that the user changelist is available
+        """
+        response = self.make_get_request(reverse("admin:accounts_user_changelist"))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.context["cl"].result_count, 2)
+        response = self.make_get_request(
+            reverse("admin:accounts_user_change", args=[self.spammer.pk])
+        )
+        self.assertEqual(response.status_code, 200)
+
+    def test_add_user(self):
+        """
+        To make sure that users can be created from the admin
+        """
+        response = self.make_post_request(
+            reverse("admin:accounts_user_add"),
+            {
+                "email": "moderator@example.com",
+                "username": "moderator",
+                "usable_password": "true",
+                "password1": "a-Strong-passw0rd",
+                "password2": "a-Strong-passw0rd",
+            },
+        )
+        self.assertEqual(response.status_code, 302)
+        self.assertTrue(User.objects.filter(email="moderator@example.com").exists())
+
+    def test_ban(self):
+        """
+        To make sure that banning deactivates the users and soft deletes
+        their content, but never bans the moderator
+        """
+        question = Question.objects.create(
+            title=self.faker.sentence(),
+            content=self.faker.paragraph(),
+            author=self.admin,
+        )
+        Answer.objects.create(
+            content=self.faker.paragraph(), author=self.spammer, question=question
+        )
+        self.make_post_request(
+            reverse("admin:accounts_user_changelist"),
+            {
+                "action": "ban_selected",
+                "_selected_action": [self.spammer.pk, self.admin.pk],
+            },
+        )
+        self.assertFalse(User.objects.get(pk=self.spammer.pk).is_active)
+        self.assertTrue(User.objects.get(pk=self.admin.pk).is_active)
+        self.assertFalse(Answer.objects.exists())
+        self.assertTrue(Question.objects.exists())
+
+    def test_ban_follow_up(self):
+        """
+        To make sure that the content of banned users is learned as spam,
+        logged and dropped from the snapshots like deleted by moderators
+        """
+        question = Question.objects.create(
+            title=self.faker.sentence(),
+            content=self.faker.paragraph(),
+            author=self.spammer,
+        )
+        answer = Answer.objects.create(
+            content=self.faker.paragraph(), author=self.spammer, question=question
+        )
+        with (
+            mock.patch("qna.admin.learn_posts") as learn_posts,
+            mock.patch("qna.admin.invalidate_posts") as invalidate_posts,
+            self.captureOnCommitCallbacks(execute=True),
+        ):
+            self.make_post_request(
+                reverse("admin:accounts_user_changelist"),
+                {"action": "ban_selected", "_selected_action": [self.spammer.pk]},
+            )
+        self.assertEqual(
+            [list(call.args[0]) for call in learn_posts.call_args_list],
+            [[question], [answer]],
+        )
+        self.assertTrue(all(call.kwargs["spam"] for call in learn_posts.call_args_list))
+        invalidate_posts.assert_has_calls(
+            [mock.call(Question, [question.pk]), mock.call(Answer, [answer.pk])]
+        )
+        self.assertEqual(
+            [(event.kind, event.object_id) for event in event_buffer.events],
+            [
+                (Event.QUESTION_DELETED, question.pk),
+                (Event.ANSWER_DELETED, answer.pk),
+            ],
+        )
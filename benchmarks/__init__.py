@@ -0,0 +1,6 @@
+"""
+Benchmarks for the QnA site. Each module runs on its own against a
+throwaway test database, never the configured one, e.g.
+
+    python -m benchmarks.soft_delete
+"""
@@ -0,0 +1,113 @@
+"""
+Fan-out and reads of the activity feeds of qna/activity.py.
+
+A reader follows many ordinary authors and a few popular ones. The
+benchmark measures copying a question to the inboxes of the followers of
+an ordinary author, reading pages of the feed, and prints the query plan
+of the inbox read.
+
+    python -m benchmarks.activity [--followers 5000] [--authors 200]
+                                  [--questions 20000] [--repeat 5]
+"""
+
+import argparse
+import random
+
+from benchmarks.utils import measure, report, setup, test_database
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--followers", type=int, default=5000)
+    parser.add_argument("--authors", type=int, default=200)
+    parser.add_argument("--questions", type=int, default=20000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    setup()
+
+    from django.conf import settings
+    from django.db import connection
+
+    from accounts.models import User
+    from qna.activity import fan_out_questions, feed
+    from qna.models import FeedItem, Question, UserFollow
+
+    with test_database():
+        users = User.objects.bulk_create(
+            User(username=f"user{index}", email=f"user{index}@example.com")
+            for index in range(args.followers + args.authors)
+        )
+        reader, followers = users[0], users[: args.followers]
+        authors = users[args.followers :]
+        popular = authors[:3]
+
+        UserFollow.objects.bulk_create(
+            UserFollow(follower=reader, followee=author) for author in authors
+        )
+        # The author measured below has all the users as followers, their
+        # count is left at zero so the question is always copied
+        UserFollow.objects.bulk_create(
+            UserFollow(follower=follower, followee=authors[-1])
+            for follower in followers[1:]
+        )
+        for author in popular:
+            author.follower_count = settings.FEED_FANOUT_LIMIT + 1
+            author.save(update_fields=["follower_count"])
+
+        random.seed(0)
+        questions = Question.objects.bulk_create(
+            Question(
+                title=f"Question {index}",
+                content="Content",
+                author=random.choice(authors),
+            )
+            for index in range(args.questions)
+        )
+        FeedItem.objects.bulk_create(
+            (
+                FeedItem(
+                    user=reader,
+                    kind=FeedItem.NEW_QUESTION,
+                    question=question,
+                    created_at=question.created_at,
+                )
+                for question in questions
+                if question.author not in popular
+            ),
+            batch_size=1000,
+        )
+        print(
+            f"{args.followers} followers, {args.authors} authors followed by "
+            f"the reader, {len(popular)} of them popular"
+        )
+
+        question = Question.objects.create(
+            title="Fan-out", content="Content", author=authors[-1]
+        )
+        report(
+            f"fan-out to {args.followers - 1} inboxes",
+            measure(
+                lambda: fan_out_questions([question.pk]),
+                args.repeat,
+                setup=lambda: FeedItem.objects.filter(question=question).delete(),
+            ),
+        )
+
+        report("first page of the feed", measure(lambda: feed(reader), args.repeat))
+        before = feed(reader, limit=200)[-1].created_at
+        report(
+            "page after 200 entries",
+            measure(lambda: feed(reader, before=before), args.repeat),
+        )
+
+        items = FeedItem.objects.filter(user=reader).select_related(
+            "question__author", "answer__author"
+        )[: settings.FEED_PAGE_SIZE]
+        print("inbox read plan")
+        print(items.explain())
+        connection.close()
+
+
+if __name__ == "__main__":
+    main()
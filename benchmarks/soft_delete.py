@@ -0,0 +1,68 @@
+"""
+Soft delete and restore of a question with thousands of answers, compared
+with deleting the answers one by one.
+
+    python -m benchmarks.soft_delete [--answers 5000] [--repeat 5]
+"""
+
+import argparse
+
+from benchmarks.utils import measure, report, setup, test_database
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--answers", type=int, default=5000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    setup()
+
+    from django.db import connection, transaction
+    from django.test.utils import CaptureQueriesContext
+
+    from accounts.models import User
+    from qna.models import Answer, Question
+
+    with test_database():
+        author = User.objects.create(username="author", email="author@example.com")
+        question = Question.objects.create(
+            title="Benchmark question", content="Content", author=author
+        )
+        Answer.objects.bulk_create(
+            Answer(content=f"Answer {index}", author=author, question=question)
+            for index in range(args.answers)
+        )
+
+        def reset():
+            Answer.objects.trashed().update(deleted_at=None)
+            Question.objects.trashed().update(deleted_at=None)
+
+        def per_answer_delete():
+            with transaction.atomic():
+                for answer in Answer.objects.filter(question=question):
+                    answer.delete()
+                question.delete()
+
+        print(f"Question with {args.answers} answers")
+        with CaptureQueriesContext(connection) as queries:
+            question.delete()
+        print(f"Cascading delete ran {len(queries)} queries")
+        question.restore()
+
+        report(
+            "cascading soft delete",
+            measure(question.delete, args.repeat, setup=reset),
+        )
+        report(
+            "cascading restore",
+            measure(question.restore, args.repeat, setup=question.delete),
+        )
+        report(
+            "per answer soft delete",
+            measure(per_answer_delete, args.repeat, setup=reset),
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,109 @@
+"""
+Training and classification throughput of the spam filter of qna/spam.py
+on a synthetic corpus, along with its accuracy on held out posts and the
+latency of the checks made on the posting path through the thread pool.
+
+    python -m benchmarks.spam [--posts 50000] [--spam-ratio 0.2] [--repeat 3]
+"""
+
+import argparse
+import random
+import statistics
+import time
+
+from benchmarks.utils import measure, report, setup
+
+# None of them is in the vocabulary of the Faker sentences
+SPAM_WORDS = """
+    cheap discount bonus casino click viagra pills loan crypto guaranteed
+    winner prize unsubscribe jackpot lottery rolex pharmacy payday
+    """.split()
+
+
+def make_corpus(faker, count, spam_ratio):
+    """
+    Returns (text, is_spam) pairs, spam posts mixing ordinary sentences
+    with spam vocabulary
+    """
+    corpus = []
+    for _ in range(count):
+        text = faker.paragraph(nb_sentences=5)
+        is_spam = random.random() < spam_ratio
+        if is_spam:
+            words = text.split()
+            for _ in range(len(words) // 4):
+                words.insert(random.randrange(len(words)), random.choice(SPAM_WORDS))
+            text = " ".join(words)
+        corpus.append((text, is_spam))
+    return corpus
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--posts", type=int, default=50000)
+    parser.add_argument("--spam-ratio", type=float, default=0.2)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    setup()
+
+    from django.conf import settings
+    from faker import Faker
+
+    from qna.spam import SpamModel, feature_counts, is_spam, spam_filter
+
+    random.seed(0)
+    faker = Faker()
+    Faker.seed(0)
+    corpus = make_corpus(faker, args.posts, args.spam_ratio)
+    split = int(len(corpus) * 0.8)
+    training, held_out = corpus[:split], corpus[split:]
+    print(f"{len(training)} training posts, {len(held_out)} held out posts")
+
+    counts = {}
+
+    def train():
+        counts["spam"] = feature_counts(text for text, spam in training if spam)
+        counts["ham"] = feature_counts(text for text, spam in training if not spam)
+
+    report("feature counts of the training posts", measure(train, args.repeat))
+
+    def rows():
+        buckets = counts["spam"].keys() | counts["ham"].keys()
+        return [(b, counts["spam"][b], counts["ham"][b]) for b in buckets]
+
+    model = SpamModel(rows())
+    report("model build", measure(lambda: SpamModel(rows()), args.repeat))
+
+    texts = [text for text, _ in held_out]
+    durations = measure(
+        lambda: [model.probability(text) for text in texts], args.repeat
+    )
+    report(f"classification of {len(texts)} posts", durations)
+    print(f"{len(texts) / statistics.median(durations):,.0f} posts per second")
+
+    predictions = [model.probability(text) >= settings.SPAM_THRESHOLD for text in texts]
+    actual = [spam for _, spam in held_out]
+    true_positives = sum(p and a for p, a in zip(predictions, actual))
+    false_positives = sum(p and not a for p, a in zip(predictions, actual))
+    print(
+        f"recall {true_positives / max(sum(actual), 1):.3f}  "
+        f"false positive rate "
+        f"{false_positives / max(len(actual) - sum(actual), 1):.4f}"
+    )
+
+    # Checks as made by the views, through the thread pool and its timeout
+    spam_filter.model = model
+    spam_filter.checked_at = time.monotonic() + 10**9
+    latencies = []
+    for text in texts[:2000]:
+        started_at = time.perf_counter()
+        is_spam(text)
+        latencies.append(time.perf_counter() - started_at)
+    report("is_spam through the thread pool", latencies, unit="us")
+    latencies.sort()
+    print(f"p99 {latencies[int(len(latencies) * 0.99)] * 1000000:.0f}us")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,179 @@
+"""
+Concurrent reads and writes on SQLite with the default settings of
+Django compared with the mode of core/sqlite.
+
+For each mode a fresh database file is migrated and seeded, then several
+worker processes, each running several threads, read questions and post
+answers in transactions for a fixed time. The report gives the
+throughput, the latency of reads and writes, and the number of requests
+that failed with "database is locked".
+
+    python -m benchmarks.sqlite [--workers 4] [--threads 4] [--seconds 10]
+                                [--write-ratio 0.2]
+"""
+
+import argparse
+import json
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+SEED_QUESTIONS = 1000
+
+
+def percentile(values, ratio):
+    if not values:
+        return 0
+    values = sorted(values)
+    return values[min(int(len(values) * ratio), len(values) - 1)]
+
+
+def seed():
+    """
+    Runs in a child process, migrates and fills the database
+    """
+    from django.core.management import call_command
+
+    call_command("migrate", verbosity=0)
+
+    from accounts.models import User
+    from qna.models import Question
+
+    author = User.objects.create(username="author", email="author@example.com")
+    Question.objects.bulk_create(
+        Question(title=f"Question {index}", content="Content", author=author)
+        for index in range(SEED_QUESTIONS)
+    )
+
+
+def run_worker(threads, seconds, write_ratio, start_at):
+    """
+    Runs in a child process and prints the results of its threads as JSON
+    """
+    from django.db import OperationalError, connection, transaction
+
+    from accounts.models import User
+    from qna.models import Answer, Question
+
+    author = User.objects.get(username="author")
+    pks = list(Question.objects.values_list("pk", flat=True))
+    connection.close()
+    results = {"reads": [], "writes": [], "errors": 0}
+    lock = threading.Lock()
+
+    # Querysets bypass the object cache of core/objects.py
+    def read():
+        question = Question.objects.filter(pk=random.choice(pks)).get()
+        list(question.answers.all()[:10])
+
+    def write():
+        with transaction.atomic():
+            question = Question.objects.filter(pk=random.choice(pks)).get()
+            Answer.objects.create(content="Answer", author=author, question=question)
+
+    def loop():
+        reads, writes, errors = [], [], 0
+        end_at = start_at + seconds
+        while time.time() < end_at:
+            is_write = random.random() < write_ratio
+            started_at = time.perf_counter()
+            try:
+                write() if is_write else read()
+            except OperationalError:
+                errors += 1
+                continue
+            (writes if is_write else reads).append(time.perf_counter() - started_at)
+        connection.close()
+        with lock:
+            results["reads"] += reads
+            results["writes"] += writes
+            results["errors"] += errors
+
+    time.sleep(max(start_at - time.time(), 0))
+    workers = [threading.Thread(target=loop) for _ in range(threads)]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    print(json.dumps(results))
+
+
+def measure(tuned, path, args):
+    environment = {
+        **os.environ,
+        "DJANGO_SETTINGS_MODULE": "qnasite.settings",
+        "ENV_NAME": "local",
+        "SQLITE_PATH": path,
+        "SQLITE_TUNED": "1" if tuned else "0",
+    }
+    command = [sys.executable, "-m", "benchmarks.sqlite"]
+    subprocess.run([*command, "--seed"], env=environment, check=True)
+
+    start_at = time.time() + 2
+    child = [
+        *command,
+        "--child",
+        json.dumps([args.threads, args.seconds, args.write_ratio, start_at]),
+    ]
+    processes = [
+        subprocess.Popen(child, env=environment, stdout=subprocess.PIPE, text=True)
+        for _ in range(args.workers)
+    ]
+    results = {"reads": [], "writes": [], "errors": 0}
+    for process in processes:
+        output = json.loads(process.communicate()[0].strip().splitlines()[-1])
+        results["reads"] += output["reads"]
+        results["writes"] += output["writes"]
+        results["errors"] += output["errors"]
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--threads", type=int, default=4)
+    parser.add_argument("--seconds", type=float, default=10)
+    parser.add_argument("--write-ratio", type=float, default=0.2)
+    parser.add_argument("--seed", action="store_true", help=argparse.SUPPRESS)
+    parser.add_argument("--child", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.seed or args.child:
+        from benchmarks.utils import setup
+
+        setup()
+        if args.seed:
+            seed()
+        else:
+            run_worker(*json.loads(args.child))
+        return
+
+    print(
+        f"{args.workers} workers of {args.threads} threads for {args.seconds}s, "
+        f"{args.write_ratio:.0%} writes"
+    )
+    with tempfile.TemporaryDirectory() as directory:
+        for tuned in (False, True):
+            path = os.path.join(directory, f"{'tuned' if tuned else 'default'}.db")
+            results = measure(tuned, path, args)
+            reads, writes = results["reads"], results["writes"]
+            throughput = (len(reads) + len(writes)) / args.seconds
+            print(f"{'core.sqlite' if tuned else 'Django defaults'}")
+            print(f"  requests per second   {throughput:9.0f}")
+            print(
+                f"  reads                 p50 {percentile(reads, 0.5) * 1000:7.2f}ms"
+                f"  p99 {percentile(reads, 0.99) * 1000:7.2f}ms"
+            )
+            print(
+                f"  writes                p50 {percentile(writes, 0.5) * 1000:7.2f}ms"
+                f"  p99 {percentile(writes, 0.99) * 1000:7.2f}ms"
+            )
+            print(f"  database is locked    {results['errors']:9d}")
+
+
+if __name__ == "__main__":
+    main()
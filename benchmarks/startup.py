@@ -0,0 +1,139 @@
+"""
+Worker startup with and without the warmup of qnasite/warmup.py.
+
+For each mode a fresh interpreter imports the ASGI application, serves a
+first and a second request, then forks workers the way `gunicorn
+--preload` does and reports their private memory after a garbage
+collection, which is what copies the shared pages when the objects are
+not frozen.
+
+    python -m benchmarks.startup [--workers 4] [--runs 3]
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+
+
+def private_memory_kb():
+    """
+    Returns the memory of the process not shared with any other process
+    """
+    private = 0
+    with open("/proc/self/smaps_rollup") as file:
+        for line in file:
+            if line.startswith(("Private_Clean:", "Private_Dirty:")):
+                private += int(line.split()[1])
+    return private
+
+
+def rss_kb():
+    with open("/proc/self/status") as file:
+        for line in file:
+            if line.startswith("VmRSS:"):
+                return int(line.split()[1])
+    return 0
+
+
+def run_child(workers):
+    """
+    Runs in the measured interpreter and prints the results as JSON
+    """
+    started_at = time.perf_counter()
+    from qnasite.asgi import application  # noqa: F401
+
+    startup = time.perf_counter() - started_at
+
+    from django.test import Client
+
+    client = Client()
+    timings = []
+    for _ in range(2):
+        request_started_at = time.perf_counter()
+        client.get("/accounts/login")
+        timings.append(time.perf_counter() - request_started_at)
+
+    pipes = []
+    for _ in range(workers):
+        read_end, write_end = os.pipe()
+        pid = os.fork()
+        if pid == 0:
+            os.close(read_end)
+            import gc
+
+            gc.collect()
+            client.get("/accounts/login")
+            os.write(write_end, json.dumps([rss_kb(), private_memory_kb()]).encode())
+            os._exit(0)
+        os.close(write_end)
+        pipes.append((pid, read_end))
+
+    memory = []
+    for pid, read_end in pipes:
+        with os.fdopen(read_end) as file:
+            memory.append(json.loads(file.read()))
+        os.waitpid(pid, 0)
+
+    print(
+        json.dumps(
+            {
+                "startup": startup,
+                "first_request": timings[0],
+                "second_request": timings[1],
+                "worker_rss_kb": [rss for rss, _ in memory],
+                "worker_private_kb": [private for _, private in memory],
+            }
+        )
+    )
+
+
+def measure(warmup, workers):
+    environment = {
+        **os.environ,
+        "DJANGO_SETTINGS_MODULE": "qnasite.settings",
+        "STARTUP_WARMUP": "1" if warmup else "0",
+    }
+    output = subprocess.run(
+        [sys.executable, "-m", "benchmarks.startup", "--child", str(workers)],
+        env=environment,
+        capture_output=True,
+        check=True,
+        text=True,
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--child", type=int, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child is not None:
+        run_child(args.child)
+        return
+
+    for warmup in (False, True):
+        results = [measure(warmup, args.workers) for _ in range(args.runs)]
+        best = min(results, key=lambda result: result["startup"])
+        average = lambda values: sum(values) / len(values)  # noqa: E731
+        print(f"Warmup {'enabled' if warmup else 'disabled'}")
+        print(f"  startup               {best['startup'] * 1000:9.1f}ms")
+        print(
+            "  first request         "
+            f"{min(r['first_request'] for r in results) * 1000:9.1f}ms"
+        )
+        print(
+            "  second request        "
+            f"{min(r['second_request'] for r in results) * 1000:9.1f}ms"
+        )
+        print(f"  worker RSS            {average(best['worker_rss_kb']):9.0f}kB")
+        print(f"  worker private memory {average(best['worker_private_kb']):9.0f}kB")
+
+
+if __name__ == "__main__":
+    main()
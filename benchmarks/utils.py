@@ -0,0 +1,59 @@
+import os
+import statistics
+import time
+from contextlib import contextmanager
+
+import django
+
+
+def setup():
+    """
+    Configures Django so the benchmarks can import models
+    """
+    os.environ.setdefault("DJANGO_SETTINGS_MODULE", "qnasite.settings")
+    django.setup()
+
+
+@contextmanager
+def test_database():
+    """
+    Creates a test database for the duration of the block
+    """
+    from django.db import connection
+    from django.test.utils import setup_test_environment, teardown_test_environment
+
+    setup_test_environment()
+    old_name = connection.creation.create_test_db(verbosity=0, autoclobber=True)
+    try:
+        yield
+    finally:
+        connection.creation.destroy_test_db(old_name, verbosity=0)
+        teardown_test_environment()
+
+
+def measure(func, repeat=5, setup=None):
+    """
+    Runs `func` `repeat` times, calling `setup` before each run outside of
+    the measurement, and returns the durations in seconds
+    """
+    durations = []
+    for _ in range(repeat):
+        if setup:
+            setup()
+        started_at = time.perf_counter()
+        func()
+        durations.append(time.perf_counter() - started_at)
+    return durations
+
+
+def report(name, durations, unit="ms"):
+    """
+    Prints the summary of a list of durations in seconds
+    """
+    scale = {"s": 1, "ms": 1000, "us": 1000000}[unit]
+    print(
+        f"{name:<45} "
+        f"min {min(durations) * scale:9.2f}{unit}  "
+        f"median {statistics.median(durations) * scale:9.2f}{unit}  "
+        f"max {max(durations) * scale:9.2f}{unit}"
+    )
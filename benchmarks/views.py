@@ -0,0 +1,458 @@
+"""
+Query budgets and timings of every view of qna/urls.py and
+accounts/urls.py.
+
+Each URL name has a case, a request and the user sending it, run against
+a seeded site: questions with answers, votes, likes, follows, feeds, an
+attachment and statistics. Cases run in a transaction rolled back
+afterwards with the caches emptied, so they always see the same rows and
+their query count is that of a cold cache. The time spent rendering
+templates, and the queries they run, are measured apart from the rest of
+the view.
+
+    python -m benchmarks.views [--repeat 5] [--output results.json]
+                               [--baseline baseline.json] [--max-slowdown 0.5]
+
+The run fails when a view runs more queries than its budget in
+`QUERY_BUDGETS`, when a URL name has no case or no budget, and with a
+baseline, when the median time of a view grows by more than
+`--max-slowdown`. qna/tests/test_query_budgets.py checks the budgets with
+the test suite.
+"""
+
+import argparse
+import json
+import statistics
+import sys
+import tempfile
+import time
+from collections import namedtuple
+from contextlib import contextmanager
+
+from benchmarks.utils import setup, test_database
+
+# Most queries each view may run on a cold cache against the seeded site.
+# No view runs queries per row, the budgets hold whatever the dataset.
+QUERY_BUDGETS = {
+    "home": 2,
+    "create_question": 2,
+    "autocomplete_questions": 0,
+    "question_detail": 9,
+    "question_events": 1,
+    "update_question": 3,
+    "delete_question": 3,
+    "follow_question": 8,
+    "create_answer": 4,
+    "update_answer": 4,
+    "delete_answer": 4,
+    "like_answer": 6,
+    "vote_answer": 11,
+    "accept_answer": 12,
+    "follow_user": 11,
+    "activity_feed": 4,
+    "attachment": 1,
+    "attachment_thumbnail": 1,
+    "sitemap_index": 2,
+    "sitemap_chunk": 2,
+    "robots": 0,
+    "latest_feed": 4,
+    "statistics": 3,
+    "statistics_api": 3,
+    "register": 0,
+    "login": 0,
+    "logout": 4,
+}
+
+# `user` is the name of a seeded user, or None for an anonymous visitor
+Case = namedtuple("Case", ["method", "url", "user", "data"], defaults=[None])
+
+
+def url_names():
+    """
+    Returns the URL names of the views covered by the budgets
+    """
+    from accounts.urls import urlpatterns as accounts_patterns
+    from qna.urls import urlpatterns as qna_patterns
+
+    return [pattern.name for pattern in [*qna_patterns, *accounts_patterns]]
+
+
+@contextmanager
+def benchmark_settings():
+    """
+    Keeps the files written by the views in temporary directories and the
+    events buffered, so every run of a case is the same
+    """
+    from django.test import override_settings
+
+    with tempfile.TemporaryDirectory() as directory:
+        with override_settings(
+            MEDIA_ROOT=f"{directory}/media",
+            SNAPSHOT_DIR=f"{directory}/snapshots",
+            EVENTS_BATCH_SIZE=sys.maxsize,
+            EVENTS_FLUSH_INTERVAL=sys.maxsize,
+            TRAFFIC_CAPTURE_RATE=0,
+            PROFILER_SAMPLE_RATE=0,
+        ):
+            yield
+
+
+def seed(questions=20, answers=5):
+    """
+    Creates the rows of the site the cases run against, returns them by
+    name
+    """
+    from django.core.files.base import ContentFile
+    from django.utils import timezone
+
+    from accounts.models import User
+    from qna.models import (
+        Answer,
+        Attachment,
+        Event,
+        FeedItem,
+        Question,
+        QuestionFollow,
+        StatRollup,
+        StoredFile,
+        UserFollow,
+        Vote,
+    )
+    from qna.rollups import rollup
+
+    users = User.objects.bulk_create(
+        User(username=name, email=f"{name}@example.com", is_staff=name == "staff")
+        for name in ["author", "reader", "staff"]
+        + [f"user{index}" for index in range(answers)]
+    )
+    author, reader, staff, *answerers = users
+
+    created = Question.objects.bulk_create(
+        Question(
+            title=f"Question {index} about benchmarks",
+            content=f"Content of question {index}",
+            content_html=f"<p>Content of question {index}</p>",
+            excerpt=f"Content of question {index}",
+            author=author,
+        )
+        for index in range(questions)
+    )
+    question = created[-1]
+    replies = Answer.objects.bulk_create(
+        Answer(
+            question=item,
+            content=f"Answer {index}",
+            content_html=f"<p>Answer {index}</p>",
+            author=answerer,
+        )
+        for item in created
+        for index, answerer in enumerate(answerers)
+    )
+    answer = replies[-1]
+    Vote.objects.bulk_create(
+        Vote(answer=reply, user=voter, value=Vote.UP)
+        for reply in replies
+        for voter in (author, reader)
+    )
+    Answer.likes.through.objects.bulk_create(
+        Answer.likes.through(answer=reply, user=reader) for reply in replies
+    )
+    UserFollow.objects.create(follower=reader, followee=author)
+    QuestionFollow.objects.bulk_create(
+        QuestionFollow(user=reader, question=item) for item in created
+    )
+    FeedItem.objects.bulk_create(
+        FeedItem(
+            user=reader,
+            kind=FeedItem.NEW_QUESTION,
+            question=item,
+            created_at=item.created_at,
+        )
+        for item in created
+    )
+
+    content = b"\x89PNG\r\n\x1a\n benchmark image"
+    stored_file = StoredFile(
+        sha256="0" * 64, size=len(content), content_type="image/png"
+    )
+    stored_file.file.save("image.png", ContentFile(content), save=False)
+    stored_file.thumbnail.save("image.png", ContentFile(content), save=False)
+    stored_file.save()
+    Attachment.objects.create(
+        stored_file=stored_file, question=question, uploaded_by=author, name="a.png"
+    )
+
+    Event.objects.bulk_create(
+        Event(kind=Event.QUESTION_VIEWED, object_id=item.pk, created_at=timezone.now())
+        for item in created
+    )
+    for period in (StatRollup.HOUR, StatRollup.DAY):
+        rollup(period)
+
+    return {
+        "author": author,
+        "reader": reader,
+        "staff": staff,
+        "question": question,
+        "answer": answer,
+        "answerer": answer.author,
+        "stored_file": stored_file,
+    }
+
+
+def cases(data):
+    """
+    Returns the case of each URL name
+    """
+    from django.urls import reverse
+
+    question = data["question"].pk
+    answer = data["answer"].pk
+    sha256 = data["stored_file"].sha256
+    return {
+        "home": Case("get", reverse("home"), None),
+        "create_question": Case("get", reverse("create_question"), "reader"),
+        "autocomplete_questions": Case(
+            "get", reverse("autocomplete_questions"), None, {"q": "bench"}
+        ),
+        "question_detail": Case(
+            "get", reverse("question_detail", args=[question]), "reader"
+        ),
+        "question_events": Case(
+            "get", reverse("question_events", args=[question]), None
+        ),
+        "update_question": Case(
+            "get", reverse("update_question", args=[question]), "author"
+        ),
+        "delete_question": Case(
+            "get", reverse("delete_question", args=[question]), "author"
+        ),
+        "follow_question": Case(
+            "post", reverse("follow_question", args=[question]), "author"
+        ),
+        "create_answer": Case(
+            "post",
+            reverse("create_answer", args=[question]),
+            "reader",
+            {"content": "A new answer"},
+        ),
+        "update_answer": Case(
+            "get", reverse("update_answer", args=[answer]), "answerer"
+        ),
+        "delete_answer": Case(
+            "get", reverse("delete_answer", args=[answer]), "answerer"
+        ),
+        "like_answer": Case("post", reverse("like_answer", args=[answer]), "author"),
+        "vote_answer": Case(
+            "post", reverse("vote_answer", args=[answer]), "staff", {"value": "up"}
+        ),
+        "accept_answer": Case(
+            "post", reverse("accept_answer", args=[answer]), "author"
+        ),
+        "follow_user": Case(
+            "post", reverse("follow_user", args=[data["author"].pk]), "staff"
+        ),
+        "activity_feed": Case("get", reverse("activity_feed"), "reader"),
+        "attachment": Case("get", reverse("attachment", args=[sha256]), None),
+        "attachment_thumbnail": Case(
+            "get", reverse("attachment_thumbnail", args=[sha256]), None
+        ),
+        "sitemap_index": Case("get", reverse("sitemap_index"), None),
+        "sitemap_chunk": Case("get", reverse("sitemap_chunk", args=[0]), None),
+        "robots": Case("get", reverse("robots"), None),
+        "latest_feed": Case("get", reverse("latest_feed"), None),
+        "statistics": Case("get", reverse("statistics"), "staff"),
+        "statistics_api": Case("get", reverse("statistics_api"), "staff"),
+        "register": Case("get", reverse("register"), None),
+        "login": Case("get", reverse("login"), None),
+        "logout": Case("post", reverse("logout"), "reader"),
+    }
+
+
+class RenderTimer:
+    """
+    Measures the time spent rendering templates, and the queries they run,
+    while installed. Included and extended templates are counted once,
+    within the template rendering them.
+    """
+
+    def __init__(self, queries):
+        self.queries = queries
+        self.duration = 0.0
+        self.query_count = 0
+        self._depth = 0
+
+    @contextmanager
+    def installed(self):
+        from django.template.base import Template
+
+        original = Template._render
+        timer = self
+
+        def timed_render(template, context):
+            timer._depth += 1
+            started_at = time.perf_counter()
+            queries_before = len(timer.queries)
+            try:
+                return original(template, context)
+            finally:
+                timer._depth -= 1
+                if timer._depth == 0:
+                    timer.duration += time.perf_counter() - started_at
+                    timer.query_count += len(timer.queries) - queries_before
+
+        Template._render = timed_render
+        try:
+            yield self
+        finally:
+            Template._render = original
+
+
+def run_case(case, users):
+    """
+    Sends the request of the case in a transaction rolled back afterwards,
+    returns its status, the queries of the view and of its templates and
+    the durations of the view and of the rendering
+    """
+    from django.core.cache import caches
+    from django.db import connection, transaction
+    from django.test import Client
+    from django.test.utils import CaptureQueriesContext
+
+    from core.cache import tiered_cache
+
+    client = Client()
+    with transaction.atomic():
+        if case.user is not None:
+            client.force_login(users[case.user])
+        tiered_cache.clear()
+        caches["stale"].clear()
+
+        with CaptureQueriesContext(connection) as queries:
+            timer = RenderTimer(queries)
+            with timer.installed():
+                started_at = time.perf_counter()
+                response = getattr(client, case.method)(case.url, case.data)
+                # Rendered lazily by some responses, server-sent events are
+                # never read
+                if not response.streaming:
+                    response.content
+                duration = time.perf_counter() - started_at
+        response.close()
+        transaction.set_rollback(True)
+
+    return {
+        "status": response.status_code,
+        "queries": len(queries),
+        "render_queries": timer.query_count,
+        "view": duration - timer.duration,
+        "render": timer.duration,
+    }
+
+
+@contextmanager
+def loaded_title_index():
+    """
+    Loads the autocomplete index of the seeded titles, as workers serve it
+    once loaded, and drops it afterwards
+    """
+    from qna.autocomplete import title_index
+
+    title_index.load()
+    try:
+        yield
+    finally:
+        title_index.reset()
+
+
+def run_cases(data, repeat=1):
+    """
+    Runs each case `repeat` times, returns the query counts of the first
+    run and the median durations per URL name
+    """
+    users = {name: data[name] for name in ("author", "reader", "staff", "answerer")}
+    results = {}
+    with loaded_title_index():
+        for name, case in cases(data).items():
+            runs = [run_case(case, users) for _ in range(repeat)]
+            results[name] = {
+                "status": runs[0]["status"],
+                "queries": runs[0]["queries"],
+                "render_queries": runs[0]["render_queries"],
+                "budget": QUERY_BUDGETS.get(name),
+                "view_ms": statistics.median(run["view"] for run in runs) * 1000,
+                "render_ms": statistics.median(run["render"] for run in runs) * 1000,
+            }
+    return results
+
+
+def check(results, baseline=None, max_slowdown=0.5):
+    """
+    Returns the failures of the results: views without a case or a budget,
+    over their budget, failing, or slower than in the baseline by more than
+    `max_slowdown`
+    """
+    failures = [
+        f"{name} has no benchmark case" for name in url_names() if name not in results
+    ]
+    for name, result in results.items():
+        if result["budget"] is None:
+            failures.append(f"{name} has no query budget")
+        elif result["queries"] > result["budget"]:
+            failures.append(
+                f"{name} ran {result['queries']} queries, "
+                f"over its budget of {result['budget']}"
+            )
+        if result["status"] >= 400:
+            failures.append(f"{name} responded {result['status']}")
+        if baseline and name in baseline:
+            before = baseline[name]["view_ms"] + baseline[name]["render_ms"]
+            after = result["view_ms"] + result["render_ms"]
+            if after > before * (1 + max_slowdown):
+                failures.append(f"{name} took {after:.2f}ms, {before:.2f}ms before")
+    return failures
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--questions", type=int, default=20)
+    parser.add_argument("--output", help="JSON file receiving the results")
+    parser.add_argument("--baseline", help="Results of a previous run to compare")
+    parser.add_argument("--max-slowdown", type=float, default=0.5)
+    args = parser.parse_args()
+
+    setup()
+
+    baseline = None
+    if args.baseline:
+        with open(args.baseline) as file:
+            baseline = json.load(file)
+
+    with test_database(), benchmark_settings():
+        results = run_cases(seed(questions=args.questions), repeat=args.repeat)
+
+    print(
+        f"{'view':<25} {'status':>6} {'queries':>8} {'budget':>7} "
+        f"{'in templates':>12} {'view':>10} {'render':>10}"
+    )
+    for name, result in results.items():
+        print(
+            f"{name:<25} {result['status']:>6} {result['queries']:>8} "
+            f"{result['budget'] if result['budget'] is not None else '-':>7} "
+            f"{result['render_queries']:>12} "
+            f"{result['view_ms']:>8.2f}ms {result['render_ms']:>8.2f}ms"
+        )
+    if args.output:
+        with open(args.output, "w") as file:
+            json.dump(results, file, indent=2)
+
+    failures = check(results, baseline, args.max_slowdown)
+    for failure in failures:
+        print(f"FAIL {failure}")
+    if failures:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -6,4 +6,10 @@ set -o errexit
 poetry install --no-root
 
 # Apply any outstanding database migrations
-python manage.py migrate
\ No newline at end of file
+python manage.py migrate
+
+# Create the table of the shared database cache
+python manage.py createcachetable
+
+# Render the content saved before it was rendered on save
+python manage.py render_content
@@ -5,6 +5,7 @@ from faker import Faker
 from model_bakery import baker
 
 from accounts.models import User
+from core.cache import tiered_cache
 
 
 class BaseTestCase(TestCase):
@@ -17,6 +18,7 @@ class BaseTestCase(TestCase):
         """
         self.client = Client()
         self.faker = Faker()
+        tiered_cache.clear()
 
     def create_user(self):
         """
@@ -0,0 +1,274 @@
+"""
+Two tier cache: a small per-process LRU in front of the shared Django
+cache backend.
+
+Values are recomputed by a single caller at a time, both within a
+process and across workers, while the others keep serving the previous
+value. Entries are also recomputed probabilistically before they expire
+(the "XFetch" algorithm), so a hot key expiring does not send every
+worker to the database at the same moment.
+"""
+
+import hashlib
+import math
+import random
+import threading
+import time
+import uuid
+from collections import OrderedDict, namedtuple
+from functools import wraps
+
+from django.conf import settings
+from django.core.cache import caches
+
+# `delta` is how long the value took to compute, expensive values are
+# recomputed earlier
+CacheEntry = namedtuple("CacheEntry", ["value", "delta", "expires_at"])
+
+
+class LocalLRUCache:
+    """
+    Thread-safe in-process cache evicting the least recently used entries
+    """
+
+    def __init__(self, max_entries):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            item = self._entries.get(key)
+            if item is None:
+                return None
+            entry, local_expires_at = item
+            if local_expires_at <= time.time():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return entry
+
+    def set(self, key, entry, timeout):
+        with self._lock:
+            self._entries[key] = (entry, min(entry.expires_at, time.time() + timeout))
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def delete(self, key):
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+class TieredCache:
+    """
+    Read-through cache looking up the local LRU, then the shared backend,
+    then computing the value.
+
+    The local tier only keeps entries for `local_timeout` seconds, which
+    bounds how long other workers may serve a value deleted elsewhere.
+    Keys are stored in the shared backend under a namespace, which
+    `clear` replaces rather than clearing the whole backend.
+    """
+
+    def __init__(
+        self,
+        alias="default",
+        local_max_entries=None,
+        local_timeout=None,
+        beta=1.0,
+        lock_timeout=10,
+    ):
+        self.alias = alias
+        self.local = LocalLRUCache(
+            local_max_entries or settings.TIERED_CACHE_LOCAL_MAX_ENTRIES
+        )
+        self.local_timeout = local_timeout or settings.TIERED_CACHE_LOCAL_TIMEOUT
+        self.beta = beta
+        self.lock_timeout = lock_timeout
+        self.namespace = "tiered"
+        # Per key locks along with the number of threads using them
+        self._locks = {}
+        self._locks_lock = threading.Lock()
+        self.stats = {"local_hits": 0, "shared_hits": 0, "misses": 0}
+
+    @property
+    def shared(self):
+        return caches[self.alias]
+
+    def shared_key(self, key):
+        return f"{self.namespace}:{key}"
+
+    def is_fresh(self, entry):
+        """
+        Tells whether an entry can still be served. The closer it is to
+        expiry and the longer it took to compute, the likelier it is to be
+        recomputed early.
+        """
+        early = entry.delta * self.beta * -math.log(random.random() or 1e-12)
+        return time.time() + early < entry.expires_at
+
+    def get(self, key):
+        """
+        Returns the cached value, or None if it is missing or expired
+        """
+        entry = self.local.get(key) or self.shared.get(self.shared_key(key))
+        if entry is None or entry.expires_at <= time.time():
+            return None
+        return entry.value
+
+    def set(self, key, value, timeout, delta=0):
+        entry = CacheEntry(value, delta, time.time() + timeout)
+        # The backend keeps the entry past its expiry so it can still be
+        # served while a single caller recomputes it
+        self.shared.set(self.shared_key(key), entry, timeout * 2)
+        self.local.set(key, entry, self.local_timeout)
+
+    def delete(self, key):
+        """
+        Deletes the key from the shared backend and the local tier of this
+        process
+        """
+        self.local.delete(key)
+        self.shared.delete(self.shared_key(key))
+
+    def clear(self):
+        """
+        Forgets every entry in this process. The entries stay in the shared
+        backend, along with its other keys, until they expire.
+        """
+        self.local.clear()
+        self.namespace = f"tiered-{uuid.uuid4().hex}"
+
+    def get_or_set(self, key, compute, timeout):
+        """
+        Returns the cached value of the key, calling `compute` to refresh it
+        when it is missing or about to expire
+        """
+        entry = self.local.get(key)
+        if entry is not None and self.is_fresh(entry):
+            self.stats["local_hits"] += 1
+            return entry.value
+
+        entry = self.shared.get(self.shared_key(key))
+        if entry is not None and self.is_fresh(entry):
+            self.stats["shared_hits"] += 1
+            self.local.set(key, entry, self.local_timeout)
+            return entry.value
+
+        self.stats["misses"] += 1
+        return self._recompute(key, compute, timeout, stale=entry)
+
+    def _use_key_lock(self, key):
+        """
+        Returns the lock of the key, kept until every thread using it
+        called `_release_key_lock`
+        """
+        with self._locks_lock:
+            item = self._locks.get(key)
+            if item is None:
+                item = self._locks[key] = [threading.Lock(), 0]
+            item[1] += 1
+            return item[0]
+
+    def _release_key_lock(self, key):
+        with self._locks_lock:
+            item = self._locks[key]
+            item[1] -= 1
+            if not item[1]:
+                del self._locks[key]
+
+    def _recompute(self, key, compute, timeout, stale):
+        lock = self._use_key_lock(key)
+        try:
+            if not lock.acquire(blocking=stale is None):
+                # Another thread of this process is already recomputing
+                return stale.value
+            try:
+                return self._recompute_locked(key, compute, timeout, stale)
+            finally:
+                lock.release()
+        finally:
+            self._release_key_lock(key)
+
+    def _recompute_locked(self, key, compute, timeout, stale):
+        if stale is None:
+            # The value may have been computed while waiting for the lock
+            entry = self.local.get(key)
+            if entry is not None:
+                return entry.value
+
+        lock_key = self.shared_key(f"{key}:lock")
+        token = uuid.uuid4().hex
+        locked = self.shared.add(lock_key, token, self.lock_timeout)
+        if not locked:
+            # Another worker is recomputing
+            if stale is not None:
+                return stale.value
+            entry = self._wait_for(key)
+            if entry is not None:
+                return entry.value
+        try:
+            started_at = time.time()
+            value = compute()
+            self.set(key, value, timeout, delta=time.time() - started_at)
+            return value
+        finally:
+            # Only the lock taken here is released, not one another worker
+            # took since it expired
+            if locked and self.shared.get(lock_key) == token:
+                self.shared.delete(lock_key)
+
+    def _wait_for(self, key, interval=0.05):
+        """
+        Waits for another worker to store the key, giving up after the lock
+        timeout
+        """
+        deadline = time.time() + self.lock_timeout
+        while time.time() < deadline:
+            entry = self.shared.get(self.shared_key(key))
+            if entry is not None:
+                self.local.set(key, entry, self.local_timeout)
+                return entry
+            time.sleep(interval)
+        return None
+
+
+tiered_cache = TieredCache()
+
+
+def make_key(func, args, kwargs):
+    """
+    Builds a cache key from a function and its arguments
+    """
+    arguments = [repr(arg) for arg in args]
+    arguments += [f"{name}={value!r}" for name, value in sorted(kwargs.items())]
+    digest = hashlib.md5(",".join(arguments).encode()).hexdigest()
+    return f"{func.__module__}.{func.__qualname__}:{digest}"
+
+
+def cached(timeout, cache=None):
+    """
+    Decorator caching the return value of a function in the tiered cache,
+    keyed by its arguments. The decorated function gets an `invalidate`
+    method taking the same arguments.
+    """
+
+    def decorator(func):
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            return (cache or tiered_cache).get_or_set(
+                make_key(func, args, kwargs), lambda: func(*args, **kwargs), timeout
+            )
+
+        def invalidate(*args, **kwargs):
+            (cache or tiered_cache).delete(make_key(func, args, kwargs))
+
+        wrapper.invalidate = invalidate
+        return wrapper
+
+    return decorator
@@ -1,6 +1,8 @@
+from django.db import models, transaction
+from django.db.models import Exists, OuterRef
 from django.utils import timezone
 
-from django.db import models
+from core.objects import ObjectCacheMixin
 
 
 class BaseModel(models.Model):
@@ -42,6 +44,13 @@ class SoftDeleteManager(models.Manager):
         return super().get_queryset().filter(deleted_at__isnull=False)
 
 
+class CachedSoftDeleteManager(ObjectCacheMixin, SoftDeleteManager):
+    """
+    Soft delete manager caching the live instances looked up by primary
+    key, see core/objects.py
+    """
+
+
 class SoftDeleteWithBaseModel(BaseModel):
     """
     Abstract base model class that adds soft-delete functionality to a model.
@@ -51,6 +60,10 @@ class SoftDeleteWithBaseModel(BaseModel):
 
     objects = SoftDeleteManager()
 
+    # Names of the reverse relations whose rows are soft deleted and
+    # restored together with the object
+    soft_delete_cascade = ()
+
     class Meta:
         """
         Meta class for defining class behavior and properties.
@@ -58,21 +71,68 @@ class SoftDeleteWithBaseModel(BaseModel):
 
         abstract = True
 
+    @classmethod
+    def cascade_soft_delete(cls, parents, deleted_at):
+        """
+        Stamps the live rows related to the `parents` queryset with
+        `deleted_at`, using a single UPDATE per level of relations
+        """
+        for name in cls.soft_delete_cascade:
+            relation = cls._meta.get_field(name)
+            related_model = relation.related_model
+            lookup = {f"{relation.field.name}__in": parents.values("pk")}
+            related_model.objects.filter(**lookup).update(
+                deleted_at=deleted_at, updated_at=timezone.now()
+            )
+            related_model.cascade_soft_delete(
+                related_model.objects.trashed().filter(deleted_at=deleted_at, **lookup),
+                deleted_at,
+            )
+
+    @classmethod
+    def cascade_restore(cls, parents):
+        """
+        Restores the rows that were soft deleted together with the trashed
+        `parents`, recognised by sharing their parent's `deleted_at`. Rows
+        deleted on their own beforehand stay deleted.
+        """
+        for name in cls.soft_delete_cascade:
+            relation = cls._meta.get_field(name)
+            related_model = relation.related_model
+            cascaded = related_model.objects.trashed().filter(
+                Exists(
+                    parents.filter(
+                        pk=OuterRef(relation.field.name),
+                        deleted_at=OuterRef("deleted_at"),
+                    )
+                )
+            )
+            related_model.cascade_restore(cascaded)
+            cascaded.update(deleted_at=None, updated_at=timezone.now())
+
     def delete(self, *args, **kwargs):
         """
         This function sets the "deleted_at" attribute to the current datetime
-        and saves the object.
+        and saves the object, cascading to the related rows. Only the deletion
+        is saved, the instance may be older than the row.
         """
-        self.deleted_at = timezone.now()
-        self.save()
+        with transaction.atomic():
+            self.deleted_at = timezone.now()
+            self.cascade_soft_delete(
+                type(self).objects.with_trashed().filter(pk=self.pk), self.deleted_at
+            )
+            self.save(update_fields=["deleted_at", "updated_at"])
 
     def restore(self):
         """
         This function reStore a deleted object by setting its "deleted_at"
-        attribute to None and saving it.
+        attribute to None and saving it, along with the related rows deleted
+        with it.
         """
-        self.deleted_at = None
-        self.save()
+        with transaction.atomic():
+            self.cascade_restore(type(self).objects.trashed().filter(pk=self.pk))
+            self.deleted_at = None
+            self.save(update_fields=["deleted_at", "updated_at"])
 
     @classmethod
     def bulk_delete(cls, filters):
@@ -80,4 +140,18 @@ class SoftDeleteWithBaseModel(BaseModel):
         Performs a bulk delete operation on objects matching the
         specified filters
         """
-        cls.objects.filter(**filters).update(deleted_at=timezone.now())
+        with transaction.atomic():
+            now = timezone.now()
+            cls.cascade_soft_delete(cls.objects.filter(**filters), now)
+            return cls.objects.filter(**filters).update(deleted_at=now, updated_at=now)
+
+    @classmethod
+    def bulk_restore(cls, filters):
+        """
+        Restores the trashed objects matching the specified filters along
+        with the related rows deleted with them
+        """
+        with transaction.atomic():
+            trashed = cls.objects.trashed().filter(**filters)
+            cls.cascade_restore(trashed)
+            return trashed.update(deleted_at=None, updated_at=timezone.now())
@@ -0,0 +1,86 @@
+"""
+Serving of stored files with support for HTTP range requests.
+"""
+
+import re
+
+from django.http import FileResponse, HttpResponse, StreamingHttpResponse
+
+RANGE_PATTERN = re.compile(r"^bytes=(\d*)-(\d*)$")
+CHUNK_SIZE = 64 * 1024
+
+
+def parse_range(header, size):
+    """
+    Returns the `(start, end)` byte positions, both included, requested by
+    a single range `Range` header. Returns None when the header must be
+    ignored and the whole file served, and raises ValueError when the
+    range cannot be satisfied.
+    """
+    match = RANGE_PATTERN.match(header.strip())
+    if match is None:
+        # Malformed or multiple ranges, which are not supported
+        return None
+    first, last = match.groups()
+    if not first and not last:
+        return None
+    if not first:
+        # Suffix range, the last bytes of the file
+        length = int(last)
+        if length == 0 or size == 0:
+            raise ValueError("Unsatisfiable range")
+        return max(size - length, 0), size - 1
+    start = int(first)
+    end = min(int(last), size - 1) if last else size - 1
+    if start >= size or (last and int(last) < start):
+        raise ValueError("Unsatisfiable range")
+    return start, end
+
+
+def iter_range(file, start, length):
+    """
+    Yields the bytes of the file from `start`, `length` bytes at most, in
+    chunks and closes the file afterwards
+    """
+    try:
+        file.seek(start)
+        while length > 0:
+            chunk = file.read(min(CHUNK_SIZE, length))
+            if not chunk:
+                return
+            length -= len(chunk)
+            yield chunk
+    finally:
+        file.close()
+
+
+def file_response(request, file, size, content_type, etag):
+    """
+    Returns a response serving the opened file, the requested range of it
+    when the request has a `Range` header matching the `If-Range` one.
+    The file is closed once the response is sent.
+    """
+    header = request.headers.get("Range")
+    if_range = request.headers.get("If-Range")
+    byte_range = None
+    if header and (if_range is None or if_range.strip() == f'"{etag}"'):
+        try:
+            byte_range = parse_range(header, size)
+        except ValueError:
+            file.close()
+            response = HttpResponse(status=416)
+            response["Content-Range"] = f"bytes */{size}"
+            return response
+
+    if byte_range is None:
+        response = FileResponse(file, content_type=content_type)
+    else:
+        start, end = byte_range
+        length = end - start + 1
+        response = StreamingHttpResponse(
+            iter_range(file, start, length), status=206, content_type=content_type
+        )
+        response["Content-Length"] = str(length)
+        response["Content-Range"] = f"bytes {start}-{end}/{size}"
+    response["Accept-Ranges"] = "bytes"
+    return response
@@ -0,0 +1,166 @@
+"""
+Safe rendering of a Markdown subset for user written content.
+
+The text is HTML escaped before any Markdown is applied, so the output
+only ever contains the tags produced here: paragraphs, headings, lists,
+block quotes, code blocks and spans, emphasis and links to http(s) and
+mailto URLs.
+"""
+
+import html
+import re
+from urllib.parse import urlsplit
+
+from django.utils.html import strip_tags
+from django.utils.text import Truncator
+
+EXCERPT_WORDS = 50
+ALLOWED_URL_SCHEMES = {"", "http", "https", "mailto"}
+# Headings of the content are nested below the title of the page
+HEADING_OFFSET = 2
+
+FENCE_PATTERN = re.compile(r"^\s*```")
+HEADING_PATTERN = re.compile(r"^(#{1,6})\s+(.*?)\s*#*\s*$")
+QUOTE_PATTERN = re.compile(r"^\s*&gt;\s?(.*)$")
+UNORDERED_ITEM_PATTERN = re.compile(r"^\s*[-*+]\s+(.*)$")
+ORDERED_ITEM_PATTERN = re.compile(r"^\s*\d+[.)]\s+(.*)$")
+CODE_SPAN_PATTERN = re.compile(r"`([^`]+)`")
+LINK_PATTERN = re.compile(r"\[([^\]]+)\]\(([^)\s]+)\)")
+STRONG_PATTERN = re.compile(r"\*\*(?!\s)(.+?)(?<!\s)\*\*")
+EMPHASIS_PATTERN = re.compile(
+    r"(?<![*\w])\*(?![\s*])(.+?)(?<![\s*])\*(?!\*)|(?<!\w)_(?!\s)(.+?)(?<!\s)_(?!\w)"
+)
+PLACEHOLDER_PATTERN = re.compile("\x00(\\d+)\x00")
+
+
+def is_safe_url(url):
+    """
+    Returns whether the URL can be used in a link, rejecting the schemes
+    able to run scripts and the control characters browsers ignore
+    """
+    if any(ord(character) < 32 for character in url):
+        return False
+    try:
+        scheme = urlsplit(url).scheme.lower()
+    except ValueError:
+        return False
+    return scheme in ALLOWED_URL_SCHEMES
+
+
+def render_inline(text):
+    """
+    Renders the code spans, links and emphasis of already escaped text
+    """
+    stash = []
+
+    def store(markup):
+        stash.append(markup)
+        return f"\x00{len(stash) - 1}\x00"
+
+    def emphasize(text):
+        text = STRONG_PATTERN.sub(r"<strong>\1</strong>", text)
+        return EMPHASIS_PATTERN.sub(
+            lambda match: f"<em>{match.group(1) or match.group(2)}</em>", text
+        )
+
+    def link(match):
+        label, url = match.groups()
+        if not is_safe_url(html.unescape(url)):
+            return match.group(0)
+        return store(f'<a href="{url}" rel="nofollow noopener">{emphasize(label)}</a>')
+
+    text = CODE_SPAN_PATTERN.sub(
+        lambda match: store(f"<code>{match.group(1)}</code>"), text
+    )
+    text = LINK_PATTERN.sub(link, text)
+    text = emphasize(text)
+    # Links may contain code spans, so placeholders are restored repeatedly
+    while PLACEHOLDER_PATTERN.search(text):
+        text = PLACEHOLDER_PATTERN.sub(lambda match: stash[int(match.group(1))], text)
+    return text
+
+
+def render_blocks(lines):
+    """
+    Renders escaped lines into block level HTML elements
+    """
+    blocks = []
+    paragraph = []
+    index = 0
+
+    def flush_paragraph():
+        if paragraph:
+            blocks.append(f"<p>{render_inline(chr(10).join(paragraph))}</p>")
+            paragraph.clear()
+
+    while index < len(lines):
+        line = lines[index]
+
+        if FENCE_PATTERN.match(line):
+            flush_paragraph()
+            code = []
+            index += 1
+            while index < len(lines) and not FENCE_PATTERN.match(lines[index]):
+                code.append(lines[index])
+                index += 1
+            blocks.append(f"<pre><code>{chr(10).join(code)}</code></pre>")
+            index += 1
+            continue
+
+        if not line.strip():
+            flush_paragraph()
+            index += 1
+            continue
+
+        heading = HEADING_PATTERN.match(line)
+        if heading:
+            flush_paragraph()
+            level = min(len(heading.group(1)) + HEADING_OFFSET, 6)
+            blocks.append(f"<h{level}>{render_inline(heading.group(2))}</h{level}>")
+            index += 1
+            continue
+
+        if QUOTE_PATTERN.match(line):
+            flush_paragraph()
+            quoted = []
+            while index < len(lines) and QUOTE_PATTERN.match(lines[index]):
+                quoted.append(QUOTE_PATTERN.match(lines[index]).group(1))
+                index += 1
+            blocks.append(f"<blockquote>{render_blocks(quoted)}</blockquote>")
+            continue
+
+        for pattern, tag in (
+            (UNORDERED_ITEM_PATTERN, "ul"),
+            (ORDERED_ITEM_PATTERN, "ol"),
+        ):
+            if pattern.match(line):
+                flush_paragraph()
+                items = []
+                while index < len(lines) and pattern.match(lines[index]):
+                    items.append(render_inline(pattern.match(lines[index]).group(1)))
+                    index += 1
+                rendered_items = "\n".join(f"<li>{item}</li>" for item in items)
+                blocks.append(f"<{tag}>{rendered_items}</{tag}>")
+                break
+        else:
+            paragraph.append(line.strip())
+            index += 1
+
+    flush_paragraph()
+    return "\n".join(blocks)
+
+
+def render_markdown(text):
+    """
+    Returns the sanitized HTML of the Markdown text
+    """
+    text = text.replace("\r\n", "\n").replace("\r", "\n").replace("\x00", "")
+    return render_blocks(html.escape(text).split("\n"))
+
+
+def make_excerpt(rendered_html, words=EXCERPT_WORDS):
+    """
+    Returns the first words of the rendered HTML as plain text
+    """
+    text = " ".join(html.unescape(strip_tags(rendered_html)).split())
+    return Truncator(text).words(words)
@@ -0,0 +1,323 @@
+"""
+Prometheus style metrics aggregated across the worker processes.
+
+Every worker records its metrics in memory and regularly writes a
+snapshot to `METRICS_DIR/<pid>.json`. The `/metrics` endpoint, whichever
+worker serves it, merges the snapshots of all the workers: counters and
+histograms are summed, gauges are summed over the workers still alive.
+The snapshots of the workers which died before the server started are
+removed by `prune`, so the sums only cover the current deployment.
+"""
+
+import bisect
+import glob
+import json
+import os
+import threading
+import time
+from collections import defaultdict
+
+from django.conf import settings
+from django.db import connections
+
+from core.cache import tiered_cache
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+
+
+class Metric:
+    """
+    Base class of the metrics, values are kept per label values
+    """
+
+    type = None
+
+    def __init__(self, name, documentation, labels=()):
+        self.name = name
+        self.documentation = documentation
+        self.labels = tuple(labels)
+        self.values = defaultdict(float)
+        self._lock = threading.Lock()
+
+    def snapshot(self):
+        with self._lock:
+            return [[list(key), value] for key, value in self.values.items()]
+
+
+class Counter(Metric):
+    type = "counter"
+
+    def inc(self, *label_values, amount=1):
+        with self._lock:
+            self.values[label_values] += amount
+
+    def set(self, *label_values, value):
+        """
+        Sets the value, used to mirror counts kept elsewhere
+        """
+        with self._lock:
+            self.values[label_values] = value
+
+
+class Gauge(Counter):
+    type = "gauge"
+
+    def dec(self, *label_values, amount=1):
+        self.inc(*label_values, amount=-amount)
+
+
+class Histogram(Metric):
+    type = "histogram"
+
+    def __init__(self, name, documentation, labels=(), buckets=DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labels)
+        self.buckets = tuple(buckets)
+        self.values = {}
+
+    def observe(self, *label_values, value):
+        with self._lock:
+            counts = self.values.setdefault(
+                label_values, [0] * (len(self.buckets) + 1) + [0.0]
+            )
+            # Bucket counts are not cumulative here, they are summed up on
+            # exposition. The last two items are the overflow bucket and
+            # the sum of the observed values.
+            counts[bisect.bisect_left(self.buckets, value)] += 1
+            counts[-1] += value
+
+
+class Registry:
+    """
+    Metrics of the current process and their merged exposition
+    """
+
+    def __init__(self):
+        self.metrics = {}
+        self.collectors = []
+        self._last_write = 0
+
+    def register(self, metric):
+        self.metrics[metric.name] = metric
+        return metric
+
+    def collector(self, func):
+        """
+        Registers a function called before every snapshot, used to copy
+        values kept elsewhere into gauges
+        """
+        self.collectors.append(func)
+        return func
+
+    @property
+    def directory(self):
+        return settings.METRICS_DIR
+
+    def snapshot(self):
+        for collect in self.collectors:
+            collect()
+        return {name: metric.snapshot() for name, metric in self.metrics.items()}
+
+    def write(self, force=False):
+        """
+        Writes the snapshot of this worker, at most once per
+        `METRICS_WRITE_INTERVAL` seconds unless forced
+        """
+        now = time.monotonic()
+        if not force and now - self._last_write < settings.METRICS_WRITE_INTERVAL:
+            return
+        self._last_write = now
+        os.makedirs(self.directory, exist_ok=True)
+        path = os.path.join(self.directory, f"{os.getpid()}.json")
+        temporary_path = f"{path}.tmp"
+        with open(temporary_path, "w") as file:
+            json.dump(self.snapshot(), file)
+        os.replace(temporary_path, path)
+
+    def prune(self):
+        """
+        Removes the snapshots of the workers no longer alive, returns their
+        number
+        """
+        removed = 0
+        for path in glob.glob(os.path.join(self.directory, "*.json*")):
+            pid = int(os.path.basename(path).split(".")[0])
+            if is_alive(pid):
+                continue
+            try:
+                os.remove(path)
+                removed += 1
+            except FileNotFoundError:
+                pass
+        return removed
+
+    def read_all(self):
+        """
+        Returns the snapshots of every worker as `(pid, alive, snapshot)`
+        """
+        for path in glob.glob(os.path.join(self.directory, "*.json")):
+            pid = int(os.path.basename(path).split(".")[0])
+            try:
+                with open(path) as file:
+                    snapshot = json.load(file)
+            except (OSError, ValueError):
+                continue
+            yield pid, is_alive(pid), snapshot
+
+    def merge(self):
+        """
+        Merges the snapshots of every worker into one value per label values
+        """
+        merged = {name: defaultdict(lambda: None) for name in self.metrics}
+        for _, alive, snapshot in self.read_all():
+            for name, values in snapshot.items():
+                metric = self.metrics.get(name)
+                if metric is None or (metric.type == "gauge" and not alive):
+                    continue
+                for key, value in values:
+                    key = tuple(key)
+                    current = merged[name][key]
+                    if current is None:
+                        merged[name][key] = value
+                    elif isinstance(value, list):
+                        merged[name][key] = [a + b for a, b in zip(current, value)]
+                    else:
+                        merged[name][key] = current + value
+        return merged
+
+    def expose(self):
+        """
+        Returns the merged metrics in the Prometheus text format
+        """
+        self.write(force=True)
+        lines = []
+        for name, values in self.merge().items():
+            metric = self.metrics[name]
+            lines.append(f"# HELP {name} {metric.documentation}")
+            lines.append(f"# TYPE {name} {metric.type}")
+            for key, value in sorted(values.items()):
+                labels = dict(zip(metric.labels, key))
+                if metric.type == "histogram":
+                    lines.extend(format_histogram(name, labels, metric.buckets, value))
+                else:
+                    lines.append(f"{name}{format_labels(labels)} {value}")
+        return "\n".join(lines) + "\n"
+
+
+def is_alive(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass
+    return True
+
+
+def escape_label(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"')
+
+
+def format_labels(labels):
+    if not labels:
+        return ""
+    pairs = (f'{name}="{escape_label(value)}"' for name, value in labels.items())
+    return "{" + ",".join(pairs) + "}"
+
+
+def format_histogram(name, labels, buckets, counts):
+    lines = []
+    cumulative = 0
+    for bound, count in zip([*buckets, "+Inf"], counts[:-1]):
+        cumulative += count
+        bucket_labels = {**labels, "le": bound}
+        lines.append(f"{name}_bucket{format_labels(bucket_labels)} {cumulative}")
+    lines.append(f"{name}_sum{format_labels(labels)} {counts[-1]}")
+    lines.append(f"{name}_count{format_labels(labels)} {cumulative}")
+    return lines
+
+
+registry = Registry()
+
+request_duration = registry.register(
+    Histogram(
+        "http_request_duration_seconds",
+        "Duration of the requests per URL name",
+        labels=("view", "method"),
+    )
+)
+requests_in_flight = registry.register(
+    Gauge("http_requests_in_flight", "Requests being served")
+)
+db_queries = registry.register(
+    Counter("db_queries_total", "Database queries per URL name", labels=("view",))
+)
+cache_requests = registry.register(
+    Counter(
+        "cache_requests_total",
+        "Tiered cache lookups per outcome since the worker started",
+        labels=("result",),
+    )
+)
+object_cache_lookups = registry.register(
+    Counter(
+        "object_cache_lookups_total",
+        "Lookups by primary key of the object cache per model and outcome",
+        labels=("model", "result"),
+    )
+)
+request_queue_time = registry.register(
+    Histogram(
+        "http_request_queue_seconds",
+        "Time the requests waited before reaching the worker",
+    )
+)
+requests_shed = registry.register(
+    Counter(
+        "http_requests_shed_total",
+        "Requests refused by the load shedding per reason",
+        labels=("reason",),
+    )
+)
+spam_checks = registry.register(
+    Counter(
+        "spam_checks_total",
+        "Posts screened by the spam filter per result",
+        labels=("result",),
+    )
+)
+db_connections = registry.register(
+    Gauge(
+        "db_connections",
+        "Database connections of the worker per state",
+        labels=("alias", "state"),
+    )
+)
+
+
+@registry.collector
+def collect_cache_stats():
+    for result, count in tiered_cache.stats.items():
+        cache_requests.set(result, value=count)
+
+
+@registry.collector
+def collect_connection_stats():
+    for connection in connections.all(initialized_only=True):
+        pool = getattr(connection, "pool", None)
+        if pool is not None:
+            stats = pool.get_stats()
+            db_connections.set(
+                connection.alias, "pool_size", value=stats.get("pool_size", 0)
+            )
+            db_connections.set(
+                connection.alias, "available", value=stats.get("pool_available", 0)
+            )
+            db_connections.set(
+                connection.alias, "waiting", value=stats.get("requests_waiting", 0)
+            )
+        else:
+            db_connections.set(
+                connection.alias,
+                "open",
+                value=int(connection.connection is not None),
+            )
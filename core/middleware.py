@@ -0,0 +1,442 @@
+import logging
+import re
+import threading
+import time
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
+from django.db import connection
+from django.http import HttpResponse
+from django.urls import reverse
+from django.utils.functional import cached_property
+
+from core import metrics
+from core.objects import request_memo
+from core.profiling import REQUESTED, StackSampler, profile_reason, write_profile
+from core.slow_queries import slow_query_recorder
+from core.traffic import capture_record, should_capture, write_records
+
+logger = logging.getLogger(__name__)
+
+
+def url_name(request):
+    """
+    Returns the URL name of the resolved view, used to label per view data
+    """
+    match = getattr(request, "resolver_match", None)
+    if match is None:
+        return "unresolved"
+    return match.view_name or "unnamed"
+
+
+class TrafficCaptureMiddleware:
+    """
+    Middleware appending a sample of the requests to the traffic log, see
+    core/traffic.py. It comes first so the durations include the other
+    middleware.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        if not should_capture():
+            return self.get_response(request)
+        started_at = time.time()
+        response = self.get_response(request)
+        self.capture(request, getattr(request, "user", None), response, started_at)
+        return response
+
+    async def __acall__(self, request):
+        if not should_capture():
+            return await self.get_response(request)
+        started_at = time.time()
+        response = await self.get_response(request)
+        # The lazy user cannot be loaded from the event loop
+        user = await request.auser() if hasattr(request, "auser") else None
+        await sync_to_async(self.capture, thread_sensitive=False)(
+            request, user, response, started_at
+        )
+        return response
+
+    def capture(self, request, user, response, started_at):
+        record = capture_record(
+            request,
+            user,
+            url_name(request),
+            response.status_code,
+            started_at,
+            time.time() - started_at,
+        )
+        try:
+            write_records(
+                settings.TRAFFIC_CAPTURE_LOG,
+                [record],
+                settings.TRAFFIC_CAPTURE_MAX_BYTES,
+            )
+        except OSError:
+            logger.exception("Cannot capture the request to %s", request.path)
+
+
+class MetricsMiddleware:
+    """
+    Middleware recording the duration, the number of database queries and
+    the number of in-flight requests per URL name
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+
+        queries = []
+
+        def count_queries(execute, sql, params, many, context):
+            queries.append(1)
+            return execute(sql, params, many, context)
+
+        metrics.requests_in_flight.inc()
+        started_at = time.perf_counter()
+        try:
+            with connection.execute_wrapper(count_queries):
+                return self.get_response(request)
+        finally:
+            self.record(request, started_at)
+            metrics.db_queries.inc(url_name(request), amount=len(queries))
+
+    async def __acall__(self, request):
+        # Queries of async views run in other threads and are not counted
+        metrics.requests_in_flight.inc()
+        started_at = time.perf_counter()
+        try:
+            return await self.get_response(request)
+        finally:
+            self.record(request, started_at)
+
+    def record(self, request, started_at):
+        metrics.requests_in_flight.dec()
+        metrics.request_duration.observe(
+            url_name(request), request.method, value=time.perf_counter() - started_at
+        )
+        metrics.registry.write()
+
+
+class SlowQueryMiddleware:
+    """
+    Middleware logging the slow queries of the requests with their view,
+    see core/slow_queries.py. Under ASGI the view runs in a thread of its
+    own, where `process_view` installs the timing wrapper until the
+    response is returned.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        if not settings.SLOW_QUERY_ENABLED:
+            return self.get_response(request)
+        recorder = slow_query_recorder(lambda: url_name(request))
+        with connection.execute_wrapper(recorder):
+            return self.get_response(request)
+
+    async def __acall__(self, request):
+        try:
+            return await self.get_response(request)
+        finally:
+            if getattr(request, "slow_query_recorder", None) is not None:
+                # In the thread of the view, whose connection has the wrapper
+                await sync_to_async(self.uninstall)(request)
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        if iscoroutinefunction(self) and settings.SLOW_QUERY_ENABLED:
+            request.slow_query_recorder = slow_query_recorder(lambda: url_name(request))
+            connection.execute_wrappers.append(request.slow_query_recorder)
+
+    def uninstall(self, request):
+        connection.execute_wrappers.remove(request.slow_query_recorder)
+        request.slow_query_recorder = None
+
+
+class ObjectMemoMiddleware:
+    """
+    Middleware giving each request its memo of the instances looked up by
+    primary key, see core/objects.py
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        token = request_memo.set({})
+        try:
+            return self.get_response(request)
+        finally:
+            request_memo.reset(token)
+
+    async def __acall__(self, request):
+        token = request_memo.set({})
+        try:
+            return await self.get_response(request)
+        finally:
+            request_memo.reset(token)
+
+
+class ProfilingMiddleware:
+    """
+    Middleware sampling the stacks of the requests chosen by
+    `profile_reason`, see core/profiling.py. It follows the authentication
+    middleware so staff members can ask for a profile. Under ASGI the
+    thread running the view is sampled from `process_view` until the
+    response is returned.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        if not self.start(request):
+            return self.get_response(request)
+        try:
+            response = self.get_response(request)
+        finally:
+            counts = request.profiler.stop()
+        return self.write(request, response, counts)
+
+    async def __acall__(self, request):
+        try:
+            response = await self.get_response(request)
+        finally:
+            profiler = getattr(request, "profiler", None)
+            if profiler is not None:
+                counts = await sync_to_async(profiler.stop)()
+        if profiler is None:
+            return response
+        return await sync_to_async(self.write)(request, response, counts)
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        if iscoroutinefunction(self):
+            self.start(request)
+
+    def start(self, request):
+        """
+        Starts sampling the current thread when the request is profiled,
+        returns whether it is
+        """
+        request.profile_reason = profile_reason(request)
+        if request.profile_reason is None:
+            return False
+        request.profile_started_at = time.perf_counter()
+        request.profiler = StackSampler(
+            threading.get_ident(), settings.PROFILER_INTERVAL
+        ).start()
+        return True
+
+    def write(self, request, response, counts):
+        duration = time.perf_counter() - request.profile_started_at
+        try:
+            filename = write_profile(
+                counts, f"{url_name(request)}-{duration * 1000:.0f}ms"
+            )
+        except OSError:
+            logger.exception("Cannot write the profile of %s", request.path)
+            return response
+        # Only the staff members asking for a profile learn its name
+        if request.profile_reason == REQUESTED:
+            response["X-Profile"] = filename
+        return response
+
+
+CRAWLER_PATTERN = re.compile(
+    r"bot|crawl|spider|slurp|facebookexternalhit|bingpreview|python-requests|curl",
+    re.IGNORECASE,
+)
+SAFE_METHODS = ("GET", "HEAD", "OPTIONS", "TRACE")
+# Shape of the keys of the Django session backends
+SESSION_KEY_PATTERN = re.compile(r"[a-z0-9]{32}")
+
+
+def queue_time(request):
+    """
+    Returns the seconds the request waited since the proxy received it,
+    from the `X-Request-Start` header in seconds, milliseconds or
+    microseconds since the epoch, or None without the header
+    """
+    header = request.headers.get("X-Request-Start", "")
+    try:
+        started_at = float(header.removeprefix("t="))
+    except ValueError:
+        return None
+    if started_at > 1e14:
+        started_at /= 1e6
+    elif started_at > 1e11:
+        started_at /= 1e3
+    return max(time.time() - started_at, 0.0)
+
+
+def is_crawler(request):
+    """
+    Returns whether the User-Agent of the request is a known crawler
+    """
+    return bool(CRAWLER_PATTERN.search(request.headers.get("User-Agent", "")))
+
+
+def has_session(request):
+    """
+    Returns whether the request carries a session cookie shaped like a
+    session key, without loading the session from the database
+    """
+    session_key = request.COOKIES.get(settings.SESSION_COOKIE_NAME, "")
+    return SESSION_KEY_PATTERN.fullmatch(session_key) is not None
+
+
+def is_low_priority(request):
+    """
+    Returns whether the request can be refused first: crawlers and
+    anonymous visitors paging deep into the lists
+    """
+    if is_crawler(request):
+        return True
+    if has_session(request):
+        return False
+    try:
+        page = int(request.GET.get("page", 1))
+    except ValueError:
+        return False
+    return page > settings.LOAD_SHEDDING_MAX_ANONYMOUS_PAGE
+
+
+class LoadSheddingMiddleware:
+    """
+    Middleware refusing requests with `503 Service Unavailable` when the
+    worker is overloaded, so the requests it accepts are still served
+    fast. Health checks and writes carrying a session cookie are never
+    refused, unless they come from a crawler. The session is not loaded
+    to tell, so a client forging a cookie shaped like a session key still
+    skips the shedding of writes and of deep pages until the views reject
+    it as anonymous.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.in_flight = 0
+        self._lock = threading.Lock()
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
+
+    @cached_property
+    def exempt_paths(self):
+        return {reverse(name) for name in settings.LOAD_SHEDDING_EXEMPT_URLS}
+
+    def is_exempt(self, request):
+        if request.path_info in self.exempt_paths:
+            return True
+        return (
+            request.method not in SAFE_METHODS
+            and has_session(request)
+            and not is_crawler(request)
+        )
+
+    def shed_reason(self, request, waited):
+        """
+        Returns why the request must be refused, or None to serve it
+        """
+        if not settings.LOAD_SHEDDING_ENABLED or self.is_exempt(request):
+            return None
+        if (
+            self.in_flight >= settings.LOAD_SHEDDING_HARD_IN_FLIGHT
+            or waited >= settings.LOAD_SHEDDING_HARD_QUEUE_SECONDS
+        ):
+            return "overloaded"
+        if (
+            self.in_flight >= settings.LOAD_SHEDDING_SOFT_IN_FLIGHT
+            or waited >= settings.LOAD_SHEDDING_SOFT_QUEUE_SECONDS
+        ) and is_low_priority(request):
+            return "low_priority"
+        return None
+
+    def shed(self, reason):
+        metrics.requests_shed.inc(reason)
+        response = HttpResponse(
+            "The service is overloaded, please retry later.",
+            status=503,
+            content_type="text/plain",
+        )
+        response["Retry-After"] = settings.LOAD_SHEDDING_RETRY_AFTER
+        return response
+
+    def enter(self, request):
+        """
+        Admits the request and returns None, or returns the response
+        refusing it
+        """
+        waited = queue_time(request)
+        if waited is not None:
+            metrics.request_queue_time.observe(value=waited)
+        with self._lock:
+            reason = self.shed_reason(request, waited or 0.0)
+            if reason is None:
+                self.in_flight += 1
+                return None
+        return self.shed(reason)
+
+    def leave(self):
+        with self._lock:
+            self.in_flight -= 1
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        response = self.enter(request)
+        if response is not None:
+            return response
+        try:
+            return self.get_response(request)
+        finally:
+            self.leave()
+
+    async def __acall__(self, request):
+        response = self.enter(request)
+        if response is not None:
+            return response
+        try:
+            return await self.get_response(request)
+        finally:
+            self.leave()
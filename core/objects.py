@@ -0,0 +1,228 @@
+"""
+Read-through cache of model instances by primary key.
+
+Models opt in with a manager using `ObjectCacheMixin`. Their lookups by
+primary key through the manager, `Model.objects.get(pk=...)` or
+`get_cached`, are served from the request memo, then the tiered cache,
+then the database. Every row is thus fetched at most once per request,
+and at most once per `OBJECT_CACHE_TIMEOUT` seconds across requests.
+
+Entries are deleted when an instance is saved or deleted, and when rows
+are changed through the querysets of the manager, which covers the soft
+deletes, the restores and the other bulk updates. They are deleted again
+once the transaction commits, so a concurrent request cannot cache the
+rows as they were before. The other workers may still serve an entry of
+their local tier for `TIERED_CACHE_LOCAL_TIMEOUT` seconds.
+
+Keys include a generation of the model. When an update or delete changes
+more than `MAX_INVALIDATED_ROWS` rows, such as a purge, the generation is
+replaced instead, which invalidates every cached instance of the model
+without selecting the primary keys of all the rows.
+
+The write views get their object from the database rather than from the
+cache, so saving it never writes back values changed since it was cached.
+"""
+
+import copy
+import uuid
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.db import models, transaction
+from django.db.models.signals import post_delete, post_save
+from django.http import Http404
+from django.shortcuts import get_object_or_404
+
+from core import metrics
+from core.cache import tiered_cache
+
+# Instances already fetched by the current request, keyed like the cache
+request_memo = ContextVar("request_memo", default=None)
+
+# Rows changed at once beyond which the whole model is invalidated
+MAX_INVALIDATED_ROWS = 1000
+GENERATION_TIMEOUT = 60 * 60 * 24
+
+
+def generation_key(model):
+    return f"objects:{model._meta.label_lower}"
+
+
+def model_generation(model):
+    """
+    Returns the current generation of the cached instances of the model
+    """
+    key = generation_key(model)
+    generation = tiered_cache.get(key)
+    if generation is None:
+        # A new generation when the previous one expired, as entries of an
+        # older generation may have been invalidated since
+        generation = uuid.uuid4().hex
+        tiered_cache.set(key, generation, GENERATION_TIMEOUT)
+    return generation
+
+
+def object_key(model, pk):
+    return f"objects:{model._meta.label_lower}:{model_generation(model)}:{pk}"
+
+
+def invalidate_objects(model, pks):
+    """
+    Deletes the cached instances of the model with the given primary keys,
+    now and once the current transaction commits
+    """
+    keys = [object_key(model, pk) for pk in pks]
+    if not keys:
+        return
+
+    def delete():
+        memo = request_memo.get()
+        for key in keys:
+            tiered_cache.delete(key)
+            if memo is not None:
+                memo.pop(key, None)
+
+    delete()
+    transaction.on_commit(delete)
+
+
+def invalidate_model(model):
+    """
+    Invalidates every cached instance of the model, now and once the
+    current transaction commits
+    """
+
+    def replace():
+        tiered_cache.set(generation_key(model), uuid.uuid4().hex, GENERATION_TIMEOUT)
+
+    replace()
+    transaction.on_commit(replace)
+
+
+def invalidate_instance(sender, instance, **kwargs):
+    invalidate_objects(sender, [instance.pk])
+
+
+class ObjectCacheQuerySet(models.QuerySet):
+    """
+    Queryset invalidating the cached instances of the rows it updates or
+    deletes, at the cost of selecting up to `MAX_INVALIDATED_ROWS` of their
+    primary keys first
+    """
+
+    def changed_pks(self):
+        """
+        Returns the primary keys of the rows, or None when there are more
+        than `MAX_INVALIDATED_ROWS`
+        """
+        pks = list(
+            self.order_by().values_list("pk", flat=True)[: MAX_INVALIDATED_ROWS + 1]
+        )
+        return None if len(pks) > MAX_INVALIDATED_ROWS else pks
+
+    def invalidate(self, pks):
+        if pks is None:
+            invalidate_model(self.model)
+        else:
+            invalidate_objects(self.model, pks)
+
+    def update(self, **kwargs):
+        pks = self.changed_pks()
+        count = super().update(**kwargs)
+        self.invalidate(pks)
+        return count
+
+    update.alters_data = True
+
+    def delete(self):
+        pks = self.changed_pks()
+        result = super().delete()
+        self.invalidate(pks)
+        return result
+
+    delete.alters_data = True
+
+
+class ObjectCacheMixin:
+    """
+    Manager mixin caching the instances looked up by primary key. The
+    cached instances are those of `get_queryset`, so soft deleted rows
+    are never served.
+    """
+
+    _queryset_class = ObjectCacheQuerySet
+
+    def contribute_to_class(self, cls, name):
+        super().contribute_to_class(cls, name)
+        if not cls._meta.abstract:
+            post_save.connect(invalidate_instance, sender=cls, weak=False)
+            post_delete.connect(invalidate_instance, sender=cls, weak=False)
+
+    def get(self, *args, **kwargs):
+        if not args and len(kwargs) == 1:
+            name, value = next(iter(kwargs.items()))
+            if name in ("pk", self.model._meta.pk.attname):
+                return self.get_cached(value)
+        return super().get(*args, **kwargs)
+
+    def get_cached(self, pk):
+        """
+        Returns the instance with the primary key, raising `DoesNotExist`
+        when there is none. Missing rows are not cached, they are usually
+        created soon after being looked up.
+        """
+        pk = self.model._meta.pk.to_python(pk)
+        key = object_key(self.model, pk)
+        label = self.model._meta.label_lower
+        memo = request_memo.get()
+        if memo is not None and key in memo:
+            metrics.object_cache_lookups.inc(label, "memo")
+            return memo[key]
+
+        instance = tiered_cache.get(key)
+        if instance is None:
+            metrics.object_cache_lookups.inc(label, "miss")
+            instance = self.get_queryset().get(pk=pk)
+            tiered_cache.set(key, instance, settings.OBJECT_CACHE_TIMEOUT)
+        else:
+            metrics.object_cache_lookups.inc(label, "hit")
+        # The local tier is shared by the threads of the worker
+        instance = copy.copy(instance)
+        if memo is not None:
+            memo[key] = instance
+        return instance
+
+
+def get_cached_or_404(model, pk):
+    """
+    Returns the instance of the model with the primary key from the cache,
+    raising `Http404` when there is none
+    """
+    try:
+        return model._default_manager.get_cached(pk)
+    except (model.DoesNotExist, ValidationError):
+        raise Http404(f"No {model._meta.object_name} matches the given query.")
+
+
+class CachedObjectMixin:
+    """
+    Mixin of the single object views getting their object through the
+    object cache, restricted to those of the user when `owner_field` is set.
+    The requests changing the object get it from the database, as they
+    save it whole.
+    """
+
+    owner_field = None
+
+    def get_object(self, queryset=None):
+        pk = self.kwargs[self.pk_url_kwarg]
+        if self.request.method in ("GET", "HEAD"):
+            instance = get_cached_or_404(self.model, pk)
+        else:
+            instance = get_object_or_404(self.model._default_manager.all(), pk=pk)
+        if self.owner_field is not None and (
+            getattr(instance, f"{self.owner_field}_id") != self.request.user.pk
+        ):
+            raise Http404(f"No {self.model._meta.object_name} matches the given query.")
+        return instance
@@ -0,0 +1,132 @@
+"""
+Sampling profiler for individual requests.
+
+A profiled request is sampled by a background thread which reads the
+stack of the thread serving it every `PROFILER_INTERVAL` seconds with
+`sys._current_frames()`, so the views, templates and queries run at full
+speed and only pay for the sampling. The samples are written in the
+collapsed stack format, one `frame;frame;frame count` line per distinct
+stack, which flamegraph.pl, speedscope and inferno read as is.
+
+Requests are profiled when a staff member asks for it with the
+`X-Profile` header or the `profile` query parameter, or at random with
+the probability `PROFILER_SAMPLE_RATE`. Other requests only pay for
+checking the header, the parameter and a random number.
+"""
+
+import os
+import random
+import re
+import sys
+import threading
+from collections import Counter
+
+from django.conf import settings
+from django.utils import timezone
+
+REQUESTED = "requested"
+SAMPLED = "sampled"
+
+
+def frame_label(frame):
+    """
+    Returns the label of a frame, the function with its file relative to
+    the project and its first line
+    """
+    code = frame.f_code
+    filename = code.co_filename
+    if filename.startswith(str(settings.BASE_DIR)):
+        filename = os.path.relpath(filename, settings.BASE_DIR)
+    else:
+        # Installed packages are labelled from their site-packages directory
+        filename = filename.rpartition("site-packages" + os.sep)[2]
+    return f"{code.co_name} ({filename}:{code.co_firstlineno})"
+
+
+def collapse(frame):
+    """
+    Returns the stack of a frame in the collapsed format, outermost frame
+    first
+    """
+    labels = []
+    while frame is not None:
+        labels.append(frame_label(frame).replace(";", ":"))
+        frame = frame.f_back
+    return ";".join(reversed(labels))
+
+
+class StackSampler:
+    """
+    Thread counting the stacks of another thread, sampled at a fixed
+    interval until stopped
+    """
+
+    def __init__(self, thread_id, interval):
+        self.thread_id = thread_id
+        self.interval = interval
+        self.counts = Counter()
+        self._stopped = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="profiler", daemon=True)
+
+    def _run(self):
+        while not self._stopped.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            if frame is not None:
+                self.counts[collapse(frame)] += 1
+            del frame
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def stop(self):
+        """
+        Stops sampling and returns the count of each stack
+        """
+        self._stopped.set()
+        self._thread.join()
+        return self.counts
+
+
+def profile_reason(request):
+    """
+    Returns why the request is profiled, `REQUESTED` or `SAMPLED`, or None
+    when it is not. The user is only loaded when the request asks for a
+    profile.
+    """
+    if not settings.PROFILER_ENABLED:
+        return None
+    if "HTTP_X_PROFILE" in request.META or "profile" in request.GET:
+        user = getattr(request, "user", None)
+        if user is not None and user.is_staff:
+            return REQUESTED
+    rate = settings.PROFILER_SAMPLE_RATE
+    if rate > 0 and random.random() < rate:
+        return SAMPLED
+    return None
+
+
+def write_profile(counts, name):
+    """
+    Writes the stack counts in the collapsed format to a new file of
+    `PROFILER_DIR` and deletes the oldest files beyond
+    `PROFILER_MAX_FILES`. Returns the name of the file.
+    """
+    directory = settings.PROFILER_DIR
+    os.makedirs(directory, exist_ok=True)
+    name = re.sub(r"[^\w.-]", "_", name)
+    filename = f"{timezone.now():%Y%m%dT%H%M%S.%f}-{name}.folded"
+    with open(os.path.join(directory, filename), "w") as file:
+        for stack, count in counts.most_common():
+            file.write(f"{stack} {count}\n")
+
+    profiles = sorted(
+        entry for entry in os.listdir(directory) if entry.endswith(".folded")
+    )
+    for old in profiles[: -settings.PROFILER_MAX_FILES]:
+        try:
+            os.remove(os.path.join(directory, old))
+        except FileNotFoundError:
+            # Pruned by another worker
+            pass
+    return filename
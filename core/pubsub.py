@@ -0,0 +1,216 @@
+"""
+In-process publish/subscribe used to push live updates to clients.
+
+Subscribers are asyncio queues living in the worker's event loop, so an
+idle connection costs a queue and a suspended coroutine rather than a
+thread. Publishing goes through a pluggable transport which delivers the
+event to the subscribers of every worker:
+
+- `LocalTransport` only reaches the current process, enough for a single
+  worker or the development server
+- `UnixSocketTransport` sends a datagram to a socket bound by each worker
+  in a shared directory, for several workers on the same host
+"""
+
+import asyncio
+import glob
+import json
+import os
+import socket
+import threading
+from collections import defaultdict
+from contextlib import asynccontextmanager
+
+from django.conf import settings
+from django.utils.module_loading import import_string
+
+
+class SubscriberLimitReached(Exception):
+    """
+    Raised when the worker already serves the maximum number of subscribers
+    """
+
+
+class Subscription:
+    """
+    Bounded queue of the events of a topic. Events published while the
+    queue is full are dropped for this subscriber only.
+    """
+
+    def __init__(self, loop, maxsize):
+        self.loop = loop
+        self.queue = asyncio.Queue(maxsize)
+
+    def _put(self, event):
+        try:
+            self.queue.put_nowait(event)
+        except asyncio.QueueFull:
+            pass
+
+    def deliver(self, event):
+        """
+        Hands the event over to the subscriber's event loop, this may be
+        called from any thread
+        """
+        try:
+            self.loop.call_soon_threadsafe(self._put, event)
+        except RuntimeError:
+            # The loop is closed, the subscription is about to be removed
+            pass
+
+    async def get(self):
+        return await self.queue.get()
+
+
+class LocalTransport:
+    """
+    Delivers events to the subscribers of the current process only
+    """
+
+    def __init__(self, broker):
+        self.broker = broker
+
+    def start(self, loop):
+        pass
+
+    def publish(self, topic, event):
+        self.broker.dispatch(topic, event)
+
+
+class UnixSocketTransport:
+    """
+    Delivers events to every worker of the host. Each worker binds a
+    datagram socket named after its pid in `LIVE_UPDATES_SOCKET_DIR` once it
+    has subscribers, and publishing sends the event to every socket found
+    there.
+    """
+
+    def __init__(self, broker, directory=None):
+        self.broker = broker
+        self.directory = directory or settings.LIVE_UPDATES_SOCKET_DIR
+        self.receiver = None
+        self.sender = socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM)
+        self.sender.setblocking(False)
+        self._lock = threading.Lock()
+
+    @property
+    def path(self):
+        return os.path.join(self.directory, f"{os.getpid()}.sock")
+
+    def start(self, loop):
+        """
+        Binds the socket of this worker and reads it from the event loop
+        """
+        with self._lock:
+            if self.receiver is not None:
+                return
+            os.makedirs(self.directory, exist_ok=True)
+            if os.path.exists(self.path):
+                os.unlink(self.path)
+            receiver = socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM)
+            receiver.bind(self.path)
+            receiver.setblocking(False)
+            loop.add_reader(receiver, self._receive)
+            self.receiver = receiver
+
+    def _receive(self):
+        while True:
+            try:
+                data = self.receiver.recv(65536)
+            except BlockingIOError:
+                return
+            topic, event = json.loads(data)
+            self.broker.dispatch(topic, event)
+
+    def publish(self, topic, event):
+        payload = json.dumps([topic, event]).encode()
+        for path in glob.glob(os.path.join(self.directory, "*.sock")):
+            try:
+                self.sender.sendto(payload, path)
+            except (ConnectionRefusedError, FileNotFoundError):
+                # The worker that bound this socket is gone
+                try:
+                    os.unlink(path)
+                except FileNotFoundError:
+                    pass
+            except BlockingIOError:
+                # The worker is not keeping up, it misses this event
+                pass
+
+
+class Broker:
+    """
+    Keeps the subscribers of each topic and publishes through the transport
+    configured by `LIVE_UPDATES_TRANSPORT`
+    """
+
+    def __init__(self):
+        self._subscribers = defaultdict(set)
+        self._lock = threading.Lock()
+        self._transport = None
+        self.subscriber_count = 0
+
+    @property
+    def transport(self):
+        if self._transport is None:
+            self._transport = import_string(settings.LIVE_UPDATES_TRANSPORT)(self)
+        return self._transport
+
+    def publish(self, topic, event):
+        """
+        Publishes a JSON serializable event to the subscribers of the topic
+        in every worker
+        """
+        self.transport.publish(topic, event)
+
+    def dispatch(self, topic, event):
+        """
+        Delivers an event to the subscribers of the topic in this worker
+        """
+        with self._lock:
+            subscribers = list(self._subscribers.get(topic, ()))
+        for subscription in subscribers:
+            subscription.deliver(event)
+
+    def add_subscriber(self, topic):
+        """
+        Subscribes to a topic from the running event loop, until
+        `remove_subscriber` is called
+        """
+        loop = asyncio.get_running_loop()
+        self.transport.start(loop)
+        subscription = Subscription(loop, settings.LIVE_UPDATES_QUEUE_SIZE)
+        with self._lock:
+            if self.subscriber_count >= settings.LIVE_UPDATES_MAX_SUBSCRIBERS:
+                raise SubscriberLimitReached
+            self._subscribers[topic].add(subscription)
+            self.subscriber_count += 1
+        return subscription
+
+    def remove_subscriber(self, topic, subscription):
+        """
+        Ends a subscription, this may be called from any thread and more
+        than once
+        """
+        with self._lock:
+            subscribers = self._subscribers.get(topic)
+            if not subscribers or subscription not in subscribers:
+                return
+            subscribers.discard(subscription)
+            self.subscriber_count -= 1
+            if not subscribers:
+                del self._subscribers[topic]
+
+    @asynccontextmanager
+    async def subscribe(self, topic):
+        """
+        Subscribes to a topic for the duration of the block
+        """
+        subscription = self.add_subscriber(topic)
+        try:
+            yield subscription
+        finally:
+            self.remove_subscriber(topic, subscription)
+
+
+broker = Broker()
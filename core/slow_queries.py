@@ -0,0 +1,230 @@
+"""
+Log of the slow database queries.
+
+Queries of the requests lasting `SLOW_QUERY_THRESHOLD` seconds or more
+are handed to a background thread, so the request only pays for timing
+them. The thread normalizes them into a fingerprint, the shape of the
+query without its values, and appends them to the JSON lines log
+`SLOW_QUERY_LOG` along with the view which ran them. The first time a
+fingerprint is seen, and again every `SLOW_QUERY_EXPLAIN_INTERVAL`
+seconds, the plan of the query is captured with `EXPLAIN` and logged
+too.
+
+`python manage.py report_slow_queries` aggregates the log into counts
+and latency percentiles per fingerprint.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import re
+import threading
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.db import DatabaseError, connections
+
+logger = logging.getLogger(__name__)
+
+slow_query_executor = ThreadPoolExecutor(
+    max_workers=1, thread_name_prefix="slow-queries"
+)
+
+STRING_PATTERN = re.compile(r"'(?:[^']|'')*'")
+NUMBER_PATTERN = re.compile(r"(?<![\w\"])-?\d+(?:\.\d+)?\b")
+LIST_PATTERN = re.compile(r"\(\s*(?:\?|%s)(?:\s*,\s*(?:\?|%s))*\s*\)")
+# Savepoints are named after the thread and a counter
+SAVEPOINT_PATTERN = re.compile(r'"s\d+_x\d+"')
+SPACE_PATTERN = re.compile(r"\s+")
+
+
+def normalize(sql):
+    """
+    Returns the shape of the query: values replaced by `?`, lists of values
+    collapsed to `(...)` and whitespace collapsed
+    """
+    sql = STRING_PATTERN.sub("?", sql)
+    sql = SAVEPOINT_PATTERN.sub("?", sql)
+    sql = NUMBER_PATTERN.sub("?", sql)
+    sql = LIST_PATTERN.sub("(...)", sql)
+    return SPACE_PATTERN.sub(" ", sql).strip()
+
+
+def fingerprint(sql):
+    """
+    Returns a short digest of the shape of the query
+    """
+    return hashlib.md5(normalize(sql).encode()).hexdigest()[:16]
+
+
+class SlowQueryLog:
+    """
+    Appends the slow queries and their plans to the log, from the
+    background thread only
+    """
+
+    def __init__(self):
+        self.explained_at = {}
+        self._lock = threading.Lock()
+
+    def write(self, records):
+        path = settings.SLOW_QUERY_LOG
+        with self._lock:
+            try:
+                if os.path.getsize(path) >= settings.SLOW_QUERY_LOG_MAX_BYTES:
+                    # Workers may rotate it at once, losing a few lines
+                    os.replace(path, f"{path}.1")
+            except FileNotFoundError:
+                pass
+            # Appended with a single write so the workers sharing the log
+            # do not mix their lines up
+            with open(path, "a") as file:
+                file.write("".join(json.dumps(record) + "\n" for record in records))
+
+    def explain(self, alias, sql, params):
+        """
+        Returns the plan of a SELECT query as text, or None when it cannot
+        be explained
+        """
+        if not sql.lstrip().upper().startswith(("SELECT", "WITH")):
+            return None
+        connection = connections[alias]
+        try:
+            with connection.cursor() as cursor:
+                cursor.execute(f"{connection.ops.explain_query_prefix()} {sql}", params)
+                return "\n".join(
+                    " ".join(str(column) for column in row) for row in cursor.fetchall()
+                )
+        except DatabaseError:
+            logger.warning("Cannot explain the slow query %s", sql, exc_info=True)
+            return None
+        finally:
+            # The thread keeps running, its connection must not be left open
+            connection.close()
+
+    def record(self, alias, sql, params, duration, view, started_at):
+        digest = fingerprint(sql)
+        records = [
+            {
+                "type": "query",
+                "time": started_at,
+                "fingerprint": digest,
+                "view": view,
+                "duration": duration,
+                "sql": normalize(sql),
+            }
+        ]
+        explained_at = self.explained_at.get(digest, 0)
+        if time.time() - explained_at >= settings.SLOW_QUERY_EXPLAIN_INTERVAL:
+            self.explained_at[digest] = time.time()
+            plan = self.explain(alias, sql, params)
+            if plan is not None:
+                records.append(
+                    {
+                        "type": "plan",
+                        "time": started_at,
+                        "fingerprint": digest,
+                        "plan": plan,
+                    }
+                )
+        self.write(records)
+
+    def record_in_background(self, *args):
+        try:
+            self.record(*args)
+        except Exception:
+            logger.exception("Cannot log the slow query")
+
+
+slow_query_log = SlowQueryLog()
+
+
+def slow_query_recorder(view_name):
+    """
+    Returns an execute wrapper timing the queries and logging the slow
+    ones, `view_name` returning the name of the view running them
+    """
+    threshold = settings.SLOW_QUERY_THRESHOLD
+
+    def record_slow_queries(execute, sql, params, many, context):
+        started_at = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            duration = time.perf_counter() - started_at
+            if duration >= threshold and not many:
+                slow_query_executor.submit(
+                    slow_query_log.record_in_background,
+                    context["connection"].alias,
+                    sql,
+                    params,
+                    duration,
+                    view_name(),
+                    time.time() - duration,
+                )
+
+    return record_slow_queries
+
+
+def read_log(path):
+    """
+    Yields the records of the log and of its rotated file, skipping the
+    lines cut by a crash
+    """
+    for name in (f"{path}.1", path):
+        try:
+            file = open(name)
+        except FileNotFoundError:
+            continue
+        with file:
+            for line in file:
+                try:
+                    yield json.loads(line)
+                except ValueError:
+                    continue
+
+
+def percentile(values, ratio):
+    """
+    Returns the value below which `ratio` of the sorted values fall
+    """
+    return values[min(int(len(values) * ratio), len(values) - 1)]
+
+
+def aggregate(records, since=None, view=None):
+    """
+    Returns the statistics of each fingerprint of the records, the ones
+    taking the most time overall first
+    """
+    queries = {}
+    plans = {}
+    for record in records:
+        if since is not None and record["time"] < since:
+            continue
+        if record["type"] == "plan":
+            plans[record["fingerprint"]] = record["plan"]
+        elif view is None or record["view"] == view:
+            queries.setdefault(record["fingerprint"], []).append(record)
+
+    statistics = []
+    for digest, group in queries.items():
+        durations = sorted(record["duration"] for record in group)
+        statistics.append(
+            {
+                "fingerprint": digest,
+                "count": len(durations),
+                "total": sum(durations),
+                "p50": percentile(durations, 0.5),
+                "p95": percentile(durations, 0.95),
+                "p99": percentile(durations, 0.99),
+                "max": durations[-1],
+                "views": Counter(record["view"] for record in group),
+                "sql": group[-1]["sql"],
+                "plan": plans.get(digest),
+            }
+        )
+    statistics.sort(key=lambda entry: entry["total"], reverse=True)
+    return statistics
@@ -0,0 +1,13 @@
+"""
+SQLite database backend for several worker processes writing at once.
+
+Every connection is tuned by the pragmas of `SQLITE_PRAGMAS` and starts
+its transactions with `BEGIN IMMEDIATE`, so a transaction that will write
+takes the write lock upfront instead of failing with "database is locked"
+when it upgrades its read lock. On top of that the writes are serialised
+by a writer lock, shared by the threads of a worker through a mutex and
+by the workers through an advisory lock on a file next to the database:
+writers queue on the lock instead of polling SQLite's busy handler.
+
+    DATABASES = {"default": {"ENGINE": "core.sqlite", ...}}
+"""
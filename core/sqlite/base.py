@@ -0,0 +1,152 @@
+import os
+import threading
+import time
+
+from django.db import OperationalError
+from django.db.backends.sqlite3 import base
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover
+    # Without advisory locks only the threads of a worker are serialised
+    fcntl = None
+
+WRITE_STATEMENTS = frozenset(
+    ["INSERT", "UPDATE", "DELETE", "REPLACE", "CREATE", "DROP", "ALTER"]
+)
+
+
+class WriterLock:
+    """
+    Lock held by the connection writing to a database, across the threads
+    of the process and, when `path` is given, across the processes
+    """
+
+    def __init__(self, path=None):
+        self.path = path
+        self._reset()
+
+    def _reset(self):
+        self._pid = os.getpid()
+        self._mutex = threading.Lock()
+        self._file = None
+
+    def acquire(self, timeout):
+        # Forked workers must not share the mutex nor the open file, whose
+        # advisory lock would be shared with the parent
+        if self._pid != os.getpid():
+            self._reset()
+        deadline = time.monotonic() + timeout
+        if not self._mutex.acquire(timeout=timeout):
+            raise OperationalError("database is locked")
+        if self.path is None or fcntl is None:
+            return
+        try:
+            self._lock_file(deadline)
+        except BaseException:
+            self._mutex.release()
+            raise
+
+    def _lock_file(self, deadline):
+        if self._file is None:
+            self._file = open(self.path, "a")
+        delay = 0.0005
+        while True:
+            try:
+                fcntl.flock(self._file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                return
+            except BlockingIOError:
+                if time.monotonic() >= deadline:
+                    raise OperationalError("database is locked")
+                time.sleep(delay)
+                delay = min(delay * 2, 0.01)
+
+    def release(self):
+        if self.path is not None and fcntl is not None:
+            fcntl.flock(self._file, fcntl.LOCK_UN)
+        self._mutex.release()
+
+
+writer_locks = {}
+writer_locks_lock = threading.Lock()
+
+
+def writer_lock_for(path):
+    with writer_locks_lock:
+        if path not in writer_locks:
+            writer_locks[path] = WriterLock(path and f"{path}-writer.lock")
+        return writer_locks[path]
+
+
+class DatabaseWrapper(base.DatabaseWrapper):
+    """
+    SQLite connection taking the writer lock around its transactions and
+    its writes made in autocommit mode
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.holds_writer_lock = False
+        self.execute_wrappers.append(self.serialize_writes)
+
+    @property
+    def writer_lock(self):
+        # Connections to an in-memory database are all in this process
+        if self.is_in_memory_db():
+            return writer_lock_for(None)
+        return writer_lock_for(os.path.abspath(self.settings_dict["NAME"]))
+
+    def acquire_writer_lock(self):
+        if not self.holds_writer_lock:
+            self.writer_lock.acquire(self.settings_dict["OPTIONS"].get("timeout", 5))
+            self.holds_writer_lock = True
+
+    def release_writer_lock(self):
+        if self.holds_writer_lock:
+            self.holds_writer_lock = False
+            self.writer_lock.release()
+
+    def serialize_writes(self, execute, sql, params, many, context):
+        """
+        Execute wrapper taking the writer lock around the writes made
+        outside of a transaction
+        """
+        words = sql.split(None, 1)
+        if (
+            self.holds_writer_lock
+            or not words
+            or words[0].upper() not in WRITE_STATEMENTS
+        ):
+            return execute(sql, params, many, context)
+        self.acquire_writer_lock()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            if self.get_autocommit():
+                self.release_writer_lock()
+
+    def _start_transaction_under_autocommit(self):
+        self.acquire_writer_lock()
+        try:
+            super()._start_transaction_under_autocommit()
+        except BaseException:
+            self.release_writer_lock()
+            raise
+
+    def _commit(self):
+        try:
+            super()._commit()
+        finally:
+            self.release_writer_lock()
+
+    def _rollback(self):
+        try:
+            super()._rollback()
+        finally:
+            self.release_writer_lock()
+
+    def _close(self):
+        try:
+            super()._close()
+        finally:
+            self.release_writer_lock()
@@ -0,0 +1,201 @@
+"""
+Serving of stale pages while the database is unavailable.
+
+Read views keep the last rendering served to anonymous visitors in the
+`stale` cache, which does not depend on the database. When a query
+fails with an operational error and a new connection cannot query the
+database either, the worker marks the database as down,
+serves those renderings with a read-only banner, and probes the database
+in a background thread. Until the probe succeeds requests go straight to
+the stale renderings instead of waiting on connection timeouts; once it
+does, the next requests render fresh pages and replace them.
+"""
+
+import hashlib
+import logging
+import threading
+import time
+
+from django.conf import settings
+from django.contrib.messages.storage.cookie import CookieStorage
+from django.core.cache import caches
+from django.db import DatabaseError, InterfaceError, OperationalError, connection
+from django.http import HttpResponse
+from django.utils import timezone
+
+logger = logging.getLogger(__name__)
+
+BANNER_MARKER = b"<!-- stale-banner -->"
+BANNER = """
+<div class="alert alert-warning">
+    The site is read-only for a moment, this page was saved at {saved_at}.
+    Posting is disabled until the database is back.
+</div>
+<script>
+document.addEventListener('DOMContentLoaded', function () {{
+    document.querySelectorAll('form[method="post"]').forEach(function (form) {{
+        form.querySelectorAll('input, textarea, select, button').forEach(function (element) {{
+            element.disabled = true;
+        }});
+    }});
+}});
+</script>
+"""
+
+
+class DatabaseHealth:
+    """
+    Whether the database of this worker is reachable, probed in the
+    background after a connection error
+    """
+
+    def __init__(self):
+        self.down_since = None
+        self._lock = threading.Lock()
+        self._probe = None
+
+    @property
+    def is_down(self):
+        return self.down_since is not None
+
+    def mark_down(self):
+        with self._lock:
+            if self.down_since is None:
+                logger.warning("The database is unavailable, serving stale pages")
+                self.down_since = time.monotonic()
+            if self._probe is None or not self._probe.is_alive():
+                self._probe = threading.Thread(
+                    target=self.probe, name="database-probe", daemon=True
+                )
+                self._probe.start()
+
+    def mark_up(self):
+        with self._lock:
+            if self.down_since is not None:
+                logger.warning("The database is available again")
+            self.down_since = None
+
+    def check(self):
+        """
+        Returns whether a query succeeds, marking the database up if so
+        """
+        try:
+            connection.ensure_connection()
+            with connection.cursor() as cursor:
+                cursor.execute("SELECT 1")
+        except DatabaseError:
+            return False
+        finally:
+            connection.close()
+        self.mark_up()
+        return True
+
+    def reachable(self):
+        """
+        Returns whether a new connection queries the database, checked in
+        another thread so the connection of the caller is left as is. Tells
+        the connection failures apart from the errors of a single query,
+        such as a locked database or a statement timeout.
+        """
+        result = []
+        thread = threading.Thread(
+            target=lambda: result.append(self.check()), name="database-check"
+        )
+        thread.start()
+        thread.join()
+        return result[0]
+
+    def probe(self):
+        while self.is_down:
+            time.sleep(settings.STALE_PROBE_INTERVAL)
+            if self.check():
+                return
+
+
+database_health = DatabaseHealth()
+
+# Times this worker last stored the rendering of each page
+last_stored = {}
+
+
+def stale_key(request):
+    path = request.get_full_path().encode()
+    return f"stale:{hashlib.md5(path).hexdigest()}"
+
+
+def is_cacheable(request):
+    """
+    Returns whether the page rendered for the request is the same for
+    every visitor: no session, hence anonymous, and no pending messages
+    """
+    return (
+        request.method == "GET"
+        and settings.SESSION_COOKIE_NAME not in request.COOKIES
+        and CookieStorage.cookie_name not in request.COOKIES
+    )
+
+
+class StaleFallbackMixin:
+    """
+    Mixin for read views serving the last anonymous rendering of the page
+    when the database is unavailable
+    """
+
+    # Seconds between two writes of the rendering of a page by a worker
+    stale_refresh_interval = 60
+
+    def dispatch(self, request, *args, **kwargs):
+        if request.method == "GET" and database_health.is_down:
+            return self.stale_response(request)
+        try:
+            response = super().dispatch(request, *args, **kwargs)
+            if hasattr(response, "render"):
+                response.render()
+        except (OperationalError, InterfaceError):
+            if request.method != "GET" or database_health.reachable():
+                raise
+            database_health.mark_down()
+            return self.stale_response(request)
+        if response.status_code == 200 and is_cacheable(request):
+            self.store(request, response)
+        return response
+
+    def store(self, request, response):
+        key = stale_key(request)
+        stored_at = last_stored.get(key, 0)
+        now = time.monotonic()
+        if now - stored_at < self.stale_refresh_interval:
+            return
+        last_stored[key] = now
+        if len(last_stored) > settings.STALE_MAX_PAGES:
+            last_stored.clear()
+        caches["stale"].set(
+            key,
+            (response.content, response["Content-Type"], timezone.now()),
+            settings.STALE_TIMEOUT,
+        )
+
+    def stale_response(self, request):
+        try:
+            stored = caches["stale"].get(stale_key(request))
+        except Exception:
+            logger.exception("Cannot read the stale cache")
+            stored = None
+        if stored is None:
+            response = HttpResponse(
+                "The site is temporarily unavailable, please retry later.",
+                status=503,
+                content_type="text/plain",
+            )
+            response["Retry-After"] = settings.STALE_PROBE_INTERVAL
+            return response
+
+        content, content_type, saved_at = stored
+        banner = BANNER.format(saved_at=timezone.localtime(saved_at).strftime("%H:%M"))
+        response = HttpResponse(
+            content.replace(BANNER_MARKER, banner.encode(), 1),
+            content_type=content_type,
+        )
+        response["Cache-Control"] = "no-store"
+        response["X-Stale"] = "1"
+        return response
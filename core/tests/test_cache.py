@@ -0,0 +1,145 @@
+import threading
+import time
+from unittest import mock
+
+from django.test import SimpleTestCase
+
+from core.cache import CacheEntry, LocalLRUCache, TieredCache, cached
+
+
+class LocalLRUCacheTestCase(SimpleTestCase):
+    def test_evicts_least_recently_used(self):
+        """
+        To make sure that the least recently used entry is evicted first
+        """
+        cache = LocalLRUCache(max_entries=2)
+        entry = CacheEntry("value", 0, time.time() + 60)
+        cache.set("a", entry, 60)
+        cache.set("b", entry, 60)
+        cache.get("a")
+        cache.set("c", entry, 60)
+        self.assertIsNotNone(cache.get("a"))
+        self.assertIsNone(cache.get("b"))
+
+    def test_local_timeout(self):
+        """
+        To make sure that local entries expire after the local timeout
+        """
+        cache = LocalLRUCache(max_entries=2)
+        cache.set("a", CacheEntry("value", 0, time.time() + 60), -1)
+        self.assertIsNone(cache.get("a"))
+
+
+class TieredCacheTestCase(SimpleTestCase):
+    def setUp(self):
+        self.cache = TieredCache(local_max_entries=10, local_timeout=60)
+        self.cache.clear()
+
+    def test_read_through(self):
+        """
+        To make sure that a value is computed once and then served from the
+        local tier, then from the shared tier in another process
+        """
+        compute = mock.Mock(return_value="value")
+        self.assertEqual(self.cache.get_or_set("key", compute, 60), "value")
+        self.assertEqual(self.cache.get_or_set("key", compute, 60), "value")
+        compute.assert_called_once()
+        self.assertEqual(self.cache.stats["local_hits"], 1)
+
+        self.cache.local.clear()
+        self.assertEqual(self.cache.get_or_set("key", compute, 60), "value")
+        compute.assert_called_once()
+        self.assertEqual(self.cache.stats["shared_hits"], 1)
+
+    def test_single_flight(self):
+        """
+        To make sure that concurrent misses compute the value only once
+        """
+        calls = []
+
+        def compute():
+            calls.append(1)
+            time.sleep(0.05)
+            return "value"
+
+        threads = [
+            threading.Thread(target=self.cache.get_or_set, args=("key", compute, 60))
+            for _ in range(5)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(self.cache._locks, {})
+
+    def test_stale_served_while_recomputing(self):
+        """
+        To make sure that an expired value is served while another worker
+        recomputes it
+        """
+        self.cache.shared.set(
+            self.cache.shared_key("key"), CacheEntry("old", 0, time.time() - 1), 60
+        )
+        self.cache.shared.add(self.cache.shared_key("key:lock"), "other", 10)
+        compute = mock.Mock(return_value="new")
+        self.assertEqual(self.cache.get_or_set("key", compute, 60), "old")
+        compute.assert_not_called()
+
+    def test_lock_of_other_worker_kept(self):
+        """
+        To make sure that a worker giving up waiting for another one
+        computes the value without releasing the lock of the other one
+        """
+        lock_key = self.cache.shared_key("key:lock")
+        self.cache.shared.add(lock_key, "other", 10)
+        self.cache.lock_timeout = 0
+        compute = mock.Mock(return_value="value")
+        self.assertEqual(self.cache.get_or_set("key", compute, 60), "value")
+        compute.assert_called_once()
+        self.assertEqual(self.cache.shared.get(lock_key), "other")
+        self.assertEqual(self.cache._locks, {})
+
+    def test_clear(self):
+        """
+        To make sure that clearing forgets the entries without touching the
+        other keys of the shared backend
+        """
+        self.cache.shared.set("other", "value")
+        compute = mock.Mock(return_value="value")
+        self.cache.get_or_set("key", compute, 60)
+        self.cache.clear()
+        self.cache.get_or_set("key", compute, 60)
+        self.assertEqual(compute.call_count, 2)
+        self.assertEqual(self.cache.shared.get("other"), "value")
+
+    def test_early_expiry(self):
+        """
+        To make sure that entries that are slow to compute are refreshed
+        before they expire
+        """
+        entry = CacheEntry("value", delta=10, expires_at=time.time() + 1)
+        with mock.patch("core.cache.random.random", return_value=0.5):
+            self.assertFalse(self.cache.is_fresh(entry))
+        entry = CacheEntry("value", delta=0.001, expires_at=time.time() + 60)
+        self.assertTrue(self.cache.is_fresh(entry))
+
+    def test_cached_decorator(self):
+        """
+        To make sure that the decorator caches per arguments and can be
+        invalidated
+        """
+        calls = []
+
+        @cached(timeout=60, cache=self.cache)
+        def double(value):
+            calls.append(value)
+            return value * 2
+
+        self.assertEqual(double(2), 4)
+        self.assertEqual(double(2), 4)
+        self.assertEqual(double(3), 6)
+        self.assertEqual(calls, [2, 3])
+        double.invalidate(2)
+        double(2)
+        self.assertEqual(calls, [2, 3, 2])
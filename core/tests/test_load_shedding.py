@@ -0,0 +1,109 @@
+import time
+
+from django.conf import settings
+from django.test import override_settings
+from django.urls import reverse
+
+from core.base_test import BaseTestCase
+from core.middleware import queue_time
+
+
+class LoadSheddingTestCase(BaseTestCase):
+    def assert_shed(self, response):
+        self.assertEqual(response.status_code, 503)
+        self.assertEqual(
+            response["Retry-After"], str(settings.LOAD_SHEDDING_RETRY_AFTER)
+        )
+
+    @override_settings(LOAD_SHEDDING_SOFT_IN_FLIGHT=0)
+    def test_sheds_low_priority(self):
+        """
+        To make sure that crawlers and anonymous deep pagination are refused
+        above the soft limit while other requests are served
+        """
+        self.assert_shed(
+            self.client.get(reverse("home"), headers={"User-Agent": "Googlebot/2.1"})
+        )
+        self.assert_shed(self.make_get_request(reverse("home"), {"page": 50}))
+        self.assertEqual(self.make_get_request(reverse("home")).status_code, 200)
+
+        self.authenticate()
+        response = self.make_get_request(reverse("home"), {"page": 50})
+        self.assertNotEqual(response.status_code, 503)
+
+    @override_settings(LOAD_SHEDDING_HARD_IN_FLIGHT=0)
+    def test_sheds_everything_but_exempt(self):
+        """
+        To make sure that above the hard limit only health checks and
+        writes of logged in users are served
+        """
+        self.assert_shed(self.make_get_request(reverse("home")))
+        self.assertEqual(
+            self.make_get_request(reverse("health_check")).status_code, 200
+        )
+
+        self.authenticate()
+        self.assert_shed(self.make_get_request(reverse("create_question")))
+        response = self.make_post_request(
+            reverse("create_question"),
+            {"title": self.faker.sentence(), "content": self.faker.paragraph()},
+        )
+        self.assertEqual(response.status_code, 302)
+
+    @override_settings(LOAD_SHEDDING_HARD_IN_FLIGHT=0)
+    def test_forged_session_cookie(self):
+        """
+        To make sure that writes are exempt only with a cookie shaped like a
+        session key and never for crawlers
+        """
+        url = reverse("create_question")
+        self.client.cookies[settings.SESSION_COOKIE_NAME] = "forged"
+        self.assert_shed(self.client.post(url))
+
+        self.client.cookies[settings.SESSION_COOKIE_NAME] = "a" * 32
+        self.assertNotEqual(self.client.post(url).status_code, 503)
+        self.assert_shed(self.client.post(url, headers={"User-Agent": "Googlebot/2.1"}))
+
+    @override_settings(LOAD_SHEDDING_SOFT_IN_FLIGHT=0)
+    def test_forged_session_cookie_deep_page(self):
+        """
+        To make sure that a cookie not shaped like a session key does not
+        lift the shedding of deep pages
+        """
+        self.client.cookies[settings.SESSION_COOKIE_NAME] = "forged"
+        self.assert_shed(self.make_get_request(reverse("home"), {"page": 50}))
+
+    @override_settings(LOAD_SHEDDING_HARD_QUEUE_SECONDS=2)
+    def test_queue_time(self):
+        """
+        To make sure that requests which waited too long in the queue are
+        refused
+        """
+        started_at = int((time.time() - 3) * 1000)
+        self.assert_shed(
+            self.client.get(
+                reverse("home"), headers={"X-Request-Start": f"t={started_at}"}
+            )
+        )
+        self.assertEqual(
+            self.client.get(
+                reverse("home"), headers={"X-Request-Start": f"t={time.time()}"}
+            ).status_code,
+            200,
+        )
+
+    def test_parse_queue_time(self):
+        """
+        To make sure that the request start is read in seconds, milliseconds
+        and microseconds
+        """
+        now = time.time()
+        for header in (
+            f"t={now - 1}",
+            str(int((now - 1) * 1e3)),
+            str(int((now - 1) * 1e6)),
+        ):
+            request = self.client.get(
+                reverse("health_check"), headers={"X-Request-Start": header}
+            ).wsgi_request
+            self.assertAlmostEqual(queue_time(request), 1, delta=0.5)
@@ -0,0 +1,48 @@
+from django.test import SimpleTestCase
+
+from core.markdown import make_excerpt, render_markdown
+
+
+class RenderMarkdownTestCase(SimpleTestCase):
+    def test_markdown(self):
+        """
+        To make sure that the supported Markdown is rendered
+        """
+        rendered = render_markdown(
+            "# Title\n\nSome **bold** and *italic* `code`\n\n- one\n- two\n\n"
+            "```\nprint(1)\n```\n\n[docs](https://example.com/?a=1&b=2)"
+        )
+        self.assertIn("<h3>Title</h3>", rendered)
+        self.assertIn(
+            "<p>Some <strong>bold</strong> and <em>italic</em> <code>code</code></p>",
+            rendered,
+        )
+        self.assertIn("<ul><li>one</li>\n<li>two</li></ul>", rendered)
+        self.assertIn("<pre><code>print(1)</code></pre>", rendered)
+        self.assertIn(
+            '<a href="https://example.com/?a=1&amp;b=2" rel="nofollow noopener">docs</a>',
+            rendered,
+        )
+
+    def test_sanitized(self):
+        """
+        To make sure that HTML and script links in the content are not
+        rendered
+        """
+        rendered = render_markdown(
+            '<script>alert(1)</script> [x](javascript:alert(1)) `<b onclick="x">`'
+        )
+        self.assertNotIn("<script>", rendered)
+        self.assertNotIn("<b ", rendered)
+        self.assertNotIn('href="javascript', rendered)
+        self.assertIn("&lt;script&gt;", rendered)
+
+    def test_excerpt(self):
+        """
+        To make sure that the excerpt is the plain text of the first words
+        """
+        rendered = render_markdown("# Hello\n\n**Tom &amp; Jerry** " + "word " * 60)
+        excerpt = make_excerpt(rendered)
+        self.assertTrue(excerpt.startswith("Hello Tom &amp; Jerry word"))
+        self.assertEqual(len(excerpt.split()), 50)
+        self.assertTrue(excerpt.endswith("…"))
@@ -0,0 +1,99 @@
+import json
+import os
+import tempfile
+from unittest import mock
+
+from django.test import override_settings
+from django.urls import reverse
+
+from core import metrics
+from core.base_test import BaseTestCase
+from qnasite import views
+
+
+class MetricsTestCase(BaseTestCase):
+    def setUp(self):
+        super().setUp()
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.directory = directory.name
+        settings_override = override_settings(METRICS_DIR=self.directory)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+    def test_request_metrics(self):
+        """
+        To make sure that the requests are measured per URL name
+        """
+        self.make_get_request(reverse("home"))
+        response = self.make_get_request(reverse("metrics"))
+        self.assertEqual(response.status_code, 200)
+        content = response.content.decode()
+        self.assertIn(
+            'http_request_duration_seconds_count{view="home",method="GET"}', content
+        )
+        self.assertIn('db_queries_total{view="home"}', content)
+        self.assertIn("http_requests_in_flight", content)
+
+    def test_merges_workers(self):
+        """
+        To make sure that counters of every worker are summed up and gauges
+        of dead workers are ignored
+        """
+        dead_pid = 999999999
+        with open(os.path.join(self.directory, f"{dead_pid}.json"), "w") as file:
+            json.dump(
+                {
+                    "db_queries_total": [[["worker_view"], 5]],
+                    "http_requests_in_flight": [[[], 7]],
+                },
+                file,
+            )
+        metrics.db_queries.inc("worker_view", amount=2)
+        self.addCleanup(metrics.db_queries.values.pop, ("worker_view",))
+
+        metrics.registry.write(force=True)
+        merged = metrics.registry.merge()
+        self.assertEqual(merged["db_queries_total"][("worker_view",)], 7)
+        self.assertNotEqual(merged["http_requests_in_flight"][()], 7)
+
+    def test_prune(self):
+        """
+        To make sure that the snapshots of the dead workers are removed and
+        those of the live ones kept
+        """
+        dead_path = os.path.join(self.directory, "999999999.json")
+        with open(dead_path, "w") as file:
+            json.dump({"db_queries_total": [[["worker_view"], 5]]}, file)
+        metrics.registry.write(force=True)
+        self.assertEqual(metrics.registry.prune(), 1)
+        self.assertFalse(os.path.exists(dead_path))
+        self.assertEqual(
+            [pid for pid, _, _ in metrics.registry.read_all()], [os.getpid()]
+        )
+
+
+class ReadinessCheckTestCase(BaseTestCase):
+    def test_ready(self):
+        """
+        To make sure that the readiness check reports the latency of the
+        database and the cache
+        """
+        response = self.make_get_request(reverse("readiness_check"))
+        self.assertEqual(response.status_code, 200)
+        checks = response.json()["checks"]
+        self.assertEqual(checks["database"]["status"], "ok")
+        self.assertIn("latency_ms", checks["cache"])
+
+    def test_unavailable(self):
+        """
+        To make sure that a failing dependency makes the check fail
+        """
+
+        def failing_check():
+            raise ConnectionError("Connection refused")
+
+        with mock.patch.dict(views.ReadinessCheckView.checks, database=failing_check):
+            response = self.make_get_request(reverse("readiness_check"))
+        self.assertEqual(response.status_code, 503)
+        self.assertEqual(response.json()["checks"]["database"]["status"], "error")
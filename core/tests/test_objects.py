@@ -0,0 +1,145 @@
+from unittest import mock
+
+from django.urls import reverse
+
+from accounts.models import User
+from core.base_test import BaseTestCase
+from core.objects import request_memo
+from qna.models import Answer, Question
+
+
+class ObjectCacheTestCase(BaseTestCase):
+    def setUp(self):
+        super().setUp()
+        self.user = self.create_user()
+        self.question = Question.objects.create(
+            title=self.faker.sentence(), content="Content", author=self.user
+        )
+        self.answer = Answer.objects.create(
+            content="Answer", author=self.create_user(), question=self.question
+        )
+
+    def test_read_through(self):
+        """
+        To make sure that lookups by primary key through the manager are
+        served from the cache after the first one
+        """
+        with self.assertNumQueries(1):
+            question = Question.objects.get_cached(self.question.pk)
+            self.assertEqual(Question.objects.get(pk=self.question.pk), question)
+            self.assertEqual(Question.objects.get(id=str(self.question.pk)), question)
+        # Each lookup returns its own copy
+        question.title = "Changed"
+        self.assertNotEqual(Question.objects.get_cached(question.pk).title, "Changed")
+
+        with self.assertNumQueries(1):
+            with self.assertRaises(Question.DoesNotExist):
+                Question.objects.get_cached(0)
+        with self.assertNumQueries(1):
+            Question.objects.get(pk=self.question.pk, author=self.user)
+
+    def test_invalidation(self):
+        """
+        To make sure that saving, soft deleting, restoring and bulk updates
+        invalidate the cached instances
+        """
+        Question.objects.get_cached(self.question.pk)
+        Answer.objects.get_cached(self.answer.pk)
+
+        self.question.title = "Changed"
+        self.question.save()
+        self.assertEqual(Question.objects.get_cached(self.question.pk).title, "Changed")
+
+        self.question.delete()
+        with self.assertRaises(Question.DoesNotExist):
+            Question.objects.get_cached(self.question.pk)
+        # Cascaded to the answers with a bulk update
+        with self.assertRaises(Answer.DoesNotExist):
+            Answer.objects.get_cached(self.answer.pk)
+
+        self.question.restore()
+        self.assertEqual(Answer.objects.get_cached(self.answer.pk), self.answer)
+        Answer.bulk_delete({"pk": self.answer.pk})
+        with self.assertRaises(Answer.DoesNotExist):
+            Answer.objects.get_cached(self.answer.pk)
+
+        User.objects.get_cached(self.user.pk)
+        User.objects.filter(pk=self.user.pk).update(is_active=False)
+        self.assertFalse(User.objects.get_cached(self.user.pk).is_active)
+
+    def test_request_memo(self):
+        """
+        To make sure that a request fetches each row at most once, the
+        logged in user included
+        """
+        token = request_memo.set({})
+        self.addCleanup(request_memo.reset, token)
+        question = Question.objects.get_cached(self.question.pk)
+        with self.assertNumQueries(0):
+            self.assertIs(Question.objects.get_cached(self.question.pk), question)
+
+        request_memo.set(None)
+        self.authenticate(self.answer.author)
+        self.make_get_request(reverse("home"))
+        Answer.objects.get_cached(self.answer.pk)
+        # Session, likes, insert and like count, the user and the answer
+        # come from the cache
+        with self.assertNumQueries(4):
+            self.make_post_request(reverse("like_answer", args=[self.answer.pk]))
+
+    def test_views(self):
+        """
+        To make sure that the views looking up objects by primary key still
+        only serve those of the user
+        """
+        self.authenticate()
+        response = self.make_get_request(
+            reverse("update_question", args=[self.question.pk])
+        )
+        self.assertEqual(response.status_code, 404)
+        response = self.make_post_request(
+            reverse("accept_answer", args=[self.answer.pk])
+        )
+        self.assertEqual(response.status_code, 404)
+
+        self.authenticate(self.user)
+        response = self.make_get_request(
+            reverse("update_question", args=[self.question.pk])
+        )
+        self.assertEqual(response.status_code, 200)
+        self.make_post_request(reverse("accept_answer", args=[self.answer.pk]))
+        self.assertTrue(Answer.objects.get(pk=self.answer.pk).is_accepted)
+
+    def test_write_views_fresh(self):
+        """
+        To make sure that the views changing an object save the row as it
+        is, not as it was cached
+        """
+        Answer.objects.get_cached(self.answer.pk)
+        # Changed without invalidating the cached instance, as another
+        # worker does until its local tier expires
+        Answer._base_manager.filter(pk=self.answer.pk).update(score=5, is_accepted=True)
+        self.authenticate(self.answer.author)
+        self.make_post_request(
+            reverse("update_answer", args=[self.answer.pk]), {"content": "Edited"}
+        )
+        self.make_post_request(reverse("delete_answer", args=[self.answer.pk]))
+        answer = Answer.objects.with_trashed().get(pk=self.answer.pk)
+        self.assertEqual((answer.content, answer.score), ("Edited", 5))
+        self.assertTrue(answer.is_accepted)
+        self.assertIsNotNone(answer.deleted_at)
+
+    def test_large_update(self):
+        """
+        To make sure that updates of more rows than are selected invalidate
+        every cached instance of the model
+        """
+        other = Answer.objects.create(
+            content="Other", author=self.user, question=self.question
+        )
+        Answer.objects.get_cached(self.answer.pk)
+        Answer.objects.get_cached(other.pk)
+        with mock.patch("core.objects.MAX_INVALIDATED_ROWS", 1):
+            Answer.objects.update(score=3)
+        self.assertEqual(Answer.objects.get_cached(self.answer.pk).score, 3)
+        self.assertEqual(Answer.objects.get_cached(other.pk).score, 3)
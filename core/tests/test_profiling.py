@@ -0,0 +1,118 @@
+import os
+import sys
+import tempfile
+import threading
+import time
+from collections import Counter
+from unittest import mock
+
+from django.http import HttpResponse
+from django.test import override_settings
+from django.urls import reverse
+
+from core.base_test import BaseTestCase
+from core.profiling import StackSampler, collapse, write_profile
+from qna.views.question import QuestionListView
+
+
+def busy_loop(seconds):
+    deadline = time.perf_counter() + seconds
+    while time.perf_counter() < deadline:
+        pass
+
+
+class ProfilingTestCase(BaseTestCase):
+    def setUp(self):
+        super().setUp()
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.directory = directory.name
+        overrides = override_settings(
+            PROFILER_DIR=self.directory, PROFILER_INTERVAL=0.001
+        )
+        overrides.enable()
+        self.addCleanup(overrides.disable)
+
+    def test_collapse(self):
+        """
+        To make sure that stacks are collapsed outermost frame first, with
+        the files relative to the project
+        """
+        stack = collapse(sys._getframe()).split(";")
+        self.assertEqual(
+            stack[-1],
+            f"test_collapse (core/tests/test_profiling.py:"
+            f"{ProfilingTestCase.test_collapse.__code__.co_firstlineno})",
+        )
+
+    def test_sampler(self):
+        """
+        To make sure that the sampler counts the stacks of another thread
+        """
+        thread = threading.Thread(target=busy_loop, args=(0.1,))
+        thread.start()
+        sampler = StackSampler(thread.ident, 0.001).start()
+        thread.join()
+        counts = sampler.stop()
+        self.assertTrue(any("busy_loop" in stack for stack in counts))
+
+    def test_requested_by_staff(self):
+        """
+        To make sure that only staff members can ask for a profile, which
+        is written in the collapsed format
+        """
+        self.authenticate()
+        response = self.make_get_request(reverse("home"), {"profile": 1})
+        self.assertNotIn("X-Profile", response)
+        self.assertEqual(os.listdir(self.directory), [])
+
+        admin = self.create_user()
+        admin.is_staff = True
+        admin.save()
+        self.authenticate(admin)
+        response = self.client.get(reverse("home"), HTTP_X_PROFILE="1")
+        filename = response["X-Profile"]
+        self.assertTrue(filename.endswith(".folded"))
+        self.assertIn("-home-", filename)
+        with open(os.path.join(self.directory, filename)) as file:
+            for line in file:
+                stack, count = line.rsplit(" ", 1)
+                self.assertGreater(int(count), 0)
+
+    @override_settings(PROFILER_SAMPLE_RATE=1.0)
+    def test_sampled(self):
+        """
+        To make sure that sampled requests are profiled without telling
+        the visitors
+        """
+        response = self.make_get_request(reverse("home"))
+        self.assertNotIn("X-Profile", response)
+        self.assertEqual(len(os.listdir(self.directory)), 1)
+
+    @override_settings(PROFILER_SAMPLE_RATE=1.0)
+    async def test_asgi(self):
+        """
+        To make sure that the requests served under ASGI are profiled, by
+        sampling the thread running the view
+        """
+        with mock.patch.object(
+            QuestionListView,
+            "get",
+            side_effect=lambda *args, **kwargs: busy_loop(0.05) or HttpResponse(),
+        ):
+            response = await self.async_client.get(reverse("home"))
+        self.assertEqual(response.status_code, 200)
+        [filename] = os.listdir(self.directory)
+        self.assertIn("-home-", filename)
+        with open(os.path.join(self.directory, filename)) as file:
+            self.assertIn("busy_loop", file.read())
+
+    @override_settings(PROFILER_MAX_FILES=2)
+    def test_max_files(self):
+        """
+        To make sure that the oldest profiles are deleted
+        """
+        names = [
+            write_profile(Counter({"a;b": 1}), f"profile{index}") for index in range(3)
+        ]
+        self.assertEqual(sorted(os.listdir(self.directory)), names[1:])
@@ -0,0 +1,157 @@
+import os
+import tempfile
+import time
+from io import StringIO
+from unittest import mock
+
+from asgiref.sync import sync_to_async
+from django.core.management import call_command
+from django.db import connection
+from django.test import override_settings
+from django.urls import reverse
+
+from core.base_test import BaseTestCase
+from core.slow_queries import (
+    aggregate,
+    fingerprint,
+    normalize,
+    read_log,
+    slow_query_log,
+)
+
+
+def query_record(digest, view, duration, started_at):
+    return {
+        "type": "query",
+        "time": started_at,
+        "fingerprint": digest,
+        "view": view,
+        "duration": duration,
+        "sql": "SELECT ?",
+    }
+
+
+class SlowQueriesTestCase(BaseTestCase):
+    def setUp(self):
+        super().setUp()
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.path = os.path.join(directory.name, "slow-queries.jsonl")
+        overrides = override_settings(SLOW_QUERY_LOG=self.path)
+        overrides.enable()
+        self.addCleanup(overrides.disable)
+        slow_query_log.explained_at.clear()
+
+    def test_normalize(self):
+        """
+        To make sure that queries differing only by their values have the
+        same shape and fingerprint
+        """
+        first = 'SELECT "a" FROM "t1" WHERE "b" = 12 AND "c" IN (1, 2, 3)'
+        second = 'SELECT "a" FROM "t1"\n WHERE "b" = 7 AND "c" IN (4)'
+        self.assertEqual(
+            normalize(first), 'SELECT "a" FROM "t1" WHERE "b" = ? AND "c" IN (...)'
+        )
+        self.assertEqual(fingerprint(first), fingerprint(second))
+        self.assertEqual(normalize("WHERE \"name\" = 'it''s'"), 'WHERE "name" = ?')
+        self.assertNotEqual(fingerprint(first), fingerprint('SELECT "a" FROM "t2"'))
+
+    def test_record(self):
+        """
+        To make sure that a slow query is logged with its plan, which is
+        only captured again after `SLOW_QUERY_EXPLAIN_INTERVAL`
+        """
+        sql = 'SELECT "id" FROM "qna_question" WHERE "id" = %s'
+        slow_query_log.record("default", sql, (1,), 0.5, "home", time.time())
+        slow_query_log.record("default", sql, (2,), 0.3, "home", time.time())
+        records = list(read_log(self.path))
+        self.assertEqual(
+            [record["type"] for record in records], ["query", "plan", "query"]
+        )
+        self.assertEqual(records[0]["fingerprint"], fingerprint(sql))
+        self.assertEqual(records[0]["view"], "home")
+        self.assertTrue(records[1]["plan"])
+
+    def test_rotation(self):
+        """
+        To make sure that the log is rotated once it reaches its maximum
+        size and that both files are read
+        """
+        sql = 'INSERT INTO "qna_tag" ("name") VALUES (%s)'
+        with override_settings(SLOW_QUERY_LOG_MAX_BYTES=1):
+            slow_query_log.record("default", sql, ("a",), 0.5, "home", time.time())
+            slow_query_log.record("default", sql, ("b",), 0.5, "home", time.time())
+        self.assertTrue(os.path.exists(f"{self.path}.1"))
+        self.assertEqual(len(list(read_log(self.path))), 2)
+
+    @override_settings(SLOW_QUERY_THRESHOLD=0)
+    def test_middleware(self):
+        """
+        To make sure that the queries of a request are handed to the
+        background thread with the name of the view
+        """
+        with mock.patch("core.slow_queries.slow_query_executor") as executor:
+            self.client.get(reverse("home"))
+        self.assertTrue(executor.submit.called)
+        self.assertEqual(
+            {call.args[5] for call in executor.submit.call_args_list}, {"home"}
+        )
+
+    @override_settings(SLOW_QUERY_THRESHOLD=0)
+    async def test_middleware_asgi(self):
+        """
+        To make sure that the queries of the views are timed under ASGI,
+        where they run in another thread, and the wrapper removed after
+        """
+        with mock.patch("core.slow_queries.slow_query_executor") as executor:
+            await self.async_client.get(reverse("home"))
+        self.assertTrue(executor.submit.called)
+        self.assertEqual(
+            {call.args[5] for call in executor.submit.call_args_list}, {"home"}
+        )
+        wrappers = await sync_to_async(lambda: list(connection.execute_wrappers))()
+        self.assertNotIn(
+            "record_slow_queries", [wrapper.__name__ for wrapper in wrappers]
+        )
+
+    def test_aggregate(self):
+        """
+        To make sure that queries are aggregated per fingerprint, the
+        ones taking the most time first
+        """
+        now = time.time()
+        records = [
+            query_record("a", "home", duration, now)
+            for duration in (0.1, 0.2, 0.3, 0.4)
+        ]
+        records.append(query_record("b", "search", 5.0, now - 7200))
+        records.append(
+            {"type": "plan", "time": now, "fingerprint": "a", "plan": "SCAN t"}
+        )
+        statistics = aggregate(records)
+        self.assertEqual([entry["fingerprint"] for entry in statistics], ["b", "a"])
+        self.assertEqual(statistics[1]["count"], 4)
+        self.assertEqual(statistics[1]["p50"], 0.3)
+        self.assertEqual(statistics[1]["max"], 0.4)
+        self.assertEqual(statistics[1]["plan"], "SCAN t")
+        statistics = aggregate(records, since=now - 3600)
+        self.assertEqual([entry["fingerprint"] for entry in statistics], ["a"])
+        statistics = aggregate(records, view="search")
+        self.assertEqual([entry["fingerprint"] for entry in statistics], ["b"])
+
+    def test_report(self):
+        """
+        To make sure that the command reports the logged queries with their
+        plans
+        """
+        sql = 'SELECT "id" FROM "qna_question" WHERE "id" = %s'
+        slow_query_log.record("default", sql, (1,), 0.5, "home", time.time())
+        output = StringIO()
+        call_command("report_slow_queries", "--plans", stdout=output)
+        self.assertIn(fingerprint(sql), output.getvalue())
+        self.assertIn("home (1)", output.getvalue())
+        self.assertIn(normalize(sql), output.getvalue())
+
+        output = StringIO()
+        call_command("report_slow_queries", "--view", "search", stdout=output)
+        self.assertIn("No slow queries logged", output.getvalue())
@@ -0,0 +1,71 @@
+import os
+import tempfile
+import threading
+from unittest import skipUnless
+
+from django.conf import settings
+from django.db import OperationalError, connection
+from django.test import SimpleTestCase, TestCase
+
+from core.sqlite.base import WriterLock
+
+
+class WriterLockTestCase(SimpleTestCase):
+    def test_threads(self):
+        """
+        To make sure that a single thread holds the writer lock at a time
+        """
+        lock = WriterLock()
+        lock.acquire(timeout=1)
+        errors = []
+
+        def acquire():
+            try:
+                lock.acquire(timeout=0.05)
+            except OperationalError as error:
+                errors.append(error)
+
+        thread = threading.Thread(target=acquire)
+        thread.start()
+        thread.join()
+        self.assertEqual(len(errors), 1)
+        lock.release()
+        lock.acquire(timeout=0.05)
+        lock.release()
+
+    def test_processes(self):
+        """
+        To make sure that the lock file serialises the writers of several
+        processes
+        """
+        with tempfile.TemporaryDirectory() as directory:
+            lock = WriterLock(os.path.join(directory, "db.sqlite3-writer.lock"))
+            lock.acquire(timeout=1)
+            pid = os.fork()
+            if pid == 0:
+                try:
+                    lock.acquire(timeout=0.05)
+                except OperationalError:
+                    os._exit(0)
+                os._exit(1)
+            _, status = os.waitpid(pid, 0)
+            lock.release()
+            self.assertEqual(os.waitstatus_to_exitcode(status), 0)
+
+
+@skipUnless(
+    settings.SQLITE_TUNED and connection.vendor == "sqlite", "SQLite mode disabled"
+)
+class SQLiteBackendTestCase(TestCase):
+    def test_pragmas(self):
+        """
+        To make sure that new connections are tuned and transactions hold
+        the writer lock
+        """
+        with connection.cursor() as cursor:
+            cursor.execute("PRAGMA synchronous")
+            self.assertEqual(cursor.fetchone()[0], 1)
+            cursor.execute("PRAGMA cache_size")
+            self.assertLess(cursor.fetchone()[0], 0)
+        # The test runs in a transaction
+        self.assertTrue(connection.holds_writer_lock)
@@ -0,0 +1,124 @@
+from unittest import mock
+
+from django.db import OperationalError
+from django.urls import reverse
+
+from core import stale
+from core.base_test import BaseTestCase
+from core.stale import database_health
+from qna.models import Question
+from qna.views.question import QuestionDetailView, QuestionListView
+
+
+class StaleFallbackTestCase(BaseTestCase):
+    def setUp(self):
+        super().setUp()
+        stale.caches["stale"].clear()
+        stale.last_stored.clear()
+        patcher = mock.patch.object(database_health, "probe")
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        patcher = mock.patch.object(database_health, "reachable", return_value=False)
+        self.reachable = patcher.start()
+        self.addCleanup(patcher.stop)
+        self.addCleanup(database_health.mark_up)
+
+    def fail(self, view):
+        return mock.patch.object(
+            view, "get", side_effect=OperationalError("connection refused")
+        )
+
+    def test_serves_stale_page(self):
+        """
+        To make sure that the last anonymous rendering of a page is served
+        with the read-only banner when the database is unavailable
+        """
+        question = Question.objects.create(
+            title="Stale title", content="Content", author=self.create_user()
+        )
+        url = reverse("question_detail", kwargs={"pk": question.pk})
+        response = self.make_get_request(url)
+        self.assertNotIn("X-Stale", response)
+
+        with self.fail(QuestionDetailView):
+            response = self.make_get_request(url)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response["X-Stale"], "1")
+        self.assertContains(response, "Stale title")
+        self.assertContains(response, "The site is read-only")
+        self.assertTrue(database_health.is_down)
+
+        # While the database is down pages are served without trying it
+        with mock.patch.object(QuestionDetailView, "get") as get:
+            response = self.make_get_request(url)
+        get.assert_not_called()
+        self.assertEqual(response["X-Stale"], "1")
+
+    def test_logged_in_while_down(self):
+        """
+        To make sure that logged in visitors are served the stale page too,
+        their session and user are not loaded while the database is down
+        """
+        question = Question.objects.create(
+            title="Stale title", content="Content", author=self.create_user()
+        )
+        url = reverse("question_detail", kwargs={"pk": question.pk})
+        self.make_get_request(url)
+        self.authenticate()
+        database_health.down_since = 0
+        with mock.patch(
+            "django.contrib.sessions.backends.db.SessionStore.load",
+            side_effect=OperationalError("connection refused"),
+        ):
+            response = self.make_get_request(url)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response["X-Stale"], "1")
+
+    def test_nothing_stored(self):
+        """
+        To make sure that a page never rendered before answers 503 when
+        the database is unavailable
+        """
+        with self.fail(QuestionListView):
+            response = self.make_get_request(reverse("home"))
+        self.assertEqual(response.status_code, 503)
+        self.assertIn("Retry-After", response)
+
+    def test_query_error(self):
+        """
+        To make sure that the errors of a query, such as a locked database,
+        do not mark the database down while it can still be queried
+        """
+        self.reachable.return_value = True
+        with self.fail(QuestionListView), self.assertRaises(OperationalError):
+            self.make_get_request(reverse("home"))
+        self.assertFalse(database_health.is_down)
+
+    def test_authenticated_not_stored(self):
+        """
+        To make sure that pages rendered for logged in users are not
+        stored, as they differ for every user
+        """
+        self.authenticate()
+        self.make_get_request(reverse("home"))
+        self.assertEqual(stale.last_stored, {})
+
+    def test_check(self):
+        """
+        To make sure that a successful probe marks the database up again
+        """
+        database_health.down_since = 0
+        # The probe thread closes its own connection, not the one of the test
+        with mock.patch.object(stale.connection, "close"):
+            self.assertTrue(database_health.check())
+        self.assertFalse(database_health.is_down)
+
+    def test_reachable(self):
+        """
+        To make sure that the database is checked with a new connection,
+        from another thread
+        """
+        health = stale.DatabaseHealth()
+        with mock.patch.object(health, "check", return_value=False) as check:
+            self.assertFalse(health.reachable())
+        check.assert_called_once_with()
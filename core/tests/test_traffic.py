@@ -0,0 +1,181 @@
+import json
+import os
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from io import StringIO
+
+from asgiref.sync import sync_to_async
+from django.core.management import call_command
+from django.test import override_settings
+from django.urls import reverse
+
+from core.base_test import BaseTestCase
+from core.slow_queries import read_log
+from core.traffic import replay, write_records
+
+
+class Handler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        status = 500 if self.path.startswith("/broken") else 200
+        self.send_response(status)
+        self.end_headers()
+        self.wfile.write(b"ok")
+
+    def log_message(self, *args):
+        pass
+
+
+def captured(path, view, started_at, method="GET", params=None):
+    return {
+        "time": started_at,
+        "method": method,
+        "path": path,
+        "view": view,
+        "params": params or {},
+        "user": None,
+        "status": 200,
+        "duration": 0.01,
+    }
+
+
+def replayed(view, duration, status=200):
+    return {"view": view, "status": status, "duration": duration}
+
+
+class TrafficTestCase(BaseTestCase):
+    def setUp(self):
+        super().setUp()
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.directory = directory.name
+        self.log = os.path.join(self.directory, "traffic.jsonl")
+        overrides = override_settings(TRAFFIC_CAPTURE_LOG=self.log)
+        overrides.enable()
+        self.addCleanup(overrides.disable)
+
+    @override_settings(TRAFFIC_CAPTURE_RATE=1.0)
+    def test_capture(self):
+        """
+        To make sure that the captured requests hold their view, their
+        parameters without secrets and a stable pseudonym of the user
+        """
+        user = self.create_user()
+        self.make_get_request(reverse("home"), {"page": "1", "token": "secret"})
+        self.authenticate(user)
+        self.make_get_request(reverse("home"))
+        self.make_get_request(reverse("home"))
+        records = list(read_log(self.log))
+        self.assertEqual(len(records), 3)
+        self.assertEqual(records[0]["view"], "home")
+        self.assertEqual(records[0]["params"], {"page": ["1"], "token": [""]})
+        self.assertIsNone(records[0]["user"])
+        self.assertEqual(records[1]["user"], records[2]["user"])
+        self.assertRegex(records[1]["user"], r"^[0-9a-f]{16}$")
+        self.assertEqual(records[1]["status"], 200)
+
+    @override_settings(TRAFFIC_CAPTURE_RATE=1.0)
+    async def test_capture_asgi(self):
+        """
+        To make sure that the requests of logged in users are captured
+        under ASGI, where the user is loaded asynchronously, those of the
+        views never loading it included
+        """
+        await self.async_client.aforce_login(await sync_to_async(self.create_user)())
+        response = await self.async_client.get(reverse("robots"))
+        self.assertEqual(response.status_code, 200)
+        [record] = read_log(self.log)
+        self.assertEqual(record["view"], "robots")
+        self.assertRegex(record["user"], r"^[0-9a-f]{16}$")
+
+    def test_capture_disabled(self):
+        """
+        To make sure that nothing is captured by default
+        """
+        self.make_get_request(reverse("home"))
+        self.assertFalse(os.path.exists(self.log))
+
+    def test_replay(self):
+        """
+        To make sure that only the safe requests are replayed, spaced as
+        captured divided by the speed
+        """
+        sent = []
+
+        def send(base_url, record, timeout):
+            sent.append(record["path"])
+            return 200, 0.001
+
+        records = [
+            captured("/b", "b", 100.2),
+            captured("/a", "a", 100.0),
+            captured("/c", "c", 100.1, method="POST"),
+        ]
+        started_at = time.monotonic()
+        results = list(replay(records, "http://testserver", speed=2, send=send))
+        self.assertGreaterEqual(time.monotonic() - started_at, 0.1)
+        self.assertEqual(sent, ["/a", "/b"])
+        self.assertEqual([result["view"] for result in results], ["a", "b"])
+
+    def test_replay_command(self):
+        """
+        To make sure that the command sends the captured requests to the
+        instance and writes their results
+        """
+        server = HTTPServer(("127.0.0.1", 0), Handler)
+        thread = threading.Thread(target=server.serve_forever)
+        thread.start()
+        self.addCleanup(thread.join)
+        self.addCleanup(server.server_close)
+        self.addCleanup(server.shutdown)
+
+        write_records(
+            self.log,
+            [
+                captured("/question/1", "question_detail", 1.0, params={"q": ["x"]}),
+                captured("/broken", "broken", 2.0),
+            ],
+        )
+        output = os.path.join(self.directory, "replay.jsonl")
+        stdout = StringIO()
+        call_command(
+            "replay_traffic",
+            output,
+            "--base-url",
+            f"http://127.0.0.1:{server.server_port}",
+            "--speed",
+            "0",
+            stdout=stdout,
+        )
+        self.assertIn("Replayed 2 requests, 1 errors", stdout.getvalue())
+        with open(output) as file:
+            results = [json.loads(line) for line in file]
+        self.assertEqual([result["status"] for result in results], [200, 500])
+
+    def test_compare(self):
+        """
+        To make sure that the slowdowns of the p95 latency of a view are
+        reported as regressions
+        """
+        baseline = os.path.join(self.directory, "baseline.jsonl")
+        candidate = os.path.join(self.directory, "candidate.jsonl")
+        write_records(
+            baseline,
+            [replayed("home", 0.01)] * 10 + [replayed("question_detail", 0.02)] * 10,
+        )
+        write_records(
+            candidate,
+            [replayed("home", 0.01)] * 10 + [replayed("question_detail", 0.05)] * 10,
+        )
+        stdout = StringIO()
+        call_command("compare_replays", baseline, candidate, stdout=stdout)
+        self.assertIn("question_detail", stdout.getvalue())
+        self.assertIn("(+150%)", stdout.getvalue())
+        self.assertIn(
+            "p95 regressions: all requests, question_detail", stdout.getvalue()
+        )
+
+        stdout = StringIO()
+        call_command("compare_replays", baseline, baseline, stdout=stdout)
+        self.assertIn("No p95 regression", stdout.getvalue())
@@ -0,0 +1,24 @@
+import gc
+from unittest import mock
+
+from core.base_test import BaseTestCase
+from qnasite import warmup
+
+
+class WarmupTestCase(BaseTestCase):
+    def test_warmup(self):
+        """
+        To make sure that the warmup finds the templates of the applications
+        and freezes the objects alive at startup, enabling the collector
+        again
+        """
+        self.addCleanup(gc.unfreeze)
+        self.assertIn("base/base.html", set(warmup.template_names()))
+        gc.disable()
+        self.addCleanup(gc.enable)
+        # Closing the connection would end the transaction of the test
+        with mock.patch("qnasite.warmup.connections") as connections:
+            warmup.warmup()
+        connections.close_all.assert_called_once()
+        self.assertGreater(gc.get_freeze_count(), 0)
+        self.assertTrue(gc.isenabled())
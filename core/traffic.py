@@ -0,0 +1,211 @@
+"""
+Capture and replay of the production traffic.
+
+`TrafficCaptureMiddleware` appends a share `TRAFFIC_CAPTURE_RATE` of the
+requests to the JSON lines log `TRAFFIC_CAPTURE_LOG`: their method, path,
+URL name, query parameters, user, status and duration. Users are replaced
+by a keyed hash of their id, stable across requests so sessions can be
+told apart but not traced back to an account, and the values of the
+parameters looking like secrets are removed.
+
+`python manage.py replay_traffic` sends the captured requests again to a
+local instance, with their original pacing or as fast as possible, and
+writes the latency of each one. `python manage.py compare_replays`
+compares the latency distributions of two replays, typically of the
+build before and after a change.
+
+Only the safe methods are replayed: the captured forms are not, and the
+users cannot be logged in, so writes would fail anyway.
+"""
+
+import hashlib
+import hmac
+import json
+import os
+import random
+import re
+import threading
+import time
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlencode
+
+from django.conf import settings
+
+from core.slow_queries import percentile
+
+SENSITIVE_PATTERN = re.compile(r"pass|secret|token|key|code|sig", re.IGNORECASE)
+REPLAYED_METHODS = ("GET", "HEAD")
+
+write_lock = threading.Lock()
+
+
+class NoRedirectHandler(urllib.request.HTTPRedirectHandler):
+    """
+    Leaves the redirects to the caller, replays measure the redirect itself
+    """
+
+    def redirect_request(self, *args, **kwargs):
+        return None
+
+
+opener = urllib.request.build_opener(NoRedirectHandler)
+
+
+def should_capture():
+    rate = settings.TRAFFIC_CAPTURE_RATE
+    return rate > 0 and random.random() < rate
+
+
+def anonymize_user(user):
+    """
+    Returns a pseudonym of the user, the same for every request of the
+    user, or None for anonymous visitors
+    """
+    if user is None or not user.is_authenticated:
+        return None
+    digest = hmac.new(
+        settings.SECRET_KEY.encode(), str(user.pk).encode(), hashlib.sha256
+    )
+    return digest.hexdigest()[:16]
+
+
+def scrub(params):
+    """
+    Returns the query parameters as lists of values, without the values
+    of the parameters looking like secrets
+    """
+    return {
+        name: ["" if SENSITIVE_PATTERN.search(name) else value for value in values]
+        for name, values in params.lists()
+    }
+
+
+def capture_record(request, user, view, status, started_at, duration):
+    return {
+        "time": started_at,
+        "method": request.method,
+        "path": request.path,
+        "view": view,
+        "params": scrub(request.GET),
+        "user": anonymize_user(user),
+        "status": status,
+        "duration": duration,
+    }
+
+
+def write_records(path, records, max_bytes=None):
+    """
+    Appends the records to the JSON lines file, rotating it to `<path>.1`
+    once it reaches `max_bytes`
+    """
+    with write_lock:
+        if max_bytes is not None:
+            try:
+                if os.path.getsize(path) >= max_bytes:
+                    os.replace(path, f"{path}.1")
+            except FileNotFoundError:
+                pass
+        # Appended with a single write so the workers sharing the file do
+        # not mix their lines up
+        with open(path, "a") as file:
+            file.write("".join(json.dumps(record) + "\n" for record in records))
+
+
+def replay_url(base_url, record):
+    url = base_url.rstrip("/") + record["path"]
+    if record["params"]:
+        url += "?" + urlencode(record["params"], doseq=True)
+    return url
+
+
+def send(base_url, record, timeout):
+    """
+    Sends the captured request again, returns its status and duration
+    """
+    request = urllib.request.Request(
+        replay_url(base_url, record),
+        method=record["method"],
+        headers={"User-Agent": "qnasite-replay"},
+    )
+    started_at = time.perf_counter()
+    try:
+        with opener.open(request, timeout=timeout) as response:
+            response.read()
+            status = response.status
+    except urllib.error.HTTPError as error:
+        status = error.code
+    except OSError:
+        status = None
+    return status, time.perf_counter() - started_at
+
+
+def replay(records, base_url, speed=1.0, concurrency=8, timeout=30.0, send=send):
+    """
+    Sends the captured requests again to `base_url`, spaced as they were
+    captured divided by `speed`, or as fast as `concurrency` allows when
+    `speed` is 0. Yields a result per replayed request, in the order they
+    were captured.
+    """
+    records = sorted(
+        (record for record in records if record["method"] in REPLAYED_METHODS),
+        key=lambda record: record["time"],
+    )
+    if not records:
+        return
+
+    def run(record):
+        status, duration = send(base_url, record, timeout)
+        return {
+            "view": record["view"],
+            "method": record["method"],
+            "path": record["path"],
+            "status": status,
+            "duration": duration,
+            "captured_duration": record["duration"],
+        }
+
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        first = records[0]["time"]
+        started_at = time.monotonic()
+        futures = []
+        for record in records:
+            if speed:
+                delay = (record["time"] - first) / speed
+                time.sleep(max(0, started_at + delay - time.monotonic()))
+            futures.append(executor.submit(run, record))
+        for future in futures:
+            yield future.result()
+
+
+def summarize(results):
+    """
+    Returns the number of requests and errors and the latency percentiles
+    of the successful requests per view, and of all of them under None
+    """
+    durations = {}
+    errors = {}
+    for result in results:
+        for view in (result["view"], None):
+            durations.setdefault(view, [])
+            errors.setdefault(view, 0)
+            if result["status"] is None or result["status"] >= 500:
+                errors[view] += 1
+            else:
+                durations[view].append(result["duration"])
+
+    summary = {}
+    for view, values in durations.items():
+        values.sort()
+        summary[view] = {
+            "count": len(values) + errors[view],
+            "errors": errors[view],
+        }
+        if values:
+            summary[view].update(
+                p50=percentile(values, 0.5),
+                p95=percentile(values, 0.95),
+                p99=percentile(values, 0.99),
+            )
+    return summary
@@ -0,0 +1,76 @@
+"""
+Upload handling that streams files to disk while hashing them.
+
+Every chunk read from the request is written to a temporary file and fed
+to a SHA-256 digest, so uploads are never held in memory and their
+content address is known as soon as the request body is parsed.
+"""
+
+import hashlib
+
+from django.conf import settings
+from django.core.files.uploadhandler import TemporaryFileUploadHandler
+
+# Leading bytes of the image formats accepted as attachments
+IMAGE_SIGNATURES = (
+    (b"\x89PNG\r\n\x1a\n", "image/png"),
+    (b"\xff\xd8\xff", "image/jpeg"),
+    (b"GIF87a", "image/gif"),
+    (b"GIF89a", "image/gif"),
+)
+
+
+class HashingFileUploadHandler(TemporaryFileUploadHandler):
+    """
+    Upload handler writing the files to temporary files and computing
+    their SHA-256 digest on the fly. Bytes past `ATTACHMENT_MAX_SIZE` are
+    counted but discarded, the form rejects the file from its size.
+    """
+
+    def new_file(self, *args, **kwargs):
+        super().new_file(*args, **kwargs)
+        self.digest = hashlib.sha256()
+        self.received = 0
+
+    def receive_data_chunk(self, raw_data, start):
+        self.received += len(raw_data)
+        if self.received <= settings.ATTACHMENT_MAX_SIZE:
+            self.digest.update(raw_data)
+            self.file.write(raw_data)
+
+    def file_complete(self, file_size):
+        uploaded_file = super().file_complete(file_size)
+        uploaded_file.size = self.received
+        uploaded_file.sha256 = self.digest.hexdigest()
+        return uploaded_file
+
+
+def sniff_image_type(file):
+    """
+    Returns the content type of the image from its leading bytes, or None
+    when it is not one of the accepted formats
+    """
+    file.seek(0)
+    header = file.read(12)
+    file.seek(0)
+    if header[:4] == b"RIFF" and header[8:12] == b"WEBP":
+        return "image/webp"
+    for signature, content_type in IMAGE_SIGNATURES:
+        if header.startswith(signature):
+            return content_type
+    return None
+
+
+def file_sha256(file):
+    """
+    Returns the SHA-256 digest of the file, using the one computed during
+    the upload when available
+    """
+    digest = getattr(file, "sha256", None)
+    if digest is not None:
+        return digest
+    digest = hashlib.sha256()
+    for chunk in file.chunks():
+        digest.update(chunk)
+    file.seek(0)
+    return digest.hexdigest()
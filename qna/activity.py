@@ -0,0 +1,248 @@
+"""
+Follows and the personal activity feeds.
+
+Feeds use a hybrid fan-out. When an ordinary user asks a question, or a
+followed question is answered, a `FeedItem` is copied to the inbox of
+every follower after the transaction commits, in a background thread.
+The questions of authors followed by more than `FEED_FANOUT_LIMIT` users
+would need as many rows each, so they are not copied but pulled when a
+feed is read, from the few popular authors the reader follows.
+
+Reading a feed is then a range scan of the inbox index, merged with the
+latest questions of the popular followees. Inboxes are trimmed to
+`FEED_INBOX_SIZE` entries as they grow. Posts held for review reach the
+feeds once a moderator approves them.
+"""
+
+import heapq
+import logging
+import random
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.db import IntegrityError, connection, transaction
+from django.db.models import F, Q, Window
+from django.db.models.functions import RowNumber
+
+from accounts.models import User
+from qna.models import Answer, FeedItem, Question, QuestionFollow, UserFollow
+
+logger = logging.getLogger(__name__)
+
+feed_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="feeds")
+
+
+def is_popular(user):
+    return user.follower_count > settings.FEED_FANOUT_LIMIT
+
+
+def follow_question(user, question):
+    QuestionFollow.objects.get_or_create(user=user, question=question)
+
+
+def unfollow_question(user, question):
+    QuestionFollow.objects.filter(user=user, question=question).delete()
+
+
+def follow_user(follower, followee):
+    """
+    Makes `follower` follow `followee`, returns whether it was not
+    following them already
+    """
+    try:
+        with transaction.atomic():
+            UserFollow.objects.create(follower=follower, followee=followee)
+            User.objects.filter(pk=followee.pk).update(
+                follower_count=F("follower_count") + 1
+            )
+    except IntegrityError:
+        return False
+    return True
+
+
+def unfollow_user(follower, followee):
+    """
+    Makes `follower` stop following `followee` and drops their questions
+    from the follower's inbox, returns whether it was following them
+    """
+    with transaction.atomic():
+        deleted, _ = UserFollow.objects.filter(
+            follower=follower, followee=followee
+        ).delete()
+        if not deleted:
+            return False
+        User.objects.filter(pk=followee.pk).update(
+            follower_count=F("follower_count") - 1
+        )
+    FeedItem.objects.filter(
+        user=follower, kind=FeedItem.NEW_QUESTION, question__author=followee
+    ).delete()
+    return True
+
+
+def trim_inboxes(user_ids):
+    """
+    Deletes the entries of the inboxes beyond the newest `FEED_INBOX_SIZE`
+    ones, returns the number of entries deleted
+    """
+    ranked = (
+        FeedItem.objects.filter(user_id__in=user_ids)
+        .annotate(
+            rank=Window(
+                RowNumber(),
+                partition_by=[F("user_id")],
+                order_by=[F("created_at").desc(), F("pk").desc()],
+            )
+        )
+        .filter(rank__gt=settings.FEED_INBOX_SIZE)
+        .values_list("pk", flat=True)
+    )
+    return FeedItem.objects.filter(pk__in=list(ranked)).delete()[0]
+
+
+def write_items(recipients, **fields):
+    """
+    Copies an entry to the inboxes of the recipients, a queryset of user
+    ids, in batches. Each batch trims a sample of the inboxes it wrote to,
+    so an inbox is trimmed about every `FEED_TRIM_EVERY` entries. Returns
+    the number of entries written.
+    """
+    count = 0
+    batch = []
+    for user_id in recipients.iterator(chunk_size=settings.FEED_FANOUT_BATCH_SIZE):
+        batch.append(user_id)
+        if len(batch) == settings.FEED_FANOUT_BATCH_SIZE:
+            count += write_batch(batch, fields)
+            batch = []
+    if batch:
+        count += write_batch(batch, fields)
+    return count
+
+
+def write_batch(user_ids, fields):
+    FeedItem.objects.bulk_create(
+        [FeedItem(user_id=user_id, **fields) for user_id in user_ids]
+    )
+    trimmed = [
+        user_id
+        for user_id in user_ids
+        if random.random() * settings.FEED_TRIM_EVERY < 1
+    ]
+    if trimmed:
+        trim_inboxes(trimmed)
+    return len(user_ids)
+
+
+def fan_out_questions(pks):
+    """
+    Copies the new questions of ordinary authors to the inboxes of their
+    followers, returns the number of entries written
+    """
+    count = 0
+    questions = Question.objects.filter(
+        pk__in=pks, quarantined_at__isnull=True
+    ).select_related("author")
+    for question in questions:
+        if is_popular(question.author):
+            continue
+        followers = UserFollow.objects.filter(followee=question.author_id)
+        count += write_items(
+            followers.values_list("follower_id", flat=True),
+            kind=FeedItem.NEW_QUESTION,
+            question=question,
+            created_at=question.created_at,
+        )
+    return count
+
+
+def fan_out_answers(pks):
+    """
+    Copies the new answers to the inboxes of the followers of their
+    question, returns the number of entries written
+    """
+    count = 0
+    answers = Answer.objects.filter(
+        pk__in=pks, quarantined_at__isnull=True, question__deleted_at__isnull=True
+    )
+    for answer in answers:
+        followers = QuestionFollow.objects.filter(question=answer.question_id).exclude(
+            user=answer.author_id
+        )
+        count += write_items(
+            followers.values_list("user_id", flat=True),
+            kind=FeedItem.NEW_ANSWER,
+            question_id=answer.question_id,
+            answer=answer,
+            created_at=answer.created_at,
+        )
+    return count
+
+
+def fan_out_in_background(fan_out, pks):
+    try:
+        fan_out(pks)
+    except Exception:
+        logger.exception("Fan-out of %s failed", pks)
+    finally:
+        # The thread keeps running, its connection must not be left open
+        connection.close()
+
+
+def schedule_fan_out(fan_out, pks):
+    """
+    Runs `fan_out_questions` or `fan_out_answers` on the posts in the
+    background, once the current transaction commits
+    """
+    pks = list(pks)
+    transaction.on_commit(
+        lambda: feed_executor.submit(fan_out_in_background, fan_out, pks)
+    )
+
+
+def feed(user, before=None, limit=None):
+    """
+    Returns the newest entries of the feed of the user created before the
+    given date, merging the inbox with the questions of the popular
+    authors the user follows
+    """
+    limit = limit or settings.FEED_PAGE_SIZE
+    items = (
+        FeedItem.objects.filter(user=user)
+        .filter(question__deleted_at__isnull=True)
+        .filter(Q(answer__isnull=True) | Q(answer__deleted_at__isnull=True))
+        .select_related("question__author", "answer__author")
+    )
+    if before is not None:
+        items = items.filter(created_at__lt=before)
+    items = list(items[:limit])
+
+    popular = UserFollow.objects.filter(
+        follower=user, followee__follower_count__gt=settings.FEED_FANOUT_LIMIT
+    ).values_list("followee_id", flat=True)
+    # Entries written before their author became popular are in the inbox
+    seen = {item.question_id for item in items if item.kind == FeedItem.NEW_QUESTION}
+    pulled = []
+    for author_id in popular:
+        # One range scan of the author index per popular followee
+        questions = (
+            Question.objects.filter(author_id=author_id, quarantined_at__isnull=True)
+            .select_related("author")
+            .defer("content", "content_html")
+            .order_by("-created_at")
+        )
+        if before is not None:
+            questions = questions.filter(created_at__lt=before)
+        pulled.append(
+            [
+                FeedItem(
+                    user=user,
+                    kind=FeedItem.NEW_QUESTION,
+                    question=question,
+                    created_at=question.created_at,
+                )
+                for question in questions[:limit]
+                if question.pk not in seen
+            ]
+        )
+    merged = heapq.merge(items, *pulled, key=lambda item: item.created_at, reverse=True)
+    return list(merged)[:limit]
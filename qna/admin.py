@@ -1,3 +1,185 @@
-from django.contrib import admin
+from django.conf import settings
+from django.contrib import admin, messages
+from django.contrib.admin.utils import model_ngettext
+from django.db.models import Count, IntegerField, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+from django.utils import timezone
 
-# Register your models here.
+from core.admin import SoftDeleteAdmin, StatusListFilter, batched_pks
+from qna.activity import fan_out_answers, fan_out_questions, schedule_fan_out
+from qna.events import record
+from qna.models import Answer, Event, Question
+from qna.retention import purge_batch
+from qna.snapshots import invalidate_posts
+from qna.spam import learn_posts
+
+
+def count_subquery(model, field):
+    """
+    Returns a correlated subquery counting the rows of `model` pointing to
+    the outer row, evaluated only for the rows of the displayed page
+    """
+    rows = (
+        model.objects.filter(**{field: OuterRef("pk")})
+        .order_by()
+        .values(field)
+        .annotate(count=Count("pk"))
+        .values("count")
+    )
+    return Coalesce(Subquery(rows, output_field=IntegerField()), 0)
+
+
+def moderator_deleted(model, pks, moderator, kind):
+    """
+    Follows up the soft delete of questions or answers by a moderator: the
+    spam filter learns them, the deletions are logged and the snapshots of
+    their questions invalidated
+    """
+    if not pks:
+        return
+    learn_posts(model.objects.with_trashed().filter(pk__in=pks), spam=True)
+    record(kind, moderator, pks)
+    invalidate_posts(model, pks)
+
+
+class QuarantineListFilter(admin.SimpleListFilter):
+    """
+    Filters questions and answers on whether they are held for review
+    """
+
+    title = "review"
+    parameter_name = "review"
+
+    def lookups(self, request, model_admin):
+        return [("held", "Held for review"), ("published", "Published")]
+
+    def queryset(self, request, queryset):
+        if self.value() == "held":
+            return queryset.filter(quarantined_at__isnull=False)
+        if self.value() == "published":
+            return queryset.filter(quarantined_at__isnull=True)
+        return queryset
+
+
+class ContentAdmin(SoftDeleteAdmin):
+    """
+    Admin shared by questions and answers, adding the purge action and
+    the review of the posts held by the spam filter
+    """
+
+    list_select_related = ["author"]
+    list_filter = [StatusListFilter, QuarantineListFilter]
+    raw_id_fields = ["author"]
+    readonly_fields = ["created_at", "updated_at", "deleted_at", "quarantined_at"]
+    # Exact lookups use the unique indexes of the user table
+    search_fields = ["author__email__exact", "author__username__exact"]
+    ordering = ["-created_at"]
+    actions = [*SoftDeleteAdmin.actions, "approve_selected", "purge_selected"]
+
+    # Kind of the events logged for the rows soft deleted by moderators
+    deleted_event = None
+    # Function copying the approved rows to the activity feeds
+    fan_out = None
+
+    def soft_delete_batch(self, request, pks):
+        count = super().soft_delete_batch(request, pks)
+        moderator_deleted(self.model, pks, request.user, self.deleted_event)
+        return count
+
+    def restore_batch(self, request, pks):
+        count = super().restore_batch(request, pks)
+        invalidate_posts(self.model, pks)
+        return count
+
+    @admin.action(
+        description="Approve selected %(verbose_name_plural)s held for review"
+    )
+    def approve_selected(self, request, queryset):
+        def approve(pks):
+            held = self.model.objects.with_trashed().filter(pk__in=pks)
+            learn_posts(held, spam=False)
+            count = held.update(quarantined_at=None, updated_at=timezone.now())
+            schedule_fan_out(self.fan_out, pks)
+            invalidate_posts(self.model, pks)
+            return count
+
+        count = self.run_in_batches(
+            queryset.filter(quarantined_at__isnull=False), approve
+        )
+        self.message_user(
+            request,
+            f"Approved {count} {model_ngettext(self.opts, count)}.",
+            messages.SUCCESS,
+        )
+
+    @admin.action(description="Purge selected trashed %(verbose_name_plural)s")
+    def purge_selected(self, request, queryset):
+        count = 0
+        for pks in batched_pks(
+            queryset.filter(deleted_at__isnull=False),
+            settings.ADMIN_ACTION_BATCH_SIZE,
+        ):
+            purge_batch(self.model, pks)
+            count += len(pks)
+        self.message_user(
+            request,
+            f"Purged {count} {model_ngettext(self.opts, count)}.",
+            messages.SUCCESS,
+        )
+
+
+@admin.register(Question)
+class QuestionAdmin(ContentAdmin):
+    deleted_event = Event.QUESTION_DELETED
+    fan_out = staticmethod(fan_out_questions)
+    list_display = [
+        "title",
+        "author",
+        "answer_count",
+        "created_at",
+        "quarantined_at",
+        "deleted_at",
+    ]
+
+    def get_queryset(self, request):
+        return (
+            super()
+            .get_queryset(request)
+            .defer("content", "content_html")
+            .annotate(answer_count=count_subquery(Answer, "question"))
+        )
+
+    @admin.display(description="Answers")
+    def answer_count(self, question):
+        return question.answer_count
+
+
+@admin.register(Answer)
+class AnswerAdmin(ContentAdmin):
+    deleted_event = Event.ANSWER_DELETED
+    fan_out = staticmethod(fan_out_answers)
+    list_display = [
+        "pk",
+        "question",
+        "author",
+        "like_count",
+        "score",
+        "is_accepted",
+        "created_at",
+        "quarantined_at",
+        "deleted_at",
+    ]
+    list_select_related = ["author", "question"]
+    raw_id_fields = ["author", "question", "likes"]
+
+    def get_queryset(self, request):
+        return (
+            super()
+            .get_queryset(request)
+            .defer("content_html", "question__content", "question__content_html")
+            .annotate(like_count=count_subquery(Answer.likes.through, "answer"))
+        )
+
+    @admin.display(description="Likes")
+    def like_count(self, answer):
+        return answer.like_count
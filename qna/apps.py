@@ -4,3 +4,16 @@ from django.apps import AppConfig
 class QnaConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'qna'
+
+    def ready(self):
+        from django.core.signals import request_finished
+        from django.db.models.signals import post_delete, post_save
+
+        from qna.events import flush_events
+        from qna.models import Answer, Question
+        from qna.snapshots import post_changed
+
+        request_finished.connect(flush_events)
+        for model in (Question, Answer):
+            post_save.connect(post_changed, sender=model)
+            post_delete.connect(post_changed, sender=model)
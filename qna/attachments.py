@@ -0,0 +1,140 @@
+"""
+Image attachments of questions and answers.
+
+Uploads are stored once per content in `StoredFile` rows, keyed by the
+SHA-256 digest computed while the request was read. Thumbnails are made
+after the transaction commits, in a background thread, so uploading
+never waits for image decoding.
+"""
+
+import logging
+import os
+from concurrent.futures import ThreadPoolExecutor
+from io import BytesIO
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.db import IntegrityError, connection, transaction
+from PIL import Image
+
+from core.uploads import file_sha256
+from qna.models import Attachment, StoredFile
+from qna.models.stored_file import content_path
+
+logger = logging.getLogger(__name__)
+
+thumbnail_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="thumbnails")
+
+
+def store_file(uploaded_file):
+    """
+    Returns the `StoredFile` holding the content of the uploaded file,
+    saving the file only when no identical content was stored before
+    """
+    digest = file_sha256(uploaded_file)
+    stored_file = StoredFile.objects.filter(sha256=digest).first()
+    if stored_file is not None:
+        return stored_file
+
+    stored_file = StoredFile(
+        sha256=digest,
+        size=uploaded_file.size,
+        content_type=uploaded_file.content_type,
+    )
+    name = content_path(stored_file, uploaded_file.name)
+    if default_storage.exists(name):
+        stored_file.file.name = name
+    else:
+        stored_file.file.save(uploaded_file.name, uploaded_file, save=False)
+    try:
+        with transaction.atomic():
+            stored_file.save()
+    except IntegrityError:
+        # The same content was stored by a concurrent upload
+        if stored_file.file.name != name:
+            stored_file.file.delete(save=False)
+        return StoredFile.objects.get(sha256=digest)
+    return stored_file
+
+
+def attach_files(files, user, question=None, answer=None):
+    """
+    Stores the uploaded files and attaches them to the question or the
+    answer, then schedules the missing thumbnails
+    """
+    attachments = []
+    for uploaded_file in files:
+        attachments.append(
+            Attachment(
+                stored_file=store_file(uploaded_file),
+                question=question,
+                answer=answer,
+                uploaded_by=user,
+                name=os.path.basename(uploaded_file.name)[:255],
+            )
+        )
+    Attachment.objects.bulk_create(attachments)
+
+    pending = [
+        attachment.stored_file_id
+        for attachment in attachments
+        if not attachment.stored_file.thumbnail
+    ]
+    if pending:
+        transaction.on_commit(
+            lambda: thumbnail_executor.submit(
+                generate_thumbnails_in_background, pending
+            )
+        )
+    return attachments
+
+
+def generate_thumbnail(stored_file):
+    """
+    Generates and saves the thumbnail of the stored image. Returns whether
+    a thumbnail was made.
+    """
+    size = settings.ATTACHMENT_THUMBNAIL_SIZE
+    try:
+        with stored_file.file.open("rb") as file, Image.open(file) as image:
+            image.thumbnail((size, size))
+            if image.mode in ("RGBA", "LA", "P"):
+                image_format, extension = "PNG", "png"
+            else:
+                image_format, extension = "JPEG", "jpg"
+                image = image.convert("RGB")
+            buffer = BytesIO()
+            image.save(buffer, image_format)
+    except (OSError, Image.DecompressionBombError):
+        logger.exception("Cannot generate the thumbnail of %s", stored_file.sha256)
+        return False
+
+    stored_file.thumbnail.save(
+        f"thumbnail.{extension}", ContentFile(buffer.getvalue()), save=False
+    )
+    StoredFile.objects.filter(pk=stored_file.pk).update(
+        thumbnail=stored_file.thumbnail.name
+    )
+    return True
+
+
+def generate_thumbnails(pks):
+    """
+    Generates the missing thumbnails of the stored files, returns the
+    number of thumbnails made
+    """
+    count = 0
+    for stored_file in StoredFile.objects.filter(pk__in=pks, thumbnail=""):
+        count += generate_thumbnail(stored_file)
+    return count
+
+
+def generate_thumbnails_in_background(pks):
+    try:
+        generate_thumbnails(pks)
+    except Exception:
+        logger.exception("Thumbnail generation failed")
+    finally:
+        # The thread keeps running, its connection must not be left open
+        connection.close()
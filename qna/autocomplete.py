@@ -0,0 +1,260 @@
+"""
+In-process prefix index used to autocomplete question titles.
+
+Every worker keeps its own index of the most popular question titles. It
+is loaded in a background thread the first time it is needed, while the
+database answers in the meantime, and is then kept up to date from the
+rows changed since the last refresh, so a warm worker never touches the
+database to autocomplete. Removed titles shorten the prefix lists, which
+are only cut, so the index is loaded again in the background every
+`AUTOCOMPLETE_RELOAD_SECONDS` seconds.
+"""
+
+import bisect
+import heapq
+import threading
+import time
+
+from django.conf import settings
+from django.db import connection
+from django.db.models import Count, Q
+from django.utils import timezone
+
+from qna.models import Question
+from qna.similarity import TOKEN_PATTERN
+
+MAX_PREFIX_LENGTH = 12
+RESULTS_PER_PREFIX = 50
+
+
+def title_tokens(title):
+    """
+    Returns the lowercase words of a title
+    """
+    return TOKEN_PATTERN.findall(title.lower())
+
+
+def title_prefixes(title):
+    """
+    Returns every indexed prefix of the words of a title
+    """
+    return {
+        token[:length]
+        for token in title_tokens(title)
+        for length in range(1, min(len(token), MAX_PREFIX_LENGTH) + 1)
+    }
+
+
+def popular_questions():
+    """
+    Returns live questions annotated with their number of live answers
+    """
+    return Question.objects.filter(quarantined_at__isnull=True).annotate(
+        popularity=Count("answers", filter=Q(answers__deleted_at__isnull=True))
+    )
+
+
+class TitleIndex:
+    """
+    Maps word prefixes to the primary keys of the most popular questions
+    having a title word that starts with the prefix.
+
+    Prefix lists are replaced rather than mutated, so lookups never take
+    the lock and are not blocked by a refresh.
+    """
+
+    def __init__(self, max_titles=None, refresh_seconds=None, reload_seconds=None):
+        self.max_titles = max_titles or settings.AUTOCOMPLETE_MAX_TITLES
+        self.refresh_seconds = refresh_seconds or settings.AUTOCOMPLETE_REFRESH_SECONDS
+        self.reload_seconds = reload_seconds or settings.AUTOCOMPLETE_RELOAD_SECONDS
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        """
+        Drops the index so that the next lookup loads it again
+        """
+        self.titles = {}
+        self.prefixes = {}
+        # Heap of the titles by popularity, the least popular first. Entries
+        # of removed or updated titles are skipped when they come up.
+        self.evictions = []
+        self.loaded = False
+        self.loading = False
+        self.refreshed_at = None
+        self.checked_at = 0
+        self.loaded_at = 0
+
+    def _rank(self, pk):
+        return (-self.titles[pk][1], pk)
+
+    def _add(self, pk, title, popularity):
+        self.titles[pk] = (title, popularity)
+        heapq.heappush(self.evictions, (popularity, -pk, pk))
+        rank = self._rank(pk)
+        for prefix in title_prefixes(title):
+            pks = list(self.prefixes.get(prefix, ()))
+            position = bisect.bisect([self._rank(other) for other in pks], rank)
+            if position < RESULTS_PER_PREFIX:
+                pks.insert(position, pk)
+                self.prefixes[prefix] = pks[:RESULTS_PER_PREFIX]
+
+    def _remove(self, pk):
+        title, _ = self.titles.pop(pk)
+        for prefix in title_prefixes(title):
+            pks = [other for other in self.prefixes.get(prefix, ()) if other != pk]
+            if pks:
+                self.prefixes[prefix] = pks
+            else:
+                self.prefixes.pop(prefix, None)
+
+    def _least_popular(self):
+        if len(self.evictions) > 2 * len(self.titles):
+            self.evictions = [
+                (popularity, -pk, pk) for pk, (_, popularity) in self.titles.items()
+            ]
+            heapq.heapify(self.evictions)
+        while self.evictions:
+            popularity, _, pk = self.evictions[0]
+            if pk in self.titles and self.titles[pk][1] == popularity:
+                return pk
+            heapq.heappop(self.evictions)
+
+    def _upsert(self, pk, title, popularity):
+        if pk in self.titles:
+            self._remove(pk)
+        elif len(self.titles) >= self.max_titles:
+            # Memory stays bounded: a new title only gets in by evicting a
+            # less popular one
+            least_popular = self._least_popular()
+            if self.titles[least_popular][1] >= popularity:
+                return
+            self._remove(least_popular)
+        self._add(pk, title, popularity)
+
+    def load(self):
+        """
+        Loads the most popular titles from the database. The index is built
+        aside and swapped in, lookups use the previous one meanwhile.
+        """
+        refreshed_at = timezone.now()
+        index = type(self)(self.max_titles, self.refresh_seconds, self.reload_seconds)
+        rows = (
+            popular_questions()
+            .order_by("-popularity", "pk")
+            .values_list("pk", "title", "popularity")[: self.max_titles]
+        )
+        for pk, title, popularity in rows.iterator():
+            index._add(pk, title, popularity)
+        with self._lock:
+            self.titles = index.titles
+            self.prefixes = index.prefixes
+            self.evictions = index.evictions
+            # The changes made while loading are applied by the next refresh
+            self.refreshed_at = refreshed_at
+            self.checked_at = self.loaded_at = time.monotonic()
+            self.loaded = True
+            self.loading = False
+
+    def refresh(self):
+        """
+        Applies the questions edited, deleted or answered since the last
+        refresh
+        """
+        with self._lock:
+            since = self.refreshed_at
+            self.refreshed_at = timezone.now()
+            changed_pks = set(
+                Question.objects.with_trashed()
+                .filter(Q(updated_at__gte=since) | Q(answers__updated_at__gte=since))
+                .values_list("pk", flat=True)
+            )
+            rows = {
+                pk: (title, popularity)
+                for pk, title, popularity in popular_questions()
+                .filter(pk__in=changed_pks)
+                .values_list("pk", "title", "popularity")
+            }
+            for pk in changed_pks:
+                if pk in rows:
+                    self._upsert(pk, *rows[pk])
+                elif pk in self.titles:
+                    self._remove(pk)
+            self.checked_at = time.monotonic()
+
+    def _load_in_background(self):
+        try:
+            self.load()
+        finally:
+            self.loading = False
+            connection.close()
+
+    def start_loading(self):
+        """
+        Starts loading the index in a background thread, unless it is
+        already being loaded or was loaded less than
+        `AUTOCOMPLETE_RELOAD_SECONDS` seconds ago
+        """
+        with self._lock:
+            if self.loading or (
+                self.loaded and time.monotonic() - self.loaded_at < self.reload_seconds
+            ):
+                return
+            self.loading = True
+        threading.Thread(target=self._load_in_background, daemon=True).start()
+
+    def search(self, query, limit):
+        """
+        Returns up to `limit` `(pk, title)` pairs of the most popular titles
+        matching every word of the query, the last word being matched as a
+        prefix. Returns None when the index is not loaded yet.
+        """
+        if not self.loaded:
+            self.start_loading()
+            return None
+        if time.monotonic() - self.loaded_at > self.reload_seconds:
+            self.start_loading()
+        if time.monotonic() - self.checked_at > self.refresh_seconds:
+            self.refresh()
+
+        tokens = title_tokens(query)
+        if not tokens:
+            return []
+        *words, prefix = tokens
+        results = []
+        for pk in self.prefixes.get(prefix[:MAX_PREFIX_LENGTH], ()):
+            title, _ = self.titles.get(pk, ("", 0))
+            title_words = title_tokens(title)
+            if not any(word.startswith(prefix) for word in title_words):
+                continue
+            if all(word in title_words for word in words):
+                results.append((pk, title))
+                if len(results) == limit:
+                    break
+        return results
+
+
+def search_in_database(query, limit):
+    """
+    Fallback used by workers whose index is not loaded yet
+    """
+    return list(
+        Question.objects.filter(
+            title__istartswith=query.strip(), quarantined_at__isnull=True
+        )
+        .order_by("-created_at")
+        .values_list("pk", "title")[:limit]
+    )
+
+
+title_index = TitleIndex()
+
+
+def autocomplete(query, limit):
+    """
+    Returns up to `limit` `(pk, title)` pairs of questions matching the query
+    """
+    results = title_index.search(query, limit)
+    if results is None:
+        results = search_in_database(query, limit)
+    return results
@@ -0,0 +1,95 @@
+"""
+Append-only event log feeding the site statistics.
+
+Events are buffered in memory by each worker once their transaction
+commits, and written with a single INSERT per batch when a request
+finishes, as soon as `EVENTS_BATCH_SIZE` events are pending or
+`EVENTS_FLUSH_INTERVAL` seconds after the last write. The events still
+buffered when a worker is killed are lost, the statistics are meant to
+show trends rather than exact counts.
+"""
+
+import atexit
+import logging
+import threading
+import time
+
+from django.conf import settings
+from django.db import DatabaseError, close_old_connections, connection, transaction
+from django.utils import timezone
+
+from qna.models import Event
+
+logger = logging.getLogger(__name__)
+
+
+class EventBuffer:
+    """
+    Events of this worker waiting to be written
+    """
+
+    def __init__(self):
+        self.events = []
+        self._lock = threading.Lock()
+        self._last_flush = time.monotonic()
+
+    def add(self, event):
+        with self._lock:
+            self.events.append(event)
+
+    def flush(self, force=False):
+        """
+        Writes the pending events if there are enough of them or the last
+        write is old enough, returns the number of events written
+        """
+        with self._lock:
+            now = time.monotonic()
+            if not self.events or (
+                not force
+                and len(self.events) < settings.EVENTS_BATCH_SIZE
+                and now - self._last_flush < settings.EVENTS_FLUSH_INTERVAL
+            ):
+                return 0
+            events, self.events = self.events, []
+            self._last_flush = now
+        try:
+            Event.objects.bulk_create(events, batch_size=settings.EVENTS_BATCH_SIZE)
+        except DatabaseError:
+            logger.exception("Cannot write %d events, they are lost", len(events))
+            return 0
+        return len(events)
+
+
+event_buffer = EventBuffer()
+
+
+def record(kind, user=None, object_ids=()):
+    """
+    Buffers events of the given kind about the objects, once the current
+    transaction commits
+    """
+    now = timezone.now()
+    user_id = getattr(user, "pk", None)
+    events = [
+        Event(kind=kind, user_id=user_id, object_id=object_id, created_at=now)
+        for object_id in object_ids or [None]
+    ]
+
+    def add():
+        for event in events:
+            event_buffer.add(event)
+
+    transaction.on_commit(add)
+
+
+def flush_events(**kwargs):
+    """
+    Receiver of `request_finished`, which runs after Django closed the
+    connections of the request: a connection opened to write the events
+    is closed the same way.
+    """
+    if event_buffer.flush() and not connection.in_atomic_block:
+        close_old_connections()
+
+
+atexit.register(event_buffer.flush, force=True)
@@ -1,10 +1,61 @@
 from django import forms
+from django.conf import settings
 from django.contrib.auth.forms import UserCreationForm
 from django.contrib.auth.models import User
+from django.template.defaultfilters import filesizeformat
+
+from core.uploads import sniff_image_type
 from .models import Question, Answer
 
 
+class MultipleFileInput(forms.ClearableFileInput):
+    allow_multiple_selected = True
+
+
+class MultipleImageField(forms.FileField):
+    """
+    Field accepting several images, checked from their content rather
+    than from the name or the content type sent by the browser
+    """
+
+    widget = MultipleFileInput
+
+    def __init__(self, *args, **kwargs):
+        kwargs.setdefault("required", False)
+        kwargs.setdefault(
+            "widget",
+            MultipleFileInput(attrs={"class": "form-control", "accept": "image/*"}),
+        )
+        super().__init__(*args, **kwargs)
+
+    def clean(self, data, initial=None):
+        files = []
+        for file in data if isinstance(data, (list, tuple)) else [data]:
+            file = super().clean(file, initial)
+            if file:
+                files.append(file)
+        if len(files) > settings.ATTACHMENT_MAX_COUNT:
+            raise forms.ValidationError(
+                f"You can attach at most {settings.ATTACHMENT_MAX_COUNT} images."
+            )
+        for file in files:
+            if file.size > settings.ATTACHMENT_MAX_SIZE:
+                raise forms.ValidationError(
+                    f"{file.name} is larger than "
+                    f"{filesizeformat(settings.ATTACHMENT_MAX_SIZE)}."
+                )
+            content_type = sniff_image_type(file)
+            if content_type is None:
+                raise forms.ValidationError(
+                    f"{file.name} is not a PNG, JPEG, GIF or WebP image."
+                )
+            file.content_type = content_type
+        return files
+
+
 class QuestionForm(forms.ModelForm):
+    images = MultipleImageField()
+
     class Meta:
         model = Question
         fields = ["title", "content"]
@@ -15,6 +66,8 @@ class QuestionForm(forms.ModelForm):
 
 
 class AnswerForm(forms.ModelForm):
+    images = MultipleImageField()
+
     class Meta:
         model = Answer
         fields = ["content"]
@@ -0,0 +1,49 @@
+"""
+Live updates of the question detail page, pushed to the browsers reading
+the question over server-sent events
+"""
+
+from django.db import transaction
+
+from core.pubsub import broker
+
+
+def question_topic(question_pk):
+    return f"question:{question_pk}"
+
+
+def publish_on_commit(question_pk, event):
+    """
+    Publishes the event once the current transaction commits, so readers
+    never hear about rows they cannot read yet
+    """
+    transaction.on_commit(lambda: broker.publish(question_topic(question_pk), event))
+
+
+def publish_new_answer(answer):
+    publish_on_commit(
+        answer.question_id,
+        {
+            "type": "answer",
+            "answer_id": answer.pk,
+            "author": answer.author.username,
+        },
+    )
+
+
+def publish_like_count(answer):
+    publish_on_commit(
+        answer.question_id,
+        {
+            "type": "likes",
+            "answer_id": answer.pk,
+            "count": answer.likes.count(),
+        },
+    )
+
+
+def publish_score(answer, score):
+    publish_on_commit(
+        answer.question_id,
+        {"type": "score", "answer_id": answer.pk, "score": score},
+    )
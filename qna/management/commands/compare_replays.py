@@ -0,0 +1,66 @@
+from django.core.management.base import BaseCommand
+
+from core.slow_queries import read_log
+from core.traffic import summarize
+
+
+def change(before, after):
+    if not before:
+        return ""
+    return f"{(after - before) / before:+.0%}"
+
+
+class Command(BaseCommand):
+    help = (
+        "Compares the latency percentiles per view of two replays written by "
+        "replay_traffic, typically of the builds before and after a change"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("baseline", help="Results of the baseline build")
+        parser.add_argument("candidate", help="Results of the candidate build")
+        parser.add_argument(
+            "--threshold",
+            type=float,
+            default=0.1,
+            help="Relative p95 slowdown reported as a regression",
+        )
+
+    def handle(self, *args, **options):
+        baseline = summarize(read_log(options["baseline"]))
+        candidate = summarize(read_log(options["candidate"]))
+        if None not in baseline or None not in candidate:
+            self.stdout.write("Nothing to compare")
+            return
+        views = sorted(
+            (view for view in baseline.keys() & candidate.keys() if view is not None),
+            key=lambda view: -baseline[view]["count"],
+        )
+        regressions = []
+        for view in [None, *views]:
+            before, after = baseline[view], candidate[view]
+            if "p50" not in before or "p50" not in after:
+                continue
+            columns = "  ".join(
+                f"{name} {before[name] * 1000:.1f}ms -> {after[name] * 1000:.1f}ms "
+                f"({change(before[name], after[name])})"
+                for name in ("p50", "p95", "p99")
+            )
+            label = "all requests" if view is None else view
+            self.stdout.write(
+                f"{label:<30} {before['count']:>6} / {after['count']:<6} {columns}"
+            )
+            if after["errors"] > before["errors"]:
+                self.stdout.write(f"  errors {before['errors']} -> {after['errors']}")
+            if after["p95"] > before["p95"] * (1 + options["threshold"]):
+                regressions.append(label)
+
+        missing = (baseline.keys() ^ candidate.keys()) - {None}
+        if missing:
+            self.stdout.write(f"Views replayed once only: {', '.join(sorted(missing))}")
+        if regressions:
+            self.stdout.write(
+                self.style.WARNING(f"p95 regressions: {', '.join(regressions)}")
+            )
+        else:
+            self.stdout.write(self.style.SUCCESS("No p95 regression"))
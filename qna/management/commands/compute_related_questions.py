@@ -0,0 +1,42 @@
+from django.core.management.base import BaseCommand
+
+from qna.similarity import (
+    DEFAULT_BATCH_SIZE,
+    DEFAULT_TOP_K,
+    compute_related_questions,
+    update_related_questions,
+)
+
+
+class Command(BaseCommand):
+    help = "Precomputes the related questions shown on the question detail page"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--top-k",
+            type=int,
+            default=DEFAULT_TOP_K,
+            help="Number of related questions stored per question",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=DEFAULT_BATCH_SIZE,
+            help="Number of questions read and written per batch",
+        )
+        parser.add_argument(
+            "--incremental",
+            action="store_true",
+            help="Only process the questions not processed yet",
+        )
+
+    def handle(self, *args, **options):
+        compute = (
+            update_related_questions
+            if options["incremental"]
+            else compute_related_questions
+        )
+        count = compute(top_k=options["top_k"], batch_size=options["batch_size"])
+        self.stdout.write(
+            self.style.SUCCESS(f"Updated related questions of {count} questions")
+        )
@@ -0,0 +1,13 @@
+from django.core.management.base import BaseCommand
+
+from qna.attachments import generate_thumbnails
+from qna.models import StoredFile
+
+
+class Command(BaseCommand):
+    help = "Generates the thumbnails missing from the stored attachments"
+
+    def handle(self, *args, **options):
+        pks = StoredFile.objects.filter(thumbnail="").values_list("pk", flat=True)
+        count = generate_thumbnails(list(pks))
+        self.stdout.write(self.style.SUCCESS(f"Generated {count} thumbnails"))
@@ -0,0 +1,50 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from qna.retention import DEFAULT_BATCH_SIZE, purge_trashed
+
+
+class Command(BaseCommand):
+    help = "Archives and hard deletes questions and answers trashed long ago"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--days",
+            type=int,
+            default=settings.SOFT_DELETE_RETENTION_DAYS,
+            help="Purge rows trashed more than this many days ago",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=DEFAULT_BATCH_SIZE,
+            help="Number of rows purged per transaction",
+        )
+        parser.add_argument(
+            "--pause",
+            type=float,
+            default=0.1,
+            help="Seconds to sleep between batches",
+        )
+        parser.add_argument(
+            "--no-archive",
+            action="store_true",
+            help="Hard delete the rows without copying them to the archive",
+        )
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="Only count the rows that would be purged",
+        )
+
+    def handle(self, *args, **options):
+        purged = purge_trashed(
+            days=options["days"],
+            batch_size=options["batch_size"],
+            pause=options["pause"],
+            archive_rows=not options["no_archive"],
+            dry_run=options["dry_run"],
+        )
+        verb = "Would purge" if options["dry_run"] else "Purged"
+        for model_name, count in purged.items():
+            self.stdout.write(self.style.SUCCESS(f"{verb} {count} {model_name} rows"))
@@ -0,0 +1,63 @@
+from django.core.management.base import BaseCommand
+
+from qna.models import Answer, Question
+
+DEFAULT_BATCH_SIZE = 500
+
+
+def render_rows(model, batch_size=DEFAULT_BATCH_SIZE, everything=False):
+    """
+    This function renders the stored content of the rows of `model` in
+    keyset ordered batches, by default only the rows never rendered. The
+    rows are written with `bulk_update` so `updated_at` is left untouched.
+    """
+    fields = ["content_html"]
+    if model is Question:
+        fields.append("excerpt")
+
+    rows = model.objects.with_trashed().only("pk", "content")
+    if not everything:
+        rows = rows.filter(content_html="").exclude(content="")
+
+    count = 0
+    last_pk = 0
+    while True:
+        batch = list(rows.filter(pk__gt=last_pk).order_by("pk")[:batch_size])
+        if not batch:
+            return count
+        for row in batch:
+            row.render_content()
+        model.objects.bulk_update(batch, fields)
+        count += len(batch)
+        last_pk = batch[-1].pk
+
+
+class Command(BaseCommand):
+    help = "Renders the HTML and the excerpt of the existing questions and answers"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=DEFAULT_BATCH_SIZE,
+            help="Number of rows read and written per batch",
+        )
+        parser.add_argument(
+            "--all",
+            action="store_true",
+            dest="everything",
+            help="Render every row again, not only the rows never rendered",
+        )
+
+    def handle(self, *args, **options):
+        for model in (Question, Answer):
+            count = render_rows(
+                model,
+                batch_size=options["batch_size"],
+                everything=options["everything"],
+            )
+            self.stdout.write(
+                self.style.SUCCESS(
+                    f"Rendered {count} {model._meta.verbose_name_plural}"
+                )
+            )
@@ -0,0 +1,32 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from qna.snapshots import refresh_snapshots
+
+
+class Command(BaseCommand):
+    help = (
+        "Renders the static snapshots of the most viewed questions and deletes "
+        "those of the questions which are no longer"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--count",
+            type=int,
+            default=settings.SNAPSHOT_COUNT,
+            help="Number of most viewed questions with a snapshot",
+        )
+        parser.add_argument(
+            "--full",
+            action="store_true",
+            help="Render every snapshot, not only the missing and old ones",
+        )
+
+    def handle(self, *args, **options):
+        rendered, removed = refresh_snapshots(options["count"], full=options["full"])
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Rendered {rendered} snapshots, deleted {removed} snapshots"
+            )
+        )
@@ -0,0 +1,75 @@
+import json
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from core.slow_queries import read_log
+from core.traffic import replay, summarize
+
+
+class Command(BaseCommand):
+    help = (
+        "Sends the captured traffic again to a local instance and writes the "
+        "latency of each request, to compare with compare_replays"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "output", help="JSON lines file receiving the result of each request"
+        )
+        parser.add_argument(
+            "--log",
+            default=settings.TRAFFIC_CAPTURE_LOG,
+            help="Captured traffic, defaults to TRAFFIC_CAPTURE_LOG",
+        )
+        parser.add_argument(
+            "--base-url",
+            default="http://127.0.0.1:8000",
+            help="Instance receiving the requests",
+        )
+        parser.add_argument(
+            "--speed",
+            type=float,
+            default=1.0,
+            help="Pacing relative to the capture, 0 to send as fast as possible",
+        )
+        parser.add_argument(
+            "--concurrency", type=int, default=8, help="Requests sent at once at most"
+        )
+        parser.add_argument(
+            "--timeout", type=float, default=30.0, help="Timeout of each request"
+        )
+        parser.add_argument(
+            "--limit", type=int, help="Only replay the first requests captured"
+        )
+
+    def handle(self, *args, **options):
+        records = list(read_log(options["log"]))
+        records.sort(key=lambda record: record["time"])
+        if options["limit"] is not None:
+            records = records[: options["limit"]]
+
+        results = []
+        with open(options["output"], "w") as file:
+            for result in replay(
+                records,
+                options["base_url"],
+                speed=options["speed"],
+                concurrency=options["concurrency"],
+                timeout=options["timeout"],
+            ):
+                file.write(json.dumps(result) + "\n")
+                results.append(result)
+
+        overall = summarize(results).get(None)
+        if overall is None:
+            self.stdout.write("No request to replay")
+            return
+        message = f"Replayed {overall['count']} requests, {overall['errors']} errors"
+        if "p50" in overall:
+            message += (
+                f", p50 {overall['p50'] * 1000:.1f}ms"
+                f" p95 {overall['p95'] * 1000:.1f}ms"
+                f" p99 {overall['p99'] * 1000:.1f}ms"
+            )
+        self.stdout.write(self.style.SUCCESS(message))
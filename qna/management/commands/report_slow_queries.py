@@ -0,0 +1,58 @@
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from core.slow_queries import aggregate, read_log
+
+
+class Command(BaseCommand):
+    help = (
+        "Reports the query shapes of the slow query log taking the most time, "
+        "with their latency percentiles"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--top", type=int, default=20, help="Number of query shapes reported"
+        )
+        parser.add_argument(
+            "--hours",
+            type=float,
+            help="Only report the queries of the last hours",
+        )
+        parser.add_argument("--view", help="Only report the queries of this URL name")
+        parser.add_argument(
+            "--plans", action="store_true", help="Print the plans of the queries"
+        )
+
+    def handle(self, *args, **options):
+        since = None
+        if options["hours"] is not None:
+            since = time.time() - options["hours"] * 60 * 60
+        statistics = aggregate(
+            read_log(settings.SLOW_QUERY_LOG), since=since, view=options["view"]
+        )
+        if not statistics:
+            self.stdout.write("No slow queries logged")
+            return
+
+        for entry in statistics[: options["top"]]:
+            views = ", ".join(
+                f"{view} ({count})" for view, count in entry["views"].most_common(3)
+            )
+            self.stdout.write(
+                self.style.SUCCESS(
+                    f"{entry['fingerprint']}  {entry['count']} queries  "
+                    f"total {entry['total']:.2f}s  "
+                    f"p50 {entry['p50'] * 1000:.0f}ms  "
+                    f"p95 {entry['p95'] * 1000:.0f}ms  "
+                    f"p99 {entry['p99'] * 1000:.0f}ms  "
+                    f"max {entry['max'] * 1000:.0f}ms"
+                )
+            )
+            self.stdout.write(f"  views: {views}")
+            self.stdout.write(f"  {entry['sql']}")
+            if options["plans"] and entry["plan"]:
+                for line in entry["plan"].splitlines():
+                    self.stdout.write(f"    {line}")
@@ -0,0 +1,25 @@
+from django.core.management.base import BaseCommand
+
+from qna.models import StatRollup
+from qna.rollups import purge_events, rollup
+
+
+class Command(BaseCommand):
+    help = (
+        "Rolls the event log up into the hourly and daily statistics, then "
+        "purges the old events"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--full",
+            action="store_true",
+            help="Recompute every period of the logged events, not only the latest",
+        )
+
+    def handle(self, *args, **options):
+        for period in (StatRollup.HOUR, StatRollup.DAY):
+            count = rollup(period, full=options["full"])
+            self.stdout.write(self.style.SUCCESS(f"Wrote {count} {period} rollups"))
+        count = purge_events()
+        self.stdout.write(self.style.SUCCESS(f"Purged {count} events"))
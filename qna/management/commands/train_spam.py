@@ -0,0 +1,53 @@
+from django.core.management.base import BaseCommand
+
+from core.admin import batched_pks
+from qna.models import Answer, Question, SpamFeature
+from qna.spam import learn_posts
+
+DEFAULT_BATCH_SIZE = 500
+
+
+def train(model, spam, batch_size=DEFAULT_BATCH_SIZE):
+    """
+    This function learns the existing posts of `model`: the published
+    live ones as legitimate posts, the ones held for review then deleted
+    as spam. It returns the number of posts learned.
+    """
+    if spam:
+        rows = model.objects.trashed().filter(quarantined_at__isnull=False)
+    else:
+        rows = model.objects.filter(quarantined_at__isnull=True)
+    count = 0
+    for pks in batched_pks(rows, batch_size):
+        count += learn_posts(model.objects.with_trashed().filter(pk__in=pks), spam)
+    return count
+
+
+class Command(BaseCommand):
+    help = "Trains the spam filter on the existing questions and answers"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=DEFAULT_BATCH_SIZE,
+            help="Number of posts learned per batch",
+        )
+        parser.add_argument(
+            "--reset",
+            action="store_true",
+            help="Forget what was learned before, moderator decisions included",
+        )
+
+    def handle(self, *args, **options):
+        if options["reset"]:
+            SpamFeature.objects.all().delete()
+        for model in (Question, Answer):
+            for spam in (True, False):
+                count = train(model, spam, batch_size=options["batch_size"])
+                self.stdout.write(
+                    self.style.SUCCESS(
+                        f"Learned {count} {model._meta.verbose_name_plural} "
+                        f"as {'spam' if spam else 'legitimate'}"
+                    )
+                )
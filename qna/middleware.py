@@ -0,0 +1,117 @@
+import os
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.http import HttpResponse
+from django.middleware.clickjacking import XFrameOptionsMiddleware
+from django.middleware.security import SecurityMiddleware
+from django.urls import Resolver404, resolve
+from django.utils.cache import patch_vary_headers
+
+from core.stale import is_cacheable
+from qna.events import record
+from qna.models import Event
+from qna.snapshots import snapshot_path
+
+
+def is_question_page(request):
+    return (
+        getattr(request, "resolver_match", None) is not None
+        and request.resolver_match.url_name == "question_detail"
+    )
+
+
+def loaded_user(request):
+    """
+    Returns the user of the request when the view loaded it, or None.
+    Loading it here would read the session and the user once the response
+    is built, from the event loop under ASGI.
+    """
+    return getattr(request, "_cached_user", None) or getattr(
+        request, "_acached_user", None
+    )
+
+
+class SnapshotMiddleware:
+    """
+    Middleware serving the snapshots of the popular questions to anonymous
+    visitors, see qna/snapshots.py, and counting the views of the
+    questions which choose them. The snapshots skip the middleware below,
+    the security and clickjacking ones apply their headers here.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.security = SecurityMiddleware(get_response)
+        self.clickjacking = XFrameOptionsMiddleware(get_response)
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        response = self.snapshot_response(request)
+        if response is None:
+            response = self.get_response(request)
+        self.count_view(request, response)
+        return response
+
+    async def __acall__(self, request):
+        response = self.snapshot_response(request)
+        if response is None:
+            response = await self.get_response(request)
+        self.count_view(request, response)
+        return response
+
+    def snapshot_response(self, request):
+        """
+        Returns the response serving the snapshot of the requested page,
+        or None when there is none or the visitor may see another page
+        """
+        if request.META.get("QUERY_STRING") or not is_cacheable(request):
+            return None
+        # Such as the redirect to HTTPS
+        if self.security.process_request(request) is not None:
+            return None
+        try:
+            match = resolve(request.path_info)
+        except Resolver404:
+            return None
+        if match.url_name != "question_detail":
+            return None
+
+        pk = match.kwargs["pk"]
+        if not os.path.exists(snapshot_path(pk)):
+            return None
+        compressed = "gzip" in request.headers.get("Accept-Encoding", "")
+        try:
+            with open(snapshot_path(pk, compressed=compressed), "rb") as file:
+                content = file.read()
+        except FileNotFoundError:
+            # Deleted since the question changed, the page is rendered
+            return None
+
+        request.resolver_match = match
+        response = HttpResponse(content, content_type="text/html; charset=utf-8")
+        if compressed:
+            response["Content-Encoding"] = "gzip"
+        patch_vary_headers(response, ["Accept-Encoding"])
+        response["X-Snapshot"] = "1"
+        response = self.clickjacking.process_response(request, response)
+        return self.security.process_response(request, response)
+
+    def count_view(self, request, response):
+        # Stale pages are served while the database is down, and the view
+        # would not be written anyway
+        if (
+            response.status_code == 200
+            and "X-Stale" not in response
+            and is_question_page(request)
+        ):
+            record(
+                Event.QUESTION_VIEWED,
+                loaded_user(request),
+                [request.resolver_match.kwargs["pk"]],
+            )
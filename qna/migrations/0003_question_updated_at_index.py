@@ -0,0 +1,19 @@
+# Generated by Django 5.2.18 on 2026-10-19 14:52
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('qna', '0002_related_question'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='question',
+            index=models.Index(fields=['updated_at'], name='qna_questio_updated_9a1616_idx'),
+        ),
+    ]
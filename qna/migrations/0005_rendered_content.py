@@ -0,0 +1,28 @@
+# Generated by Django 5.2.18 on 2026-10-19 15:03
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("qna", "0004_archived_record"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="answer",
+            name="content_html",
+            field=models.TextField(blank=True, default="", editable=False),
+        ),
+        migrations.AddField(
+            model_name="question",
+            name="content_html",
+            field=models.TextField(blank=True, default="", editable=False),
+        ),
+        migrations.AddField(
+            model_name="question",
+            name="excerpt",
+            field=models.TextField(blank=True, default="", editable=False),
+        ),
+    ]
@@ -0,0 +1,39 @@
+# Generated by Django 5.2.18 on 2026-10-19 15:09
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("qna", "0006_attachments"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="answer",
+            index=models.Index(
+                fields=["created_at"], name="qna_answer_created_f4b742_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="answer",
+            index=models.Index(
+                fields=["deleted_at"], name="qna_answer_deleted_6d4fe9_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="question",
+            index=models.Index(
+                fields=["created_at"], name="qna_questio_created_f57e7e_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="question",
+            index=models.Index(
+                fields=["deleted_at"], name="qna_questio_deleted_baa5cb_idx"
+            ),
+        ),
+    ]
@@ -0,0 +1,86 @@
+# Generated by Django 5.2.18 on 2026-10-19 15:10
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("qna", "0007_admin_indexes"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="Vote",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+                ("updated_at", models.DateTimeField(auto_now=True)),
+                ("value", models.SmallIntegerField(choices=[(1, "Up"), (-1, "Down")])),
+            ],
+        ),
+        migrations.AlterModelOptions(
+            name="answer",
+            options={"ordering": ["-is_accepted", "-score", "created_at"]},
+        ),
+        migrations.AddField(
+            model_name="answer",
+            name="is_accepted",
+            field=models.BooleanField(default=False),
+        ),
+        migrations.AddField(
+            model_name="answer",
+            name="score",
+            field=models.IntegerField(default=0),
+        ),
+        migrations.AddIndex(
+            model_name="answer",
+            index=models.Index(
+                fields=["question", "-is_accepted", "-score", "created_at"],
+                name="qna_answer_ranking_idx",
+            ),
+        ),
+        migrations.AddConstraint(
+            model_name="answer",
+            constraint=models.UniqueConstraint(
+                condition=models.Q(("is_accepted", True)),
+                fields=("question",),
+                name="unique_accepted_answer",
+            ),
+        ),
+        migrations.AddField(
+            model_name="vote",
+            name="answer",
+            field=models.ForeignKey(
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="votes",
+                to="qna.answer",
+            ),
+        ),
+        migrations.AddField(
+            model_name="vote",
+            name="user",
+            field=models.ForeignKey(
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="votes",
+                to=settings.AUTH_USER_MODEL,
+            ),
+        ),
+        migrations.AddConstraint(
+            model_name="vote",
+            constraint=models.UniqueConstraint(
+                fields=("answer", "user"), name="unique_vote_per_user"
+            ),
+        ),
+    ]
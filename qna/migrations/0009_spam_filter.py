@@ -0,0 +1,31 @@
+# Generated by Django 5.2.18 on 2026-10-19 15:18
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("qna", "0008_answer_votes"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="SpamFeature",
+            fields=[
+                ("bucket", models.IntegerField(primary_key=True, serialize=False)),
+                ("spam", models.BigIntegerField(default=0)),
+                ("ham", models.BigIntegerField(default=0)),
+            ],
+        ),
+        migrations.AddField(
+            model_name="answer",
+            name="quarantined_at",
+            field=models.DateTimeField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name="question",
+            name="quarantined_at",
+            field=models.DateTimeField(blank=True, editable=False, null=True),
+        ),
+    ]
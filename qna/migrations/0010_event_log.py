@@ -0,0 +1,74 @@
+# Generated by Django 5.2.18 on 2026-10-19 15:27
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("qna", "0009_spam_filter"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="Event",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "kind",
+                    models.SmallIntegerField(
+                        choices=[
+                            (1, "Question created"),
+                            (2, "Answer created"),
+                            (3, "Answer liked"),
+                            (4, "Answer unliked"),
+                            (5, "Question deleted"),
+                            (6, "Answer deleted"),
+                        ]
+                    ),
+                ),
+                ("user_id", models.BigIntegerField(null=True)),
+                ("object_id", models.BigIntegerField(null=True)),
+                ("created_at", models.DateTimeField(db_index=True)),
+            ],
+        ),
+        migrations.CreateModel(
+            name="StatRollup",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "period",
+                    models.CharField(
+                        choices=[("hour", "Hour"), ("day", "Day")], max_length=4
+                    ),
+                ),
+                ("start", models.DateTimeField()),
+                ("metric", models.CharField(max_length=32)),
+                ("value", models.BigIntegerField(default=0)),
+            ],
+            options={
+                "ordering": ["start"],
+                "constraints": [
+                    models.UniqueConstraint(
+                        fields=("period", "start", "metric"), name="unique_stat_rollup"
+                    )
+                ],
+            },
+        ),
+    ]
@@ -0,0 +1,28 @@
+# Generated by Django 5.2.18 on 2026-10-19 15:46
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("qna", "0011_follows_and_feed"),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="event",
+            name="kind",
+            field=models.SmallIntegerField(
+                choices=[
+                    (1, "Question created"),
+                    (2, "Answer created"),
+                    (3, "Answer liked"),
+                    (4, "Answer unliked"),
+                    (5, "Question deleted"),
+                    (6, "Answer deleted"),
+                    (7, "Question viewed"),
+                ]
+            ),
+        ),
+    ]
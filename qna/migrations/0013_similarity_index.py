@@ -0,0 +1,72 @@
+# Generated by Django 5.2.18 on 2026-10-19 16:02
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("qna", "0012_question_viewed_event"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="QuestionTerm",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("term", models.CharField(max_length=50)),
+                ("weight", models.FloatField()),
+            ],
+        ),
+        migrations.CreateModel(
+            name="TermFrequency",
+            fields=[
+                (
+                    "term",
+                    models.CharField(max_length=50, primary_key=True, serialize=False),
+                ),
+                ("documents", models.BigIntegerField(default=0)),
+            ],
+        ),
+        migrations.AddField(
+            model_name="question",
+            name="related_computed_at",
+            field=models.DateTimeField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddIndex(
+            model_name="question",
+            index=models.Index(
+                fields=["related_computed_at"], name="qna_questio_related_6b0b60_idx"
+            ),
+        ),
+        migrations.AddField(
+            model_name="questionterm",
+            name="question",
+            field=models.ForeignKey(
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="+",
+                to="qna.question",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="questionterm",
+            index=models.Index(fields=["term"], name="qna_questio_term_e1b9e5_idx"),
+        ),
+        migrations.AddConstraint(
+            model_name="questionterm",
+            constraint=models.UniqueConstraint(
+                fields=("question", "term"), name="unique_question_term"
+            ),
+        ),
+    ]
@@ -0,0 +1,21 @@
+# Generated by Django 5.2.18 on 2026-10-19 16:03
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("qna", "0013_similarity_index"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="answer",
+            index=models.Index(
+                fields=["updated_at"], name="qna_answer_updated_6462ee_idx"
+            ),
+        ),
+    ]
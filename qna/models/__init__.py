@@ -1,2 +1,15 @@
 from .answer import Answer
+from .archived_record import ArchivedRecord
+from .attachment import Attachment
+from .event import Event
+from .feed_item import FeedItem
 from .question import Question
+from .question_follow import QuestionFollow
+from .question_term import QuestionTerm
+from .related_question import RelatedQuestion
+from .spam_feature import SpamFeature
+from .stat_rollup import StatRollup
+from .stored_file import StoredFile
+from .term_frequency import TermFrequency
+from .user_follow import UserFollow
+from .vote import Vote
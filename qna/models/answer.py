@@ -1,17 +1,64 @@
 from django.db import models
 
 from accounts.models import User
-from core.db import SoftDeleteWithBaseModel
+from core.db import CachedSoftDeleteManager, SoftDeleteWithBaseModel
+from core.markdown import render_markdown
 from qna.models.question import Question
 
 
 class Answer(SoftDeleteWithBaseModel):
     content = models.TextField()
+    # Rendered from `content` on save, see core/markdown.py
+    content_html = models.TextField(blank=True, default="", editable=False)
     question = models.ForeignKey(
         Question, on_delete=models.CASCADE, related_name="answers"
     )
     author = models.ForeignKey(User, on_delete=models.CASCADE, related_name="answers")
     likes = models.ManyToManyField(User, related_name="liked_answers", blank=True)
+    # Sum of the votes, updated atomically with each vote by qna/votes.py
+    score = models.IntegerField(default=0)
+    is_accepted = models.BooleanField(default=False)
+    # Set when the spam filter holds the answer for review, only its
+    # author sees it until a moderator approves it
+    quarantined_at = models.DateTimeField(null=True, blank=True, editable=False)
+
+    objects = CachedSoftDeleteManager()
+
+    # Fields read by the spam filter, see qna/spam.py
+    spam_fields = ("content",)
 
     class Meta:
-        ordering = ["created_at"]
+        ordering = ["-is_accepted", "-score", "created_at"]
+        indexes = [
+            models.Index(fields=["created_at"]),
+            models.Index(fields=["updated_at"]),
+            models.Index(fields=["deleted_at"]),
+            models.Index(
+                fields=["question", "-is_accepted", "-score", "created_at"],
+                name="qna_answer_ranking_idx",
+            ),
+        ]
+        constraints = [
+            models.UniqueConstraint(
+                fields=["question"],
+                condition=models.Q(is_accepted=True),
+                name="unique_accepted_answer",
+            ),
+        ]
+
+    def render_content(self):
+        """
+        This function renders the Markdown content
+        """
+        self.content_html = render_markdown(self.content)
+
+    def save(self, *args, **kwargs):
+        update_fields = kwargs.get("update_fields")
+        # Instances loaded with the content deferred only save loaded fields
+        if "content" not in self.get_deferred_fields() and (
+            update_fields is None or "content" in update_fields
+        ):
+            self.render_content()
+            if update_fields is not None:
+                kwargs["update_fields"] = {*update_fields, "content_html"}
+        super().save(*args, **kwargs)
@@ -0,0 +1,20 @@
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import models
+
+
+class ArchivedRecord(models.Model):
+    """
+    Copy of a soft-deleted row kept after it has been purged from its
+    table. `data` holds the row serialized with Django's python serializer,
+    many-to-many relations included.
+    """
+
+    model_label = models.CharField(max_length=100)
+    object_id = models.BigIntegerField()
+    data = models.JSONField(encoder=DjangoJSONEncoder)
+    deleted_at = models.DateTimeField(null=True)
+    archived_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ["-archived_at"]
+        indexes = [models.Index(fields=["model_label", "object_id"])]
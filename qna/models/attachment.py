@@ -0,0 +1,47 @@
+from django.db import models
+
+from accounts.models import User
+from core.db import BaseModel
+from qna.models.answer import Answer
+from qna.models.question import Question
+from qna.models.stored_file import StoredFile
+
+
+class Attachment(BaseModel):
+    """
+    Image attached to either a question or an answer
+    """
+
+    stored_file = models.ForeignKey(
+        StoredFile, on_delete=models.PROTECT, related_name="attachments"
+    )
+    question = models.ForeignKey(
+        Question,
+        on_delete=models.CASCADE,
+        related_name="attachments",
+        null=True,
+        blank=True,
+    )
+    answer = models.ForeignKey(
+        Answer,
+        on_delete=models.CASCADE,
+        related_name="attachments",
+        null=True,
+        blank=True,
+    )
+    uploaded_by = models.ForeignKey(
+        User, on_delete=models.CASCADE, related_name="attachments"
+    )
+    name = models.CharField(max_length=255)
+
+    class Meta:
+        ordering = ["created_at"]
+        constraints = [
+            models.CheckConstraint(
+                condition=(
+                    models.Q(question__isnull=False, answer__isnull=True)
+                    | models.Q(question__isnull=True, answer__isnull=False)
+                ),
+                name="attachment_has_one_parent",
+            ),
+        ]
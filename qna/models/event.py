@@ -0,0 +1,32 @@
+from django.db import models
+
+
+class Event(models.Model):
+    """
+    Append-only log of what users do on the site, written in batches by
+    qna/events.py and aggregated into `StatRollup` rows. Users and objects
+    are plain ids so the log never slows down nor blocks their deletion.
+    """
+
+    QUESTION_CREATED = 1
+    ANSWER_CREATED = 2
+    ANSWER_LIKED = 3
+    ANSWER_UNLIKED = 4
+    QUESTION_DELETED = 5
+    ANSWER_DELETED = 6
+    QUESTION_VIEWED = 7
+    KIND_CHOICES = [
+        (QUESTION_CREATED, "Question created"),
+        (ANSWER_CREATED, "Answer created"),
+        (ANSWER_LIKED, "Answer liked"),
+        (ANSWER_UNLIKED, "Answer unliked"),
+        (QUESTION_DELETED, "Question deleted"),
+        (ANSWER_DELETED, "Answer deleted"),
+        (QUESTION_VIEWED, "Question viewed"),
+    ]
+
+    kind = models.SmallIntegerField(choices=KIND_CHOICES)
+    user_id = models.BigIntegerField(null=True)
+    object_id = models.BigIntegerField(null=True)
+    # Set when the event happens, not when its batch is written
+    created_at = models.DateTimeField(db_index=True)
@@ -0,0 +1,36 @@
+from django.db import models
+
+from accounts.models import User
+from qna.models.answer import Answer
+from qna.models.question import Question
+
+
+class FeedItem(models.Model):
+    """
+    Entry of the inbox of a user, written by the fan-out of qna/activity.py
+    when a followed user asks a question or a followed question is
+    answered. Inboxes are capped to `FEED_INBOX_SIZE` entries and read
+    newest first through the inbox index.
+    """
+
+    NEW_QUESTION = 1
+    NEW_ANSWER = 2
+    KIND_CHOICES = [(NEW_QUESTION, "New question"), (NEW_ANSWER, "New answer")]
+
+    # Covered by the inbox index
+    user = models.ForeignKey(
+        User, on_delete=models.CASCADE, related_name="+", db_index=False
+    )
+    kind = models.SmallIntegerField(choices=KIND_CHOICES)
+    question = models.ForeignKey(Question, on_delete=models.CASCADE, related_name="+")
+    answer = models.ForeignKey(
+        Answer, on_delete=models.CASCADE, null=True, related_name="+"
+    )
+    # Creation date of the question or the answer, not of the entry
+    created_at = models.DateTimeField()
+
+    class Meta:
+        ordering = ["-created_at"]
+        indexes = [
+            models.Index(fields=["user", "-created_at"], name="qna_feeditem_inbox_idx"),
+        ]
@@ -1,13 +1,55 @@
 from django.db import models
 
 from accounts.models import User
-from core.db import SoftDeleteWithBaseModel
+from core.db import CachedSoftDeleteManager, SoftDeleteWithBaseModel
+from core.markdown import make_excerpt, render_markdown
 
 
 class Question(SoftDeleteWithBaseModel):
     title = models.CharField(max_length=200)
     content = models.TextField()
+    # Rendered from `content` on save, see core/markdown.py
+    content_html = models.TextField(blank=True, default="", editable=False)
+    excerpt = models.TextField(blank=True, default="", editable=False)
     author = models.ForeignKey(User, on_delete=models.CASCADE, related_name="questions")
+    # Set when the spam filter holds the question for review, only its
+    # author sees it until a moderator approves it
+    quarantined_at = models.DateTimeField(null=True, blank=True, editable=False)
+    # Set once the related questions are computed, the incremental updates
+    # only process the questions without it, see qna/similarity.py
+    related_computed_at = models.DateTimeField(null=True, blank=True, editable=False)
+
+    objects = CachedSoftDeleteManager()
+
+    soft_delete_cascade = ("answers",)
+    # Fields read by the spam filter, see qna/spam.py
+    spam_fields = ("title", "content")
 
     class Meta:
         ordering = ["-created_at"]
+        indexes = [
+            models.Index(fields=["updated_at"]),
+            models.Index(fields=["created_at"]),
+            models.Index(fields=["deleted_at"]),
+            # Questions of the popular authors pulled into the feeds
+            models.Index(fields=["author", "-created_at"]),
+            models.Index(fields=["related_computed_at"]),
+        ]
+
+    def render_content(self):
+        """
+        This function renders the Markdown content and its excerpt
+        """
+        self.content_html = render_markdown(self.content)
+        self.excerpt = make_excerpt(self.content_html)
+
+    def save(self, *args, **kwargs):
+        update_fields = kwargs.get("update_fields")
+        # Instances loaded with the content deferred only save loaded fields
+        if "content" not in self.get_deferred_fields() and (
+            update_fields is None or "content" in update_fields
+        ):
+            self.render_content()
+            if update_fields is not None:
+                kwargs["update_fields"] = {*update_fields, "content_html", "excerpt"}
+        super().save(*args, **kwargs)
@@ -0,0 +1,25 @@
+from django.db import models
+
+from accounts.models import User
+from core.db import BaseModel
+from qna.models.question import Question
+
+
+class QuestionFollow(BaseModel):
+    """
+    User following a question, its new answers reach the user's feed
+    """
+
+    user = models.ForeignKey(
+        User, on_delete=models.CASCADE, related_name="question_follows"
+    )
+    question = models.ForeignKey(
+        Question, on_delete=models.CASCADE, related_name="follows"
+    )
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["user", "question"], name="unique_question_follow"
+            ),
+        ]
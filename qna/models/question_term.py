@@ -0,0 +1,23 @@
+from django.db import models
+
+from qna.models.question import Question
+
+
+class QuestionTerm(models.Model):
+    """
+    Weight of a term in the TF-IDF vector of a question. The rows are the
+    inverted index new questions are compared with by the incremental
+    updates of the related questions, see qna/similarity.py.
+    """
+
+    question = models.ForeignKey(Question, on_delete=models.CASCADE, related_name="+")
+    term = models.CharField(max_length=50)
+    weight = models.FloatField()
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["question", "term"], name="unique_question_term"
+            ),
+        ]
+        indexes = [models.Index(fields=["term"])]
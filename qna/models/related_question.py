@@ -0,0 +1,28 @@
+from django.db import models
+
+from core.db import BaseModel
+from qna.models.question import Question
+
+
+class RelatedQuestion(BaseModel):
+    """
+    Precomputed neighbour of a question, ranked by the cosine similarity
+    of their TF-IDF vectors. Rows are written by the
+    `compute_related_questions` command so the detail page only has to
+    read them back.
+    """
+
+    question = models.ForeignKey(
+        Question, on_delete=models.CASCADE, related_name="related_entries"
+    )
+    related = models.ForeignKey(Question, on_delete=models.CASCADE, related_name="+")
+    score = models.FloatField()
+    rank = models.PositiveSmallIntegerField()
+
+    class Meta:
+        ordering = ["question", "rank"]
+        constraints = [
+            models.UniqueConstraint(
+                fields=["question", "rank"], name="unique_related_question_rank"
+            ),
+        ]
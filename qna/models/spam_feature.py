@@ -0,0 +1,13 @@
+from django.db import models
+
+
+class SpamFeature(models.Model):
+    """
+    Number of spam and legitimate posts having a feature, features being
+    hashed into a fixed number of buckets, see qna/spam.py. The row of
+    bucket -1 holds the number of posts learned.
+    """
+
+    bucket = models.IntegerField(primary_key=True)
+    spam = models.BigIntegerField(default=0)
+    ham = models.BigIntegerField(default=0)
@@ -0,0 +1,25 @@
+from django.db import models
+
+
+class StatRollup(models.Model):
+    """
+    Value of a site statistic over an hour or a day, computed from the
+    `Event` log by qna/rollups.py
+    """
+
+    HOUR = "hour"
+    DAY = "day"
+    PERIOD_CHOICES = [(HOUR, "Hour"), (DAY, "Day")]
+
+    period = models.CharField(max_length=4, choices=PERIOD_CHOICES)
+    start = models.DateTimeField()
+    metric = models.CharField(max_length=32)
+    value = models.BigIntegerField(default=0)
+
+    class Meta:
+        ordering = ["start"]
+        constraints = [
+            models.UniqueConstraint(
+                fields=["period", "start", "metric"], name="unique_stat_rollup"
+            ),
+        ]
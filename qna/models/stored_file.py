@@ -0,0 +1,39 @@
+import os
+
+from django.db import models
+
+from core.db import BaseModel
+
+
+def content_path(instance, filename):
+    """
+    Returns the path of a file from its SHA-256 digest, spread over two
+    levels of directories
+    """
+    digest = instance.sha256
+    extension = os.path.splitext(filename)[1].lower()
+    return f"attachments/{digest[:2]}/{digest[2:4]}/{digest}{extension}"
+
+
+def thumbnail_path(instance, filename):
+    digest = instance.sha256
+    extension = os.path.splitext(filename)[1].lower()
+    return f"thumbnails/{digest[:2]}/{digest[2:4]}/{digest}{extension}"
+
+
+class StoredFile(BaseModel):
+    """
+    Uploaded file stored once per content, identified by the SHA-256
+    digest of its bytes. Identical uploads share the same row and the
+    same file on disk.
+    """
+
+    sha256 = models.CharField(max_length=64, unique=True)
+    file = models.FileField(upload_to=content_path, max_length=200)
+    size = models.PositiveBigIntegerField()
+    content_type = models.CharField(max_length=50)
+    # Empty until generated in the background, see qna/attachments.py
+    thumbnail = models.FileField(upload_to=thumbnail_path, max_length=200, blank=True)
+
+    def __str__(self):
+        return self.sha256
@@ -0,0 +1,13 @@
+from django.db import models
+
+
+class TermFrequency(models.Model):
+    """
+    Number of questions using a term, kept between the runs of the
+    `compute_related_questions` command so new questions are weighted
+    against the whole corpus, see qna/similarity.py. The row of the empty
+    term holds the number of questions indexed.
+    """
+
+    term = models.CharField(max_length=50, primary_key=True)
+    documents = models.BigIntegerField(default=0)
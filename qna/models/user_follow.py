@@ -0,0 +1,29 @@
+from django.db import models
+
+from accounts.models import User
+from core.db import BaseModel
+
+
+class UserFollow(BaseModel):
+    """
+    User following another user, whose new questions reach the follower's
+    feed. `User.follower_count` is updated along with every follow.
+    """
+
+    follower = models.ForeignKey(
+        User, on_delete=models.CASCADE, related_name="following"
+    )
+    followee = models.ForeignKey(
+        User, on_delete=models.CASCADE, related_name="followers"
+    )
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["follower", "followee"], name="unique_user_follow"
+            ),
+            models.CheckConstraint(
+                condition=~models.Q(follower=models.F("followee")),
+                name="user_follow_not_self",
+            ),
+        ]
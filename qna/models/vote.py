@@ -0,0 +1,27 @@
+from django.db import models
+
+from accounts.models import User
+from core.db import BaseModel
+from qna.models.answer import Answer
+
+
+class Vote(BaseModel):
+    """
+    Up or down vote of a user on an answer. The sum of the votes is kept
+    in `Answer.score`, updated along with every vote.
+    """
+
+    UP = 1
+    DOWN = -1
+    VALUE_CHOICES = [(UP, "Up"), (DOWN, "Down")]
+
+    answer = models.ForeignKey(Answer, on_delete=models.CASCADE, related_name="votes")
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name="votes")
+    value = models.SmallIntegerField(choices=VALUE_CHOICES)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["answer", "user"], name="unique_vote_per_user"
+            ),
+        ]
@@ -0,0 +1,128 @@
+"""
+Retention policy for soft-deleted questions and answers.
+
+Rows trashed for longer than the retention period are copied to
+`ArchivedRecord` and then hard deleted, a small batch per transaction so
+the purge never holds locks on the hot tables for long.
+"""
+
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.core import serializers
+from django.db import transaction
+from django.utils import timezone
+
+from qna.models import Answer, ArchivedRecord, Question
+
+DEFAULT_BATCH_SIZE = 500
+
+
+def archive(queryset):
+    """
+    Copies the rows of the queryset to the archive table
+    """
+    records = [
+        ArchivedRecord(
+            model_label=row["model"],
+            object_id=row["pk"],
+            data=row["fields"],
+            deleted_at=row["fields"].get("deleted_at"),
+        )
+        for row in serializers.serialize("python", queryset)
+    ]
+    ArchivedRecord.objects.bulk_create(records)
+    return len(records)
+
+
+def purge_batch(model, pks, archive_rows=True):
+    """
+    Hard deletes the given rows in one transaction. Deleting a question
+    cascades to the answers it still has, so they are archived along with
+    it.
+    """
+    with transaction.atomic():
+        if archive_rows:
+            if model is Question:
+                archive(
+                    Answer.objects.with_trashed()
+                    .filter(question_id__in=pks)
+                    .prefetch_related("likes")
+                )
+                archive(Question.objects.with_trashed().filter(pk__in=pks))
+            else:
+                archive(
+                    model.objects.with_trashed()
+                    .filter(pk__in=pks)
+                    .prefetch_related("likes")
+                )
+        model.objects.with_trashed().filter(pk__in=pks).delete()
+
+
+def purge_answers_of(question_pks, batch_size, archive_rows=True, pause=0):
+    """
+    Purges the answers of the questions a batch at a time, so purging a
+    question with many answers does not delete them all in one transaction
+    """
+    while True:
+        pks = list(
+            Answer.objects.with_trashed()
+            .filter(question_id__in=question_pks)
+            .order_by("pk")
+            .values_list("pk", flat=True)[:batch_size]
+        )
+        if not pks:
+            return
+        purge_batch(Answer, pks, archive_rows)
+        if pause:
+            time.sleep(pause)
+
+
+def expired(model, cutoff):
+    """
+    Returns the rows of the model trashed before the cutoff
+    """
+    return model.objects.trashed().filter(deleted_at__lt=cutoff)
+
+
+def purge_trashed(
+    days=None,
+    batch_size=DEFAULT_BATCH_SIZE,
+    pause=0,
+    archive_rows=True,
+    dry_run=False,
+):
+    """
+    Purges the answers and questions trashed for more than `days` days,
+    sleeping `pause` seconds between batches. Answers go first, and the
+    answers of a batch of questions are purged in batches of their own
+    before the questions. Returns the number of purged rows per model
+    name.
+    """
+    if days is None:
+        days = settings.SOFT_DELETE_RETENTION_DAYS
+    cutoff = timezone.now() - timedelta(days=days)
+
+    purged = {}
+    for model in (Answer, Question):
+        if dry_run:
+            purged[model.__name__] = expired(model, cutoff).count()
+            continue
+
+        purged[model.__name__] = 0
+        while True:
+            pks = list(
+                expired(model, cutoff)
+                .order_by("pk")
+                .values_list("pk", flat=True)[:batch_size]
+            )
+            if not pks:
+                break
+            if model is Question:
+                purge_answers_of(pks, batch_size, archive_rows, pause)
+            purge_batch(model, pks, archive_rows)
+            purged[model.__name__] += len(pks)
+            if pause:
+                time.sleep(pause)
+    return purged
@@ -0,0 +1,112 @@
+"""
+Hourly and daily rollups of the event log.
+
+Statistics pages only read `StatRollup` rows, never the live tables. Each
+run recomputes the periods from the last but one rolled up period, which
+also catches the events written late by the buffers of the workers, and
+upserts one row per period and metric.
+"""
+
+from datetime import timedelta
+
+from django.conf import settings
+from django.db.models import Count
+from django.db.models.functions import TruncDay, TruncHour
+from django.utils import timezone
+
+from core.admin import batched_pks
+from qna.models import Event, StatRollup
+
+ACTIVE_USERS = "active_users"
+KIND_METRICS = {
+    Event.QUESTION_CREATED: "questions",
+    Event.ANSWER_CREATED: "answers",
+    Event.ANSWER_LIKED: "likes",
+    Event.ANSWER_UNLIKED: "unlikes",
+    Event.QUESTION_DELETED: "deleted_questions",
+    Event.ANSWER_DELETED: "deleted_answers",
+    Event.QUESTION_VIEWED: "question_views",
+}
+METRICS = [*KIND_METRICS.values(), ACTIVE_USERS]
+TRUNCATE = {StatRollup.HOUR: TruncHour, StatRollup.DAY: TruncDay}
+
+
+def rollup_start(period):
+    """
+    Returns the start of the last but one rolled up period, or None when
+    nothing was rolled up yet
+    """
+    starts = list(
+        StatRollup.objects.filter(period=period)
+        .order_by("-start")
+        .values_list("start", flat=True)
+        .distinct()[:2]
+    )
+    return starts[-1] if starts else None
+
+
+def rollup(period, full=False):
+    """
+    Recomputes the rollups of the periods from the last but one rolled up
+    period, or of every period of the events still logged when `full`.
+    Returns the number of rows written.
+    """
+    since = None if full else rollup_start(period)
+    events = Event.objects.all()
+    if since is not None:
+        events = events.filter(created_at__gte=since)
+    events = events.annotate(start=TRUNCATE[period]("created_at")).order_by()
+
+    values = {}
+    for row in events.values("start", "kind").annotate(count=Count("pk")):
+        values[row["start"], KIND_METRICS[row["kind"]]] = row["count"]
+    active_users = (
+        events.filter(user_id__isnull=False)
+        .values("start")
+        .annotate(count=Count("user_id", distinct=True))
+    )
+    for row in active_users:
+        values[row["start"], ACTIVE_USERS] = row["count"]
+
+    StatRollup.objects.bulk_create(
+        [
+            StatRollup(period=period, start=start, metric=metric, value=value)
+            for (start, metric), value in values.items()
+        ],
+        update_conflicts=True,
+        unique_fields=["period", "start", "metric"],
+        update_fields=["value"],
+        batch_size=1000,
+    )
+    return len(values)
+
+
+def purge_events(batch_size=1000):
+    """
+    Deletes the events older than `EVENTS_RETENTION_DAYS` days which were
+    rolled up, returns their number. Whole days are purged, so a full
+    rollup never rewrites a period from part of its events.
+    """
+    cutoff = timezone.localtime() - timedelta(days=settings.EVENTS_RETENTION_DAYS)
+    cutoff = cutoff.replace(hour=0, minute=0, second=0, microsecond=0)
+    rolled_up = rollup_start(StatRollup.DAY)
+    if rolled_up is None:
+        return 0
+    events = Event.objects.filter(created_at__lt=min(cutoff, rolled_up))
+    count = 0
+    for pks in batched_pks(events, batch_size):
+        count += Event.objects.filter(pk__in=pks).delete()[0]
+    return count
+
+
+def statistics(period, since):
+    """
+    Returns the rollups of the periods starting from `since` as a list of
+    (start, {metric: value}) pairs, oldest first
+    """
+    rows = {}
+    for start, metric, value in StatRollup.objects.filter(
+        period=period, start__gte=since
+    ).values_list("start", "metric", "value"):
+        rows.setdefault(start, dict.fromkeys(METRICS, 0))[metric] = value
+    return sorted(rows.items())
@@ -0,0 +1,405 @@
+"""
+TF-IDF similarity between questions, used to precompute the related
+questions shown on the question detail page.
+
+The vectors are sparse dictionaries rather than dense matrices: the
+vocabulary of a Q&A site is large and every question only uses a few
+dozen terms, so scoring through an inverted index only touches the
+questions that actually share a term.
+
+The document frequencies and the vectors are stored along with the
+related questions, so the incremental updates only read the questions
+not processed yet and compare them through the stored inverted index.
+"""
+
+import heapq
+import math
+import re
+from collections import Counter, defaultdict
+from operator import itemgetter
+
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+
+from core.cache import cached
+from qna.models import Question, QuestionTerm, RelatedQuestion, TermFrequency
+
+DEFAULT_TOP_K = 5
+DEFAULT_BATCH_SIZE = 500
+TERM_BATCH_SIZE = 1000
+RELATED_QUESTIONS_CACHE_TIMEOUT = 5 * 60
+
+# Title words describe the question better than the body, so they count
+# as if they appeared this many times
+TITLE_WEIGHT = 3
+
+# Only the highest weighted terms of a question are kept, which bounds the
+# cost of scoring a question regardless of its length
+MAX_TERMS_PER_QUESTION = 64
+
+# Terms used by more than this share of a large corpus carry no signal
+MAX_DOCUMENT_FREQUENCY_RATIO = 0.5
+MIN_CORPUS_SIZE_FOR_PRUNING = 20
+
+# Longer words are mostly identifiers and hashes, and would not fit the
+# `term` columns of the stored index
+MAX_TERM_LENGTH = 50
+# Term of the `TermFrequency` row counting the questions indexed
+DOCUMENTS_TERM = ""
+
+TOKEN_PATTERN = re.compile(r"[a-z0-9]+")
+STOP_WORDS = frozenset(
+    """
+    a an and are as at be but by can do does for from has have how i if in
+    is it its me my not of on or so that the this to was what when where
+    which who why will with would you your
+    """.split()
+)
+
+
+def tokenize(text):
+    """
+    Splits the text into lowercase words, ignoring stop words, single
+    characters and overly long words
+    """
+    return [
+        token
+        for token in TOKEN_PATTERN.findall(text.lower())
+        if 1 < len(token) <= MAX_TERM_LENGTH and token not in STOP_WORDS
+    ]
+
+
+def term_counts(title, content):
+    """
+    Returns the term frequencies of a question, with the title words
+    boosted by `TITLE_WEIGHT`
+    """
+    counts = Counter(tokenize(content))
+    for token in tokenize(title):
+        counts[token] += TITLE_WEIGHT
+    return counts
+
+
+def iter_questions(batch_size=DEFAULT_BATCH_SIZE):
+    """
+    Yields the primary key and term frequencies of every live question,
+    reading the table in keyset ordered batches so it is never loaded at
+    once
+    """
+    last_pk = 0
+    while True:
+        batch = list(
+            Question.objects.filter(pk__gt=last_pk, quarantined_at__isnull=True)
+            .order_by("pk")
+            .values_list("pk", "title", "content")[:batch_size]
+        )
+        if not batch:
+            return
+        for pk, title, content in batch:
+            yield pk, term_counts(title, content)
+        last_pk = batch[-1][0]
+
+
+def inverse_document_frequencies(document_frequencies, total):
+    """
+    Returns the IDF of the terms from the number of questions using them,
+    without the terms too common to carry any signal
+    """
+    max_frequency = total
+    if total >= MIN_CORPUS_SIZE_FOR_PRUNING:
+        max_frequency = total * MAX_DOCUMENT_FREQUENCY_RATIO
+    return {
+        term: math.log((1 + total) / (1 + frequency)) + 1
+        for term, frequency in document_frequencies.items()
+        if frequency <= max_frequency
+    }
+
+
+class TfidfIndex:
+    """
+    Normalised TF-IDF vectors of a corpus of questions together with an
+    inverted index from terms to the questions using them
+    """
+
+    def __init__(self):
+        self.vectors = {}
+        self.postings = defaultdict(list)
+        self.document_frequencies = Counter()
+
+    @classmethod
+    def build(cls, documents):
+        """
+        Builds the index from an iterable of `(pk, term counts)` pairs
+        """
+        documents = dict(documents)
+        index = cls()
+        for counts in documents.values():
+            index.document_frequencies.update(counts.keys())
+
+        idf = inverse_document_frequencies(index.document_frequencies, len(documents))
+        for pk, counts in documents.items():
+            index.add(pk, cls.vectorize(counts, idf))
+        return index
+
+    @staticmethod
+    def vectorize(counts, idf):
+        """
+        Converts term counts into a sublinear TF-IDF vector with unit length
+        """
+        weights = {
+            term: (1 + math.log(count)) * idf[term]
+            for term, count in counts.items()
+            if term in idf
+        }
+        if len(weights) > MAX_TERMS_PER_QUESTION:
+            weights = dict(
+                heapq.nlargest(
+                    MAX_TERMS_PER_QUESTION, weights.items(), key=itemgetter(1)
+                )
+            )
+        norm = math.sqrt(sum(weight * weight for weight in weights.values()))
+        if not norm:
+            return {}
+        return {term: weight / norm for term, weight in weights.items()}
+
+    def add(self, pk, vector):
+        self.vectors[pk] = vector
+        for term, weight in vector.items():
+            self.postings[term].append((pk, weight))
+
+    def neighbours(self, pk, top_k=DEFAULT_TOP_K):
+        """
+        Returns the `top_k` most similar questions as `(pk, score)` pairs,
+        best first
+        """
+        scores = defaultdict(float)
+        for term, weight in self.vectors.get(pk, {}).items():
+            for other_pk, other_weight in self.postings[term]:
+                if other_pk != pk:
+                    scores[other_pk] += weight * other_weight
+        return heapq.nlargest(top_k, scores.items(), key=itemgetter(1))
+
+
+@cached(timeout=RELATED_QUESTIONS_CACHE_TIMEOUT)
+def related_questions(question_pk):
+    """
+    Returns the live related questions of a question, best first
+    """
+    return [
+        entry.related
+        for entry in RelatedQuestion.objects.filter(
+            question_id=question_pk,
+            related__deleted_at__isnull=True,
+            related__quarantined_at__isnull=True,
+        ).select_related("related")
+    ]
+
+
+class StoredIndex:
+    """
+    The vectors stored in the `QuestionTerm` table, compared with a query
+    per question instead of loading the whole corpus
+    """
+
+    def __init__(self):
+        self.vectors = {}
+
+    def load(self, pks):
+        """
+        Loads the stored vectors of the questions which are not loaded yet
+        """
+        missing = [pk for pk in pks if pk not in self.vectors]
+        for pk in missing:
+            self.vectors[pk] = {}
+        for start in range(0, len(missing), TERM_BATCH_SIZE):
+            for pk, term, weight in QuestionTerm.objects.filter(
+                question_id__in=missing[start : start + TERM_BATCH_SIZE]
+            ).values_list("question_id", "term", "weight"):
+                self.vectors[pk][term] = weight
+
+    def neighbours(self, pk, top_k=DEFAULT_TOP_K):
+        """
+        Returns the `top_k` most similar live questions as `(pk, score)`
+        pairs, best first
+        """
+        vector = self.vectors.get(pk)
+        if not vector:
+            return []
+        postings = (
+            QuestionTerm.objects.filter(
+                term__in=vector,
+                question__deleted_at__isnull=True,
+                question__quarantined_at__isnull=True,
+            )
+            .exclude(question_id=pk)
+            .values_list("question_id", "term", "weight")
+        )
+        scores = defaultdict(float)
+        for other_pk, term, other_weight in postings:
+            scores[other_pk] += vector[term] * other_weight
+        return heapq.nlargest(top_k, scores.items(), key=itemgetter(1))
+
+
+def store_neighbours(index, pks, top_k=DEFAULT_TOP_K):
+    """
+    Replaces the stored related questions of the given questions in a
+    single transaction
+    """
+    rows = [
+        RelatedQuestion(question_id=pk, related_id=related_pk, score=score, rank=rank)
+        for pk in pks
+        for rank, (related_pk, score) in enumerate(index.neighbours(pk, top_k), start=1)
+    ]
+    with transaction.atomic():
+        RelatedQuestion.objects.filter(question_id__in=pks).delete()
+        RelatedQuestion.objects.bulk_create(rows)
+    for pk in pks:
+        related_questions.invalidate(pk)
+
+
+def _store_in_batches(index, pks, top_k, batch_size):
+    pks = list(pks)
+    for start in range(0, len(pks), batch_size):
+        store_neighbours(index, pks[start : start + batch_size], top_k)
+
+
+def store_vectors(vectors):
+    """
+    Replaces the stored vectors of the questions and marks them processed
+    """
+    pks = list(vectors)
+    with transaction.atomic():
+        QuestionTerm.objects.filter(question_id__in=pks).delete()
+        QuestionTerm.objects.bulk_create(
+            [
+                QuestionTerm(question_id=pk, term=term, weight=weight)
+                for pk, vector in vectors.items()
+                for term, weight in vector.items()
+            ],
+            batch_size=TERM_BATCH_SIZE,
+        )
+        Question.objects.with_trashed().filter(pk__in=pks).update(
+            related_computed_at=timezone.now()
+        )
+
+
+def store_index(index, batch_size):
+    """
+    Replaces the stored document frequencies and vectors by those of the
+    index
+    """
+    with transaction.atomic():
+        TermFrequency.objects.all().delete()
+        TermFrequency.objects.bulk_create(
+            [
+                TermFrequency(term=term, documents=documents)
+                for term, documents in index.document_frequencies.items()
+            ]
+            + [TermFrequency(term=DOCUMENTS_TERM, documents=len(index.vectors))],
+            batch_size=TERM_BATCH_SIZE,
+        )
+    QuestionTerm.objects.all().delete()
+    pks = list(index.vectors)
+    for start in range(0, len(pks), batch_size):
+        store_vectors({pk: index.vectors[pk] for pk in pks[start : start + batch_size]})
+
+
+def learn_document_frequencies(documents):
+    """
+    Adds the terms of the new questions to the stored document
+    frequencies. Rows are created empty then incremented in place, so
+    concurrent updates never lose counts.
+    """
+    counts = Counter()
+    for term_counts in documents.values():
+        counts.update(term_counts.keys())
+    counts[DOCUMENTS_TERM] += len(documents)
+    by_amount = defaultdict(list)
+    for term, amount in counts.items():
+        by_amount[amount].append(term)
+
+    with transaction.atomic():
+        TermFrequency.objects.bulk_create(
+            [TermFrequency(term=term) for term in counts],
+            ignore_conflicts=True,
+            batch_size=TERM_BATCH_SIZE,
+        )
+        for amount, terms in by_amount.items():
+            for start in range(0, len(terms), TERM_BATCH_SIZE):
+                TermFrequency.objects.filter(
+                    term__in=terms[start : start + TERM_BATCH_SIZE]
+                ).update(documents=F("documents") + amount)
+
+
+def load_document_frequencies(terms):
+    """
+    Returns the stored document frequencies of the terms and the number of
+    questions indexed
+    """
+    terms = [DOCUMENTS_TERM, *terms]
+    frequencies = {}
+    for start in range(0, len(terms), TERM_BATCH_SIZE):
+        frequencies.update(
+            TermFrequency.objects.filter(
+                term__in=terms[start : start + TERM_BATCH_SIZE]
+            ).values_list("term", "documents")
+        )
+    return frequencies, frequencies.pop(DOCUMENTS_TERM, 0)
+
+
+def compute_related_questions(top_k=DEFAULT_TOP_K, batch_size=DEFAULT_BATCH_SIZE):
+    """
+    Recomputes the related questions of every live question, along with
+    the stored document frequencies and vectors the incremental updates
+    start from. Returns the number of questions processed.
+    """
+    index = TfidfIndex.build(iter_questions(batch_size))
+    store_index(index, batch_size)
+    _store_in_batches(index, index.vectors, top_k, batch_size)
+    return len(index.vectors)
+
+
+def update_related_questions(top_k=DEFAULT_TOP_K, batch_size=DEFAULT_BATCH_SIZE):
+    """
+    Computes the related questions of the questions not processed yet,
+    weighted with the stored document frequencies, and refreshes the
+    questions they are closest to so new questions also show up next to
+    older ones. The vectors of the older questions keep the weights of
+    their own run until the next full computation. Returns the number of
+    questions processed.
+    """
+    processed = 0
+    while True:
+        # Processed questions are marked, the next batch starts after them
+        documents = {
+            pk: term_counts(title, content)
+            for pk, title, content in Question.objects.filter(
+                related_computed_at__isnull=True, quarantined_at__isnull=True
+            )
+            .order_by("pk")
+            .values_list("pk", "title", "content")[:batch_size]
+        }
+        if not documents:
+            return processed
+
+        learn_document_frequencies(documents)
+        frequencies, total = load_document_frequencies(
+            {term for counts in documents.values() for term in counts}
+        )
+        idf = inverse_document_frequencies(frequencies, total)
+        vectors = {
+            pk: TfidfIndex.vectorize(counts, idf) for pk, counts in documents.items()
+        }
+        store_vectors(vectors)
+
+        index = StoredIndex()
+        index.vectors.update(vectors)
+        affected_pks = set(vectors)
+        for pk in vectors:
+            affected_pks.update(
+                related_pk for related_pk, _ in index.neighbours(pk, top_k)
+            )
+        index.load(affected_pks)
+        _store_in_batches(index, sorted(affected_pks), top_k, batch_size)
+        processed += len(affected_pks)
@@ -0,0 +1,226 @@
+"""
+Static snapshots of the most viewed questions.
+
+The pages of the `SNAPSHOT_COUNT` questions viewed the most over the last
+`SNAPSHOT_VIEWS_DAYS` days are rendered as anonymous visitors see them
+into `SNAPSHOT_DIR`, along with a gzip variant. `SnapshotMiddleware`
+serves them to anonymous visitors before the session, the user or any
+row is loaded, only checking that the file exists.
+
+When a question, one of its answers, their votes or likes change, the
+snapshot is deleted once the transaction commits and rendered again in a
+background thread. `python manage.py render_snapshots`, meant to run
+every few minutes, renders the snapshots of the questions becoming
+popular, deletes those of the questions which are no longer, and renders
+again the snapshots older than `SNAPSHOT_MAX_AGE` seconds, which catches
+the changes made by other bulk updates.
+"""
+
+import gzip
+import logging
+import os
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+
+from django.conf import settings
+from django.contrib.auth.models import AnonymousUser
+from django.db import connection, transaction
+from django.db.models import Count
+from django.http import Http404, HttpRequest
+from django.urls import resolve, reverse
+from django.utils import timezone
+
+from qna.models import Answer, Event, Question
+
+logger = logging.getLogger(__name__)
+
+snapshot_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="snapshots")
+
+SNAPSHOT_PATTERN = re.compile(r"question-(\d+)\.html")
+
+# Questions waiting for their snapshot to be rendered in the background
+pending = set()
+pending_lock = threading.Lock()
+
+
+def snapshot_path(pk, compressed=False):
+    name = f"question-{pk}.html"
+    if compressed:
+        name += ".gz"
+    return os.path.join(settings.SNAPSHOT_DIR, name)
+
+
+def render_question(pk):
+    """
+    Returns the page of the question as anonymous visitors see it, or None
+    when they cannot see it or it holds a CSRF token, which every visitor
+    would share without the matching cookie
+    """
+    request = HttpRequest()
+    request.method = "GET"
+    request.path = request.path_info = reverse("question_detail", kwargs={"pk": pk})
+    request.user = AnonymousUser()
+    match = resolve(request.path_info)
+    try:
+        response = match.func(request, *match.args, **match.kwargs)
+    except Http404:
+        return None
+    if hasattr(response, "render"):
+        response.render()
+    if response.status_code != 200:
+        return None
+    if "CSRF_COOKIE" in request.META:
+        logger.warning("The page of question %s has a form, it is not saved", pk)
+        return None
+    return response.content
+
+
+def write_file(path, content):
+    # Written aside and renamed, the middleware never reads a partial file
+    temporary = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    with open(temporary, "wb") as file:
+        file.write(content)
+    os.replace(temporary, path)
+
+
+def write_snapshot(pk):
+    """
+    Renders the snapshot of the question, or deletes it when anonymous
+    visitors cannot see the question. Returns whether it was rendered.
+    """
+    content = render_question(pk)
+    if content is None:
+        remove_snapshot(pk)
+        return False
+    os.makedirs(settings.SNAPSHOT_DIR, exist_ok=True)
+    # The compressed variant first, it is only served when the page exists
+    write_file(snapshot_path(pk, compressed=True), gzip.compress(content, mtime=0))
+    write_file(snapshot_path(pk), content)
+    return True
+
+
+def remove_snapshot(pk):
+    """
+    Deletes the snapshot of the question, returns whether there was one
+    """
+    existed = False
+    for path in (snapshot_path(pk), snapshot_path(pk, compressed=True)):
+        try:
+            os.remove(path)
+            existed = True
+        except FileNotFoundError:
+            pass
+    return existed
+
+
+def render_in_background(pk):
+    with pending_lock:
+        pending.discard(pk)
+    try:
+        write_snapshot(pk)
+    except Exception:
+        logger.exception("Cannot render the snapshot of question %s", pk)
+    finally:
+        # The thread keeps running, its connection must not be left open
+        connection.close()
+
+
+def invalidate_snapshots(question_ids):
+    """
+    Deletes the snapshots of the questions once the current transaction
+    commits, and renders again in the background those which existed
+    """
+    question_ids = set(question_ids)
+
+    def invalidate():
+        for pk in question_ids:
+            if not remove_snapshot(pk):
+                continue
+            with pending_lock:
+                if pk in pending:
+                    continue
+                pending.add(pk)
+            snapshot_executor.submit(render_in_background, pk)
+
+    transaction.on_commit(invalidate)
+
+
+def invalidate_posts(model, pks):
+    """
+    Invalidates the snapshots of the questions or of the questions of the
+    answers with the given primary keys
+    """
+    if model is Question:
+        invalidate_snapshots(pks)
+    else:
+        invalidate_snapshots(
+            Answer.objects.with_trashed()
+            .filter(pk__in=pks)
+            .values_list("question_id", flat=True)
+        )
+
+
+def post_changed(sender, instance, **kwargs):
+    """
+    Receiver of the saves and deletes of questions and answers
+    """
+    if sender is Question:
+        invalidate_snapshots([instance.pk])
+    else:
+        invalidate_snapshots([instance.question_id])
+
+
+def popular_questions(count):
+    """
+    Returns the primary keys of the `count` questions viewed the most over
+    the last `SNAPSHOT_VIEWS_DAYS` days which anonymous visitors can see,
+    the most viewed first
+    """
+    since = timezone.now() - timedelta(days=settings.SNAPSHOT_VIEWS_DAYS)
+    pks = list(
+        Event.objects.filter(kind=Event.QUESTION_VIEWED, created_at__gte=since)
+        .values("object_id")
+        .annotate(views=Count("pk"))
+        .order_by("-views", "object_id")
+        .values_list("object_id", flat=True)[:count]
+    )
+    visible = set(
+        Question.objects.filter(pk__in=pks, quarantined_at__isnull=True).values_list(
+            "pk", flat=True
+        )
+    )
+    return [pk for pk in pks if pk in visible]
+
+
+def refresh_snapshots(count, full=False):
+    """
+    Renders the snapshots of the most viewed questions which are missing,
+    older than `SNAPSHOT_MAX_AGE` seconds or all of them when `full`, and
+    deletes the others. Returns the numbers of snapshots rendered and
+    deleted.
+    """
+    wanted = popular_questions(count)
+    rendered = 0
+    now = time.time()
+    for pk in wanted:
+        try:
+            age = now - os.path.getmtime(snapshot_path(pk))
+        except FileNotFoundError:
+            age = None
+        if full or age is None or age >= settings.SNAPSHOT_MAX_AGE:
+            rendered += write_snapshot(pk)
+
+    removed = 0
+    wanted = set(wanted)
+    try:
+        names = os.listdir(settings.SNAPSHOT_DIR)
+    except FileNotFoundError:
+        names = []
+    for name in names:
+        match = SNAPSHOT_PATTERN.fullmatch(name)
+        if match and int(match[1]) not in wanted:
+            removed += remove_snapshot(int(match[1]))
+    return rendered, removed
@@ -0,0 +1,280 @@
+"""
+Naive Bayes spam filter screening questions and answers as they are
+posted.
+
+Words and word pairs are hashed into `FEATURE_BUCKETS` buckets, so the
+model has a fixed size whatever the vocabulary: the counts live in the
+`SpamFeature` table and every worker keeps a flat array of per bucket
+log likelihood ratios. Scoring a post is one array lookup per feature.
+
+Posts are scored in a thread pool and the request only waits
+`SPAM_TIMEOUT` seconds for the verdict; a post whose score is late, or
+posted before the worker loaded the model, is published. The model
+learns from the posts moderators delete or approve in the admin, and
+workers reload it every `SPAM_REFRESH_INTERVAL` seconds when it changed.
+"""
+
+import logging
+import math
+import re
+import threading
+import time
+import zlib
+from array import array
+from collections import Counter, defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeoutError
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models import F
+from django.utils import timezone
+
+from core import metrics
+from qna.models import SpamFeature
+
+logger = logging.getLogger(__name__)
+
+FEATURE_BITS = 18
+FEATURE_BUCKETS = 1 << FEATURE_BITS
+FEATURE_MASK = FEATURE_BUCKETS - 1
+# Bucket of the `SpamFeature` row counting the posts learned
+DOCUMENTS_BUCKET = -1
+
+# Only the beginning of long posts is read, which bounds the cost of
+# scoring a post
+MAX_WORDS = 1000
+# Additive smoothing of the per bucket counts
+ALPHA = 1.0
+# Features seen in fewer posts are mostly noise, and naive Bayes adds up
+# the noise of every one of them
+MIN_FEATURE_POSTS = 3
+UPDATE_BATCH_SIZE = 1000
+
+TOKEN_PATTERN = re.compile(r"[a-z0-9$€£]+(?:[.'][a-z0-9]+)*")
+
+spam_executor = ThreadPoolExecutor(
+    max_workers=settings.SPAM_WORKERS, thread_name_prefix="spam"
+)
+# The model is reloaded apart, a slow reload must not delay the checks
+refresh_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="spam-refresh")
+
+
+def features(text):
+    """
+    Returns the buckets of the words and pairs of consecutive words of the
+    text, each bucket once
+    """
+    words = TOKEN_PATTERN.findall(text.lower())[:MAX_WORDS]
+    pairs = [f"{first} {second}" for first, second in zip(words, words[1:])]
+    return {zlib.crc32(token.encode()) & FEATURE_MASK for token in words + pairs}
+
+
+def post_text(post):
+    return "\n".join(getattr(post, name) for name in post.spam_fields)
+
+
+def feature_counts(texts):
+    """
+    Returns the number of texts having each bucket, along with the number
+    of texts under `DOCUMENTS_BUCKET`
+    """
+    counts = Counter()
+    for text in texts:
+        counts.update(features(text))
+        counts[DOCUMENTS_BUCKET] += 1
+    return counts
+
+
+class SpamModel:
+    """
+    Log likelihood ratios of the buckets between spam and legitimate
+    posts, built from (bucket, spam, ham) counts
+    """
+
+    def __init__(self, rows):
+        self.spam_documents = self.ham_documents = 0
+        features = []
+        for row in rows:
+            if row[0] == DOCUMENTS_BUCKET:
+                _, self.spam_documents, self.ham_documents = row
+            else:
+                features.append(row)
+
+        # Features are compared on the share of the posts of each class
+        # having them, so longer spam posts do not make every ordinary
+        # word look legitimate. The smoothing is split between the classes
+        # like the posts, so a rare word counts for the class it was seen
+        # in however unbalanced the classes are.
+        documents = self.spam_documents + self.ham_documents
+        spam_share = self.spam_documents / documents if documents else 0.5
+        spam_alpha, ham_alpha = ALPHA * spam_share, ALPHA * (1 - spam_share)
+        offset = math.log(self.ham_documents + ALPHA) - math.log(
+            self.spam_documents + ALPHA
+        )
+        # Buckets never seen carry no evidence either way
+        self.weights = array("d", bytes(8 * FEATURE_BUCKETS))
+        for bucket, spam, ham in features:
+            if spam + ham < MIN_FEATURE_POSTS:
+                continue
+            self.weights[bucket] = (
+                math.log(spam + spam_alpha) - math.log(ham + ham_alpha) + offset
+            )
+        self.prior = math.log(self.spam_documents + 1) - math.log(
+            self.ham_documents + 1
+        )
+
+    @property
+    def version(self):
+        return (self.spam_documents, self.ham_documents)
+
+    @property
+    def is_trained(self):
+        minimum = settings.SPAM_MIN_DOCUMENTS
+        return self.spam_documents >= minimum and self.ham_documents >= minimum
+
+    def probability(self, text):
+        """
+        Returns the probability that the text is spam
+        """
+        score = self.prior + sum(map(self.weights.__getitem__, features(text)))
+        return 1 / (1 + math.exp(-max(min(score, 50), -50)))
+
+
+class SpamFilter:
+    """
+    Model of this worker, reloaded in a background thread once the stored
+    counts changed
+    """
+
+    def __init__(self):
+        self.model = None
+        self.checked_at = 0
+        self._lock = threading.Lock()
+        self._refreshing = False
+
+    def reload(self):
+        """
+        Loads the model from the stored counts
+        """
+        self.model = SpamModel(SpamFeature.objects.values_list("bucket", "spam", "ham"))
+        self.checked_at = time.monotonic()
+
+    def refresh(self):
+        try:
+            version = (
+                SpamFeature.objects.filter(bucket=DOCUMENTS_BUCKET)
+                .values_list("spam", "ham")
+                .first()
+            )
+            if self.model is None or (version or (0, 0)) != self.model.version:
+                self.reload()
+        except Exception:
+            logger.exception("Cannot load the spam model")
+        finally:
+            self._refreshing = False
+            # The thread keeps running, its connection must not be left open
+            connection.close()
+
+    def schedule_refresh(self):
+        """
+        Checks the stored counts in the background if they were not
+        checked for `SPAM_REFRESH_INTERVAL` seconds
+        """
+        with self._lock:
+            now = time.monotonic()
+            if self._refreshing or (
+                self.model is not None
+                and now - self.checked_at < settings.SPAM_REFRESH_INTERVAL
+            ):
+                return
+            self._refreshing = True
+            self.checked_at = now
+        refresh_executor.submit(self.refresh)
+
+    def probability(self, text):
+        """
+        Returns the probability that the text is spam, or None when no
+        trained model is loaded yet
+        """
+        self.schedule_refresh()
+        model = self.model
+        if model is None or not model.is_trained:
+            return None
+        return model.probability(text)
+
+
+spam_filter = SpamFilter()
+
+
+def is_spam(text):
+    """
+    Returns whether the text is spam, waiting at most `SPAM_TIMEOUT`
+    seconds for the verdict
+    """
+    if not settings.SPAM_FILTER_ENABLED:
+        return False
+    future = spam_executor.submit(spam_filter.probability, text)
+    try:
+        probability = future.result(timeout=settings.SPAM_TIMEOUT)
+    except FutureTimeoutError:
+        future.cancel()
+        metrics.spam_checks.inc("timeout")
+        return False
+    except Exception:
+        logger.exception("Spam check failed")
+        metrics.spam_checks.inc("error")
+        return False
+    if probability is None:
+        metrics.spam_checks.inc("untrained")
+        return False
+    result = probability >= settings.SPAM_THRESHOLD
+    metrics.spam_checks.inc("spam" if result else "ham")
+    return result
+
+
+def screen(post):
+    """
+    Quarantines the question or answer about to be saved if it looks like
+    spam, returns whether it is quarantined
+    """
+    if post.quarantined_at is None and is_spam(post_text(post)):
+        post.quarantined_at = timezone.now()
+    return post.quarantined_at is not None
+
+
+def learn(texts, spam):
+    """
+    Adds the texts to the stored counts as spam or legitimate posts. Rows
+    are created empty then incremented in place, so concurrent updates
+    never lose counts.
+    """
+    counts = feature_counts(texts)
+    if not counts:
+        return 0
+    field = "spam" if spam else "ham"
+    by_amount = defaultdict(list)
+    for bucket, amount in counts.items():
+        by_amount[amount].append(bucket)
+
+    with transaction.atomic():
+        SpamFeature.objects.bulk_create(
+            [SpamFeature(bucket=bucket) for bucket in counts],
+            ignore_conflicts=True,
+            batch_size=UPDATE_BATCH_SIZE,
+        )
+        for amount, buckets in by_amount.items():
+            for start in range(0, len(buckets), UPDATE_BATCH_SIZE):
+                SpamFeature.objects.filter(
+                    bucket__in=buckets[start : start + UPDATE_BATCH_SIZE]
+                ).update(**{field: F(field) + amount})
+    return counts[DOCUMENTS_BUCKET]
+
+
+def learn_posts(queryset, spam):
+    """
+    Learns the questions or answers of the queryset as spam or legitimate
+    posts, returns their number
+    """
+    fields = queryset.model.spam_fields
+    return learn(("\n".join(values) for values in queryset.values_list(*fields)), spam)
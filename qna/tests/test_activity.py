@@ -0,0 +1,178 @@
+from datetime import timedelta
+from unittest import mock
+
+from django.test import override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from core.base_test import BaseTestCase
+from qna.activity import (
+    fan_out_answers,
+    fan_out_in_background,
+    fan_out_questions,
+    feed,
+    follow_user,
+    unfollow_user,
+)
+from qna.events import event_buffer
+from qna.models import Answer, FeedItem, Question, QuestionFollow, UserFollow
+
+
+class ActivityTestCase(BaseTestCase):
+    def setUp(self):
+        super().setUp()
+        self.user = self.create_user()
+        self.author = self.create_user()
+        self.addCleanup(event_buffer.events.clear)
+
+    def ask(self, author=None, **kwargs):
+        return Question.objects.create(
+            title=self.faker.sentence(),
+            content=self.faker.paragraph(),
+            author=author or self.author,
+            **kwargs,
+        )
+
+    def test_follow_user(self):
+        """
+        To make sure that follows keep the follower count and unfollowing
+        drops the questions of the user from the inbox
+        """
+        self.authenticate(self.user)
+        url = reverse("follow_user", args=[self.author.pk])
+        self.make_post_request(url)
+        self.author.refresh_from_db()
+        self.assertEqual(self.author.follower_count, 1)
+        self.assertFalse(follow_user(self.user, self.author))
+
+        question = self.ask()
+        fan_out_questions([question.pk])
+        self.assertEqual(FeedItem.objects.filter(user=self.user).count(), 1)
+
+        response = self.make_post_request(url, {"next": "https://example.com/"})
+        self.assertEqual(response.url, reverse("activity_feed"))
+        self.author.refresh_from_db()
+        self.assertEqual(self.author.follower_count, 0)
+        self.assertFalse(FeedItem.objects.exists())
+        self.assertFalse(unfollow_user(self.user, self.author))
+
+        self.make_post_request(reverse("follow_user", args=[self.user.pk]))
+        self.assertFalse(UserFollow.objects.exists())
+
+    def test_fan_out_on_write(self):
+        """
+        To make sure that new questions and answers are copied to the
+        inboxes of the followers, except the author's own
+        """
+        follow_user(self.user, self.author)
+        question = self.ask()
+        self.assertEqual(fan_out_questions([question.pk]), 1)
+
+        QuestionFollow.objects.create(user=self.user, question=question)
+        QuestionFollow.objects.create(user=self.author, question=question)
+        answer = Answer.objects.create(
+            content="Answer", author=self.author, question=question
+        )
+        self.assertEqual(fan_out_answers([answer.pk]), 1)
+
+        items = feed(self.user)
+        self.assertEqual(
+            [(item.kind, item.answer_id) for item in items],
+            [(FeedItem.NEW_ANSWER, answer.pk), (FeedItem.NEW_QUESTION, None)],
+        )
+
+        answer.delete()
+        self.assertEqual(len(feed(self.user)), 1)
+
+    @override_settings(FEED_FANOUT_LIMIT=1)
+    def test_fan_out_on_read(self):
+        """
+        To make sure that the questions of popular authors are pulled when
+        reading the feeds, merged with the inbox by date
+        """
+        follow_user(self.user, self.author)
+        old_question = self.ask()
+        fan_out_questions([old_question.pk])
+        follow_user(self.create_user(), self.author)
+        other_author = self.create_user()
+        follow_user(self.user, other_author)
+
+        questions = [self.ask(), self.ask(other_author), self.ask()]
+        self.assertEqual(fan_out_questions([questions[0].pk, questions[2].pk]), 0)
+        fan_out_questions([questions[1].pk])
+        self.ask(quarantined_at=timezone.now())
+
+        with self.assertNumQueries(3):
+            items = feed(self.user)
+        self.assertEqual(
+            [item.question for item in items], [*reversed(questions), old_question]
+        )
+        items = feed(self.user, before=questions[1].created_at)
+        self.assertEqual(
+            [item.question for item in items], [questions[0], old_question]
+        )
+
+    @override_settings(FEED_INBOX_SIZE=2, FEED_TRIM_EVERY=1)
+    def test_trim(self):
+        """
+        To make sure that the inboxes keep their newest entries only
+        """
+        follow_user(self.user, self.author)
+        questions = [self.ask() for _ in range(4)]
+        for question in questions:
+            fan_out_questions([question.pk])
+        self.assertEqual(
+            [item.question for item in FeedItem.objects.filter(user=self.user)],
+            [questions[3], questions[2]],
+        )
+
+    def test_views(self):
+        """
+        To make sure that posting schedules the fan-out once the transaction
+        commits, and that the feed is paginated by date
+        """
+        self.authenticate(self.author)
+        with (
+            mock.patch("qna.activity.feed_executor") as executor,
+            self.captureOnCommitCallbacks(execute=True),
+        ):
+            self.make_post_request(
+                reverse("create_question"),
+                {"title": "Question", "content": "Content"},
+            )
+        question = Question.objects.get()
+        executor.submit.assert_called_once_with(
+            fan_out_in_background, fan_out_questions, [question.pk]
+        )
+        # Authors follow their questions
+        self.assertTrue(
+            QuestionFollow.objects.filter(user=self.author, question=question).exists()
+        )
+
+        self.authenticate(self.user)
+        self.make_post_request(reverse("follow_question", args=[question.pk]))
+        response = self.make_get_request(reverse("question_detail", args=[question.pk]))
+        self.assertTrue(response.context["follows_question"])
+        self.assertFalse(response.context["follows_author"])
+
+        now = timezone.now()
+        FeedItem.objects.bulk_create(
+            FeedItem(
+                user=self.user,
+                kind=FeedItem.NEW_QUESTION,
+                question=question,
+                created_at=now - timedelta(minutes=index),
+            )
+            for index in range(3)
+        )
+        with override_settings(FEED_PAGE_SIZE=2):
+            response = self.make_get_request(reverse("activity_feed"))
+            self.assertEqual(len(response.context["items"]), 2)
+            response = self.make_get_request(
+                reverse("activity_feed"), {"before": response.context["next_before"]}
+            )
+        self.assertEqual(len(response.context["items"]), 1)
+        self.assertNotIn("next_before", response.context)
+
+        response = self.make_get_request(reverse("activity_feed"), {"before": "x"})
+        self.assertEqual(response.status_code, 400)
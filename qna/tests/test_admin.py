@@ -0,0 +1,120 @@
+from unittest import mock
+
+from django.test import override_settings
+from django.urls import reverse
+
+from core.base_test import BaseTestCase
+from qna.models import Answer, Question
+
+
+class ContentAdminTestCase(BaseTestCase):
+    def setUp(self):
+        super().setUp()
+        self.admin = self.create_user()
+        self.admin.is_staff = self.admin.is_superuser = True
+        self.admin.save()
+        self.authenticate(self.admin)
+        self.author = self.create_user()
+        self.questions = [
+            Question.objects.create(
+                title=self.faker.sentence(),
+                content=self.faker.paragraph(),
+                author=self.author,
+            )
+            for _ in range(3)
+        ]
+        self.answer = Answer.objects.create(
+            content=self.faker.paragraph(),
+            author=self.admin,
+            question=self.questions[0],
+        )
+
+    def run_action(self, model, action, objects):
+        return self.make_post_request(
+            reverse(f"admin:qna_{model._meta.model_name}_changelist"),
+            {
+                "action": action,
+                "_selected_action": [obj.pk for obj in objects],
+            },
+        )
+
+    def test_changelist(self):
+        """
+        To make sure that the changelists list trashed rows with the
+        annotated columns
+        """
+        self.questions[2].delete()
+        response = self.make_get_request(reverse("admin:qna_question_changelist"))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.context["cl"].result_count, 3)
+        first = response.context["cl"].result_list.get(pk=self.questions[0].pk)
+        self.assertEqual(first.answer_count, 1)
+
+        response = self.make_get_request(
+            reverse("admin:qna_question_changelist"), {"status": "trashed"}
+        )
+        self.assertEqual(response.context["cl"].result_count, 1)
+
+        response = self.make_get_request(reverse("admin:qna_answer_changelist"))
+        self.assertEqual(response.status_code, 200)
+        response = self.make_get_request(
+            reverse("admin:qna_question_change", args=[self.questions[2].pk])
+        )
+        self.assertEqual(response.status_code, 200)
+
+    @override_settings(ADMIN_EXACT_COUNT_LIMIT=2)
+    def test_count_limit(self):
+        """
+        To make sure that rows are not counted past the limit
+        """
+        response = self.make_get_request(reverse("admin:qna_question_changelist"))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.context["cl"].result_count, 3)
+
+    @override_settings(ADMIN_ACTION_BATCH_SIZE=2)
+    def test_soft_delete_and_restore(self):
+        """
+        To make sure that the actions soft delete and restore the selected
+        rows and the answers deleted with them
+        """
+        self.run_action(Question, "soft_delete_selected", self.questions)
+        self.assertFalse(Question.objects.exists())
+        self.assertFalse(Answer.objects.exists())
+
+        self.run_action(Question, "restore_selected", self.questions)
+        self.assertEqual(Question.objects.count(), 3)
+        self.assertTrue(Answer.objects.exists())
+
+    def test_restore_invalidates_snapshots(self):
+        """
+        To make sure that restoring drops the snapshots of the questions, as
+        deleting does
+        """
+        self.questions[0].delete()
+        with (
+            mock.patch("qna.admin.invalidate_posts") as invalidate_posts,
+            self.captureOnCommitCallbacks(execute=True),
+        ):
+            self.run_action(Question, "restore_selected", self.questions)
+        invalidate_posts.assert_called_once_with(Question, [self.questions[0].pk])
+
+    def test_purge(self):
+        """
+        To make sure that purging hard deletes only the trashed rows
+        """
+        self.questions[0].delete()
+        self.run_action(Question, "purge_selected", self.questions)
+        self.assertFalse(
+            Question.objects.with_trashed().filter(pk=self.questions[0].pk).exists()
+        )
+        self.assertFalse(Answer.objects.with_trashed().exists())
+        self.assertEqual(Question.objects.count(), 2)
+
+    def test_no_hard_delete_action(self):
+        """
+        To make sure that the default hard delete action is not offered
+        """
+        response = self.make_get_request(reverse("admin:qna_question_changelist"))
+        choices = response.context["action_form"].fields["action"].choices
+        self.assertNotIn("delete_selected", [name for name, _ in choices])
+        self.assertIn("purge_selected", [name for name, _ in choices])
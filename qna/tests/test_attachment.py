@@ -0,0 +1,171 @@
+import hashlib
+import struct
+import tempfile
+import zlib
+
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import override_settings
+from django.urls import reverse
+
+from core.base_test import BaseTestCase
+from qna.attachments import generate_thumbnail
+from qna.models import Attachment, Question, StoredFile
+
+
+def make_png(width=2, height=2):
+    """
+    Returns the bytes of a valid RGB PNG image
+    """
+
+    def chunk(kind, data):
+        return (
+            struct.pack(">I", len(data))
+            + kind
+            + data
+            + struct.pack(">I", zlib.crc32(kind + data))
+        )
+
+    rows = b"".join(b"\x00" + b"\xff\x00\x00" * width for _ in range(height))
+    return (
+        b"\x89PNG\r\n\x1a\n"
+        + chunk(b"IHDR", struct.pack(">IIBBBBB", width, height, 8, 2, 0, 0, 0))
+        + chunk(b"IDAT", zlib.compress(rows))
+        + chunk(b"IEND", b"")
+    )
+
+
+class AttachmentTestCase(BaseTestCase):
+    def setUp(self):
+        super().setUp()
+        media_root = tempfile.TemporaryDirectory()
+        self.addCleanup(media_root.cleanup)
+        settings_override = override_settings(MEDIA_ROOT=media_root.name)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+        self.user = self.create_user()
+        self.authenticate(self.user)
+        self.image = make_png()
+
+    def upload(self, name="image.png", content=None):
+        return SimpleUploadedFile(name, content or self.image, "image/png")
+
+    def create_question(self, images):
+        return self.client.post(
+            reverse("create_question"),
+            {
+                "title": self.faker.sentence(),
+                "content": self.faker.paragraph(),
+                "images": images,
+            },
+        )
+
+    def test_deduplicates_uploads(self):
+        """
+        To make sure that identical uploads are stored once under the
+        digest of their content
+        """
+        response = self.create_question([self.upload("a.png"), self.upload("b.png")])
+        self.assertEqual(response.status_code, 302)
+
+        digest = hashlib.sha256(self.image).hexdigest()
+        stored_file = StoredFile.objects.get()
+        self.assertEqual(stored_file.sha256, digest)
+        self.assertEqual(
+            stored_file.file.name,
+            f"attachments/{digest[:2]}/{digest[2:4]}/{digest}.png",
+        )
+        self.assertEqual(stored_file.content_type, "image/png")
+        question = Question.objects.get()
+        self.assertEqual(
+            list(question.attachments.values_list("name", flat=True)),
+            ["a.png", "b.png"],
+        )
+
+    def test_rejects_other_files(self):
+        """
+        To make sure that files which are not images are refused whatever
+        their name
+        """
+        response = self.create_question([self.upload("fake.png", b"<html></html>")])
+        self.assertEqual(response.status_code, 200)
+        self.assertIn("images", response.context["form"].errors)
+        self.assertFalse(Question.objects.exists())
+
+    @override_settings(ATTACHMENT_MAX_SIZE=10)
+    def test_rejects_large_files(self):
+        """
+        To make sure that files above the size limit are refused
+        """
+        response = self.create_question([self.upload()])
+        self.assertEqual(response.status_code, 200)
+        self.assertFalse(StoredFile.objects.exists())
+
+    def test_serves_ranges(self):
+        """
+        To make sure that attachments are served whole, by range and
+        revalidated with their ETag
+        """
+        self.create_question([self.upload()])
+        url = reverse("attachment", args=[StoredFile.objects.get().sha256])
+
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(b"".join(response.streaming_content), self.image)
+        self.assertEqual(response["Accept-Ranges"], "bytes")
+        self.assertEqual(response["Content-Type"], "image/png")
+        etag = response["ETag"]
+
+        response = self.client.get(url, headers={"Range": "bytes=0-3"})
+        self.assertEqual(response.status_code, 206)
+        self.assertEqual(b"".join(response.streaming_content), b"\x89PNG")
+        self.assertEqual(response["Content-Range"], f"bytes 0-3/{len(self.image)}")
+
+        response = self.client.get(url, headers={"Range": "bytes=-4"})
+        self.assertEqual(b"".join(response.streaming_content), self.image[-4:])
+
+        response = self.client.get(url, headers={"Range": "bytes=100000-"})
+        self.assertEqual(response.status_code, 416)
+
+        response = self.client.get(url, headers={"If-None-Match": etag})
+        self.assertEqual(response.status_code, 304)
+
+    def test_deleted_parent(self):
+        """
+        To make sure that attachments of deleted questions are not served
+        """
+        self.create_question([self.upload()])
+        Question.objects.get().delete()
+        response = self.client.get(
+            reverse("attachment", args=[StoredFile.objects.get().sha256])
+        )
+        self.assertEqual(response.status_code, 404)
+
+    def test_detail_shows_attachments(self):
+        """
+        To make sure that the detail page links the attached images
+        """
+        self.create_question([self.upload()])
+        question = Question.objects.get()
+        response = self.make_get_request(
+            reverse("question_detail", kwargs={"pk": question.pk})
+        )
+        self.assertContains(
+            response, reverse("attachment", args=[StoredFile.objects.get().sha256])
+        )
+        self.assertEqual(len(response.context["attachments"]), 1)
+
+    def test_thumbnail(self):
+        """
+        To make sure that the thumbnail of a stored image is generated
+        """
+        self.create_question([self.upload(content=make_png(800, 600))])
+        stored_file = StoredFile.objects.get()
+        self.assertTrue(generate_thumbnail(stored_file))
+        stored_file.refresh_from_db()
+        self.assertTrue(stored_file.thumbnail.name.startswith("thumbnails/"))
+        response = self.client.get(
+            reverse("attachment_thumbnail", args=[stored_file.sha256])
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(Attachment.objects.count(), 1)
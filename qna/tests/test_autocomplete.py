@@ -0,0 +1,116 @@
+from unittest import mock
+
+from django.urls import reverse
+
+from core.base_test import BaseTestCase
+from qna.autocomplete import title_index
+from qna.models import Answer, Question
+
+
+class AutocompleteTestCase(BaseTestCase):
+    def setUp(self):
+        super().setUp()
+        self.user = self.create_user()
+        self.popular_question = self.create_question("Python decorators explained")
+        self.other_question = self.create_question("Python packaging tips")
+        self.unrelated_question = self.create_question("Django admin actions")
+        for _ in range(2):
+            Answer.objects.create(
+                content=self.faker.paragraph(),
+                author=self.user,
+                question=self.popular_question,
+            )
+        title_index.reset()
+        title_index.load()
+        self.addCleanup(title_index.reset)
+
+    def create_question(self, title):
+        return Question.objects.create(
+            title=title, content=self.faker.paragraph(), author=self.user
+        )
+
+    def get_result_ids(self, query):
+        response = self.make_get_request(
+            reverse("autocomplete_questions"), {"q": query}
+        )
+        self.assertEqual(response.status_code, 200)
+        return [result["id"] for result in response.json()["results"]]
+
+    def test_prefix_ranked_by_popularity(self):
+        """
+        To make sure that titles are matched by prefix and the most answered
+        question comes first
+        """
+        self.assertEqual(
+            self.get_result_ids("pyt"),
+            [self.popular_question.id, self.other_question.id],
+        )
+
+    def test_multiple_words(self):
+        """
+        To make sure that every word of the query has to match
+        """
+        self.assertEqual(self.get_result_ids("python pack"), [self.other_question.id])
+
+    def test_empty_query(self):
+        """
+        To make sure that an empty query returns no results
+        """
+        self.assertEqual(self.get_result_ids(" "), [])
+
+    def test_refresh(self):
+        """
+        To make sure that the index picks up new and deleted questions
+        """
+        new_question = self.create_question("Pythonic loops")
+        self.other_question.delete()
+        title_index.checked_at = 0
+        self.assertEqual(
+            self.get_result_ids("python"),
+            [self.popular_question.id, new_question.id],
+        )
+
+    def test_bounded_size(self):
+        """
+        To make sure that the least popular title is evicted when the index
+        is full
+        """
+        self.addCleanup(setattr, title_index, "max_titles", title_index.max_titles)
+        title_index.max_titles = 3
+        new_question = self.create_question("Python typing")
+        Answer.objects.create(
+            content=self.faker.paragraph(), author=self.user, question=new_question
+        )
+        title_index.refresh()
+        self.assertEqual(len(title_index.titles), 3)
+        self.assertIn(new_question.id, self.get_result_ids("python"))
+
+    def test_reload(self):
+        """
+        To make sure that the index is loaded again once old, which fills
+        the prefix lists shortened by removed titles
+        """
+        with mock.patch("qna.autocomplete.RESULTS_PER_PREFIX", 1):
+            title_index.load()
+            self.popular_question.delete()
+            title_index.refresh()
+            self.assertEqual(self.get_result_ids("python"), [])
+
+            title_index.loaded_at = 0
+            with mock.patch.object(title_index, "start_loading") as start_loading:
+                self.get_result_ids("python")
+            start_loading.assert_called_once()
+            title_index.load()
+            self.assertEqual(self.get_result_ids("python"), [self.other_question.id])
+
+    def test_database_fallback(self):
+        """
+        To make sure that cold workers answer from the database while the
+        index is loading
+        """
+        title_index.reset()
+        with mock.patch.object(title_index, "start_loading") as start_loading:
+            self.assertEqual(
+                self.get_result_ids("django"), [self.unrelated_question.id]
+            )
+        start_loading.assert_called_once()
@@ -0,0 +1,128 @@
+import asyncio
+import tempfile
+from unittest import mock
+
+from asgiref.sync import sync_to_async
+from django.test import AsyncClient, override_settings
+from django.urls import reverse
+
+from core.base_test import BaseTestCase
+from core.pubsub import Broker, UnixSocketTransport, broker
+from qna.live import question_topic
+from qna.models import Answer, Question
+
+
+class LiveUpdatesTestCase(BaseTestCase):
+    def setUp(self):
+        super().setUp()
+        self.user = self.create_user()
+        self.other_user = self.create_user()
+        self.question = Question.objects.create(
+            title=self.faker.sentence(),
+            content=self.faker.paragraph(),
+            author=self.other_user,
+        )
+        self.authenticate(self.user)
+        # Answers are copied to the feeds in a thread which cannot see the
+        # rows of the test transaction
+        patcher = mock.patch("qna.activity.feed_executor")
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_new_answer_published(self):
+        """
+        To make sure that posting an answer is published once committed
+        """
+        with mock.patch.object(broker, "publish") as publish:
+            with self.captureOnCommitCallbacks(execute=True):
+                self.make_post_request(
+                    reverse("create_answer", args=[self.question.id]),
+                    {"content": self.faker.paragraph()},
+                )
+        answer = Answer.objects.get(question=self.question)
+        publish.assert_called_once_with(
+            question_topic(self.question.id),
+            {
+                "type": "answer",
+                "answer_id": answer.id,
+                "author": self.user.username,
+            },
+        )
+
+    def test_like_count_published(self):
+        """
+        To make sure that liking an answer publishes the new like count
+        """
+        answer = Answer.objects.create(
+            content=self.faker.paragraph(),
+            author=self.other_user,
+            question=self.question,
+        )
+        with mock.patch.object(broker, "publish") as publish:
+            with self.captureOnCommitCallbacks(execute=True):
+                self.make_post_request(reverse("like_answer", args=[answer.id]))
+        publish.assert_called_once_with(
+            question_topic(self.question.id),
+            {"type": "likes", "answer_id": answer.id, "count": 1},
+        )
+
+    async def test_stream(self):
+        """
+        To make sure that published events are streamed to the subscribers
+        """
+        response = await AsyncClient().get(
+            reverse("question_events", args=[self.question.id])
+        )
+        self.assertEqual(response["Content-Type"], "text/event-stream")
+        stream = aiter(response.streaming_content)
+        try:
+            self.assertTrue((await anext(stream)).startswith(b"retry:"))
+
+            broker.publish(
+                question_topic(self.question.id),
+                {"type": "likes", "answer_id": 1, "count": 2},
+            )
+            event = await asyncio.wait_for(anext(stream), 1)
+            self.assertEqual(
+                event,
+                b'event: likes\ndata: {"type": "likes", "answer_id": 1, "count": 2}\n\n',
+            )
+        finally:
+            # As the ASGI handler does once the client is gone
+            await stream.aclose()
+            await sync_to_async(response.close)()
+        self.assertEqual(broker.subscriber_count, 0)
+
+    @override_settings(LIVE_UPDATES_MAX_SUBSCRIBERS=0)
+    def test_subscriber_limit(self):
+        """
+        To make sure that workers refuse subscribers above the limit
+        """
+        response = self.make_get_request(
+            reverse("question_events", args=[self.question.id])
+        )
+        self.assertEqual(response.status_code, 503)
+        self.assertIn("Retry-After", response)
+
+    def test_missing_question(self):
+        """
+        To make sure that subscribing to a missing question is not found
+        """
+        response = self.make_get_request(reverse("question_events", args=[0]))
+        self.assertEqual(response.status_code, 404)
+
+
+class UnixSocketTransportTestCase(BaseTestCase):
+    async def test_delivery_across_sockets(self):
+        """
+        To make sure that events published through the socket transport are
+        delivered to the subscribers
+        """
+        local_broker = Broker()
+        with tempfile.TemporaryDirectory() as directory:
+            local_broker._transport = UnixSocketTransport(local_broker, directory)
+            async with local_broker.subscribe("topic") as subscription:
+                local_broker.publish("topic", {"type": "ping"})
+                event = await asyncio.wait_for(subscription.get(), 1)
+            self.assertEqual(event, {"type": "ping"})
+            self.assertEqual(local_broker.subscriber_count, 0)
@@ -0,0 +1,13 @@
+from benchmarks.views import benchmark_settings, check, run_cases, seed
+from core.base_test import BaseTestCase
+
+
+class QueryBudgetTestCase(BaseTestCase):
+    def test_budgets(self):
+        """
+        To make sure that every view has a benchmark case and a query budget
+        and stays within it
+        """
+        with benchmark_settings():
+            results = run_cases(seed())
+        self.assertEqual(check(results), [])
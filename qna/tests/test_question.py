@@ -1,7 +1,7 @@
 from django.urls import reverse
 
 from core.base_test import BaseTestCase
-from qna.models.question import Question
+from qna.models import Answer, Question
 
 
 class QuestionCreateTestCase(BaseTestCase):
@@ -182,3 +182,64 @@ class QuestionDeleteTestCase(BaseTestCase):
             reverse("delete_question", args=[self.question.id])
         )
         self.assertEqual(response.status_code, 302)
+
+
+class QuestionSoftDeleteCascadeTestCase(BaseTestCase):
+    def setUp(self):
+        super().setUp()
+        self.user = self.create_user()
+        self.question = Question.objects.create(
+            title="Test Question", content="Test Content", author=self.user
+        )
+        self.answers = [
+            Answer.objects.create(
+                content=self.faker.paragraph(),
+                author=self.create_user(),
+                question=self.question,
+            )
+            for _ in range(3)
+        ]
+        self.authenticate(self.user)
+
+    def test_delete_view_cascades(self):
+        """
+        To makes sure that deleting a question soft deletes its answers
+        """
+        self.make_post_request(reverse("delete_question", args=[self.question.id]))
+        self.assertFalse(Answer.objects.filter(question=self.question).exists())
+        self.assertEqual(
+            Answer.objects.trashed().filter(question=self.question).count(), 3
+        )
+        self.assertFalse(self.answers[0].author.answers.exists())
+
+    def test_delete_query_count(self):
+        """
+        To makes sure that the answers are deleted with a single UPDATE
+        """
+        # savepoint, answers to invalidate, cascade, save, release
+        with self.assertNumQueries(5):
+            self.question.delete()
+
+    def test_restore(self):
+        """
+        To makes sure that restoring a question only restores the answers
+        deleted along with it
+        """
+        deleted_before = self.answers[0]
+        deleted_before.delete()
+        self.question.delete()
+        self.question.restore()
+        self.assertEqual(
+            set(Answer.objects.filter(question=self.question)),
+            set(self.answers[1:]),
+        )
+        self.assertTrue(Answer.objects.trashed().filter(pk=deleted_before.pk).exists())
+
+    def test_bulk_delete_and_restore(self):
+        """
+        To makes sure that bulk delete and restore cascade to the answers
+        """
+        Question.bulk_delete({"author": self.user})
+        self.assertFalse(Answer.objects.exists())
+        Question.bulk_restore({"author": self.user})
+        self.assertEqual(Answer.objects.count(), 3)
@@ -0,0 +1,98 @@
+from io import StringIO
+
+from django.core.management import call_command
+from django.urls import reverse
+
+from core.base_test import BaseTestCase
+from qna.models import Question, RelatedQuestion, TermFrequency
+from qna.similarity import compute_related_questions, update_related_questions
+
+
+class RelatedQuestionTestCase(BaseTestCase):
+    def setUp(self):
+        super().setUp()
+        self.user = self.create_user()
+        self.python_question = self.create_question(
+            "How do I sort a list in Python?",
+            "I have a Python list of numbers and want to sort it.",
+        )
+        self.similar_question = self.create_question(
+            "Sorting a Python list in reverse",
+            "How can a Python list be sorted from largest to smallest?",
+        )
+        self.unrelated_question = self.create_question(
+            "Best hiking trails near the mountains",
+            "Looking for scenic hiking trails for a weekend trip.",
+        )
+
+    def create_question(self, title, content):
+        return Question.objects.create(title=title, content=content, author=self.user)
+
+    def get_related_questions(self, question):
+        response = self.make_get_request(reverse("question_detail", args=[question.id]))
+        return response.context["related_questions"]
+
+    def test_related_questions_shown(self):
+        """
+        To make sure that similar questions are shown on the detail page
+        """
+        compute_related_questions()
+        self.assertEqual(
+            self.get_related_questions(self.python_question), [self.similar_question]
+        )
+
+    def test_unrelated_questions_not_shown(self):
+        """
+        To make sure that questions without shared terms are not related
+        """
+        compute_related_questions()
+        self.assertEqual(self.get_related_questions(self.unrelated_question), [])
+
+    def test_deleted_question_not_shown(self):
+        """
+        To make sure that deleted questions are not shown as related
+        """
+        compute_related_questions()
+        self.similar_question.delete()
+        self.assertEqual(self.get_related_questions(self.python_question), [])
+
+    def test_incremental_update(self):
+        """
+        To make sure that the incremental update relates new questions to
+        existing ones in both directions
+        """
+        compute_related_questions()
+        new_question = self.create_question(
+            "Hiking trails for beginners",
+            "Which mountains have easy hiking trails?",
+        )
+        update_related_questions()
+        self.assertIn(self.unrelated_question, self.get_related_questions(new_question))
+        self.assertIn(new_question, self.get_related_questions(self.unrelated_question))
+
+    def test_incremental_update_keeps_state(self):
+        """
+        To make sure that the incremental update counts new questions in the
+        stored document frequencies and never processes a question twice,
+        even one without any related question
+        """
+        self.assertEqual(update_related_questions(), 3)
+        self.assertEqual(TermFrequency.objects.get(term="python").documents, 2)
+        self.assertEqual(update_related_questions(), 0)
+
+        self.create_question("Python list comprehension", "Python list syntax")
+        update_related_questions()
+        self.assertEqual(TermFrequency.objects.get(term="python").documents, 3)
+        self.assertEqual(TermFrequency.objects.get(term="").documents, 4)
+        self.assertEqual(update_related_questions(), 0)
+
+    def test_command(self):
+        """
+        To make sure that the management command stores the related questions
+        """
+        call_command("compute_related_questions", "--top-k", "1", stdout=StringIO())
+        self.assertTrue(
+            RelatedQuestion.objects.filter(
+                question=self.python_question, related=self.similar_question, rank=1
+            ).exists()
+        )
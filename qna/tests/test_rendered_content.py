@@ -0,0 +1,77 @@
+from io import StringIO
+
+from django.core.management import call_command
+from django.urls import reverse
+
+from core.base_test import BaseTestCase
+from qna.models import Answer, Question
+
+
+class RenderedContentTestCase(BaseTestCase):
+    def setUp(self):
+        super().setUp()
+        self.user = self.create_user()
+        self.question = Question.objects.create(
+            title=self.faker.sentence(),
+            content="Some **bold** text",
+            author=self.user,
+        )
+
+    def test_rendered_on_save(self):
+        """
+        To make sure that the HTML and the excerpt are stored when the
+        content is saved
+        """
+        self.assertEqual(
+            self.question.content_html, "<p>Some <strong>bold</strong> text</p>"
+        )
+        self.assertEqual(self.question.excerpt, "Some bold text")
+
+        self.question.content = "Other *content*"
+        self.question.save(update_fields=["content"])
+        self.question.refresh_from_db()
+        self.assertEqual(self.question.content_html, "<p>Other <em>content</em></p>")
+        self.assertEqual(self.question.excerpt, "Other content")
+
+    def test_list_defers_content(self):
+        """
+        To make sure that the question list shows the excerpt without loading
+        the content
+        """
+        response = self.make_get_request(reverse("home"))
+        self.assertContains(response, "Some bold text")
+        question = response.context["questions"][0]
+        self.assertEqual(question.get_deferred_fields(), {"content", "content_html"})
+
+    def test_detail_renders_html(self):
+        """
+        To make sure that the detail page shows the rendered content
+        """
+        Answer.objects.create(
+            content="Use `pip`", author=self.user, question=self.question
+        )
+        response = self.make_get_request(
+            reverse("question_detail", kwargs={"pk": self.question.pk})
+        )
+        self.assertContains(response, "Some <strong>bold</strong> text")
+        self.assertContains(response, "Use <code>pip</code>")
+
+    def test_backfill(self):
+        """
+        To make sure that the backfill command renders the rows never
+        rendered without touching their modification date
+        """
+        answer = Answer.objects.create(
+            content="An _answer_", author=self.user, question=self.question
+        )
+        Question.objects.filter(pk=self.question.pk).update(content_html="", excerpt="")
+        Answer.objects.filter(pk=answer.pk).update(content_html="")
+        updated_at = Question.objects.get(pk=self.question.pk).updated_at
+
+        call_command("render_content", "--batch-size", "1", stdout=StringIO())
+
+        question = Question.objects.get(pk=self.question.pk)
+        self.assertEqual(question.excerpt, "Some bold text")
+        self.assertEqual(question.updated_at, updated_at)
+        answer.refresh_from_db()
+        self.assertEqual(answer.content_html, "<p>An <em>answer</em></p>")
@@ -0,0 +1,115 @@
+from datetime import timedelta
+from io import StringIO
+from unittest import mock
+
+from django.core.management import call_command
+from django.utils import timezone
+
+from core.base_test import BaseTestCase
+from qna import retention
+from qna.models import Answer, ArchivedRecord, Question
+from qna.retention import purge_trashed
+
+
+class PurgeTrashedTestCase(BaseTestCase):
+    def setUp(self):
+        super().setUp()
+        self.user = self.create_user()
+        self.question = self.create_question()
+        self.answer = self.create_answer(self.question)
+        self.answer.likes.add(self.user)
+
+    def create_question(self):
+        return Question.objects.create(
+            title=self.faker.sentence(),
+            content=self.faker.paragraph(),
+            author=self.user,
+        )
+
+    def create_answer(self, question):
+        return Answer.objects.create(
+            content=self.faker.paragraph(), author=self.user, question=question
+        )
+
+    def trash(self, model, obj, days_ago):
+        model.objects.filter(pk=obj.pk).update(
+            deleted_at=timezone.now() - timedelta(days=days_ago)
+        )
+
+    def test_purges_expired_answer(self):
+        """
+        To make sure that answers trashed before the retention period are
+        archived and hard deleted along with their likes
+        """
+        self.trash(Answer, self.answer, days_ago=40)
+        purged = purge_trashed(days=30)
+        self.assertEqual(purged, {"Answer": 1, "Question": 0})
+        self.assertFalse(
+            Answer.objects.with_trashed().filter(pk=self.answer.pk).exists()
+        )
+        self.assertFalse(self.user.liked_answers.exists())
+        record = ArchivedRecord.objects.get(
+            model_label="qna.answer", object_id=self.answer.pk
+        )
+        self.assertEqual(record.data["likes"], [self.user.pk])
+
+    def test_keeps_recent_and_live_rows(self):
+        """
+        To make sure that live rows and rows trashed recently are kept
+        """
+        self.trash(Answer, self.answer, days_ago=10)
+        purged = purge_trashed(days=30)
+        self.assertEqual(purged, {"Answer": 0, "Question": 0})
+        self.assertTrue(Answer.objects.trashed().filter(pk=self.answer.pk).exists())
+        self.assertTrue(Question.objects.filter(pk=self.question.pk).exists())
+
+    def test_question_cascades_to_answers(self):
+        """
+        To make sure that purging a question archives and deletes its answers
+        """
+        self.trash(Question, self.question, days_ago=40)
+        purge_trashed(days=30, batch_size=1)
+        self.assertFalse(Answer.objects.with_trashed().exists())
+        self.assertEqual(
+            set(ArchivedRecord.objects.values_list("model_label", "object_id")),
+            {("qna.question", self.question.pk), ("qna.answer", self.answer.pk)},
+        )
+
+    def test_answers_of_question_batched(self):
+        """
+        To make sure that the answers of a purged question are purged in
+        batches of their own before the question
+        """
+        for _ in range(4):
+            self.create_answer(self.question)
+        self.trash(Question, self.question, days_ago=40)
+        with mock.patch(
+            "qna.retention.purge_batch", wraps=retention.purge_batch
+        ) as purge_batch:
+            purge_trashed(days=30, batch_size=2)
+        self.assertEqual(
+            [(call.args[0], len(call.args[1])) for call in purge_batch.call_args_list],
+            [(Answer, 2), (Answer, 2), (Answer, 1), (Question, 1)],
+        )
+        self.assertFalse(Answer.objects.with_trashed().exists())
+        self.assertEqual(ArchivedRecord.objects.count(), 6)
+
+    def test_batches(self):
+        """
+        To make sure that every expired row is purged across several batches
+        """
+        for _ in range(4):
+            self.trash(Question, self.create_question(), days_ago=40)
+        purged = purge_trashed(days=30, batch_size=2, archive_rows=False)
+        self.assertEqual(purged["Question"], 4)
+        self.assertFalse(ArchivedRecord.objects.exists())
+
+    def test_dry_run_command(self):
+        """
+        To make sure that a dry run only reports what would be purged
+        """
+        self.trash(Answer, self.answer, days_ago=40)
+        stdout = StringIO()
+        call_command("purge_trashed", "--dry-run", stdout=stdout)
+        self.assertIn("Would purge 1 Answer rows", stdout.getvalue())
+        self.assertTrue(Answer.objects.trashed().filter(pk=self.answer.pk).exists())
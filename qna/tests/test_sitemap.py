@@ -0,0 +1,135 @@
+from django.test import override_settings
+from django.urls import reverse
+from django.utils.http import http_date
+
+from core.base_test import BaseTestCase
+from qna.models import Answer, Question
+
+
+@override_settings(SITEMAP_CHUNK_SIZE=2)
+class SitemapTestCase(BaseTestCase):
+    def setUp(self):
+        super().setUp()
+        self.user = self.create_user()
+        self.questions = [
+            Question.objects.create(
+                title=self.faker.sentence(),
+                content=self.faker.paragraph(),
+                author=self.user,
+            )
+            for _ in range(3)
+        ]
+
+    def test_index_lists_chunks(self):
+        """
+        To make sure that the index links every primary key range
+        """
+        response = self.make_get_request(reverse("sitemap_index"))
+        self.assertEqual(response.status_code, 200)
+        chunks = {question.pk // 2 for question in self.questions}
+        for chunk in chunks:
+            self.assertContains(response, reverse("sitemap_chunk", args=[chunk]))
+
+    @override_settings(SITEMAP_CHUNK_SIZE=1000000)
+    def test_chunk_lists_live_questions(self):
+        """
+        To make sure that a chunk lists its questions but not deleted ones
+        """
+        question, deleted_question = self.questions[0], self.questions[1]
+        deleted_question.delete()
+        response = self.make_get_request(reverse("sitemap_chunk", args=[0]))
+        self.assertContains(
+            response, reverse("question_detail", args=[question.pk]) + "<"
+        )
+        self.assertNotContains(
+            response, reverse("question_detail", args=[deleted_question.pk]) + "<"
+        )
+
+    def test_missing_chunk(self):
+        """
+        To make sure that an empty primary key range is not found
+        """
+        response = self.make_get_request(reverse("sitemap_chunk", args=[1000]))
+        self.assertEqual(response.status_code, 404)
+
+    def test_cache_invalidated_on_delete(self):
+        """
+        To make sure that deleting a question regenerates its chunk
+        """
+        question = self.questions[0]
+        url = reverse("sitemap_chunk", args=[question.pk // 2])
+        self.make_get_request(url)
+        question.delete()
+        response = self.make_get_request(url)
+        self.assertNotContains(
+            response, reverse("question_detail", args=[question.pk]) + "<"
+        )
+
+    def test_not_modified(self):
+        """
+        To make sure that conditional requests are answered with a 304
+        """
+        response = self.make_get_request(reverse("sitemap_index"))
+        self.assertIn("Last-Modified", response)
+        response = self.client.get(
+            reverse("sitemap_index"),
+            HTTP_IF_MODIFIED_SINCE=response["Last-Modified"],
+        )
+        self.assertEqual(response.status_code, 304)
+
+    def test_robots(self):
+        """
+        To make sure that robots.txt points to the sitemap index
+        """
+        response = self.make_get_request(reverse("robots"))
+        self.assertContains(response, "Sitemap: http://testserver/sitemap.xml")
+
+
+class FeedTestCase(BaseTestCase):
+    def setUp(self):
+        super().setUp()
+        self.user = self.create_user()
+        self.question = Question.objects.create(
+            title="Feed question", content=self.faker.paragraph(), author=self.user
+        )
+        self.answer = Answer.objects.create(
+            content=self.faker.paragraph(),
+            author=self.create_user(),
+            question=self.question,
+        )
+
+    def test_feed(self):
+        """
+        To make sure that the feed lists recent questions and answers
+        """
+        response = self.make_get_request(reverse("latest_feed"))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            response["Content-Type"], "application/atom+xml; charset=utf-8"
+        )
+        self.assertContains(response, "Feed question")
+        self.assertContains(response, "Answer to: Feed question")
+        self.assertContains(response, f"#answer-{self.answer.pk}")
+
+    def test_cached(self):
+        """
+        To make sure that the feed is rendered again only once its content
+        changes
+        """
+        self.make_get_request(reverse("latest_feed"))
+        with self.assertNumQueries(2):
+            self.make_get_request(reverse("latest_feed"))
+        self.answer.content = "Edited answer"
+        self.answer.save()
+        response = self.make_get_request(reverse("latest_feed"))
+        self.assertContains(response, "Edited answer")
+
+    def test_not_modified(self):
+        """
+        To make sure that conditional requests are answered with a 304
+        """
+        response = self.client.get(
+            reverse("latest_feed"),
+            HTTP_IF_MODIFIED_SINCE=http_date(self.answer.updated_at.timestamp() + 1),
+        )
+        self.assertEqual(response.status_code, 304)
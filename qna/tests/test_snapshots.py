@@ -0,0 +1,164 @@
+import gzip
+import os
+import tempfile
+from unittest import mock
+
+from django.test import override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from core.base_test import BaseTestCase
+from qna.events import event_buffer
+from qna.models import Answer, Event, Question
+from qna.snapshots import (
+    refresh_snapshots,
+    render_in_background,
+    render_question,
+    snapshot_path,
+    write_snapshot,
+)
+
+
+class SnapshotTestCase(BaseTestCase):
+    def setUp(self):
+        super().setUp()
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        overrides = override_settings(SNAPSHOT_DIR=directory.name)
+        overrides.enable()
+        self.addCleanup(overrides.disable)
+        event_buffer.events.clear()
+        self.addCleanup(event_buffer.events.clear)
+
+        self.user = self.create_user()
+        self.question = Question.objects.create(
+            title=self.faker.sentence(), content="Popular question", author=self.user
+        )
+        self.answer = Answer.objects.create(
+            question=self.question, content="Popular answer", author=self.user
+        )
+
+    def view(self, question, count=1):
+        Event.objects.bulk_create(
+            Event(
+                kind=Event.QUESTION_VIEWED,
+                object_id=question.pk,
+                created_at=timezone.now(),
+            )
+            for _ in range(count)
+        )
+
+    def test_refresh(self):
+        """
+        To make sure that only the most viewed questions get a snapshot,
+        which is rendered again once it is old
+        """
+        other = Question.objects.create(
+            title=self.faker.sentence(), content="Content", author=self.user
+        )
+        self.view(self.question, 3)
+        self.view(other)
+        self.assertEqual(refresh_snapshots(1), (1, 0))
+        with open(snapshot_path(self.question.pk), "rb") as file:
+            content = file.read()
+        self.assertIn(b"Popular answer", content)
+        with open(snapshot_path(self.question.pk, compressed=True), "rb") as file:
+            self.assertEqual(gzip.decompress(file.read()), content)
+        self.assertEqual(refresh_snapshots(1), (0, 0))
+        with override_settings(SNAPSHOT_MAX_AGE=0):
+            self.assertEqual(refresh_snapshots(1), (1, 0))
+
+        self.view(other, 5)
+        self.assertEqual(refresh_snapshots(1), (1, 1))
+        self.assertFalse(os.path.exists(snapshot_path(self.question.pk)))
+        self.assertTrue(os.path.exists(snapshot_path(other.pk)))
+
+    def test_served(self):
+        """
+        To make sure that anonymous visitors are served the snapshot without
+        any query, compressed when they accept it, and other visitors the
+        rendered page
+        """
+        write_snapshot(self.question.pk)
+        url = reverse("question_detail", args=[self.question.pk])
+        with self.assertNumQueries(0):
+            response = self.client.get(url, HTTP_ACCEPT_ENCODING="gzip, br")
+        self.assertEqual(response["X-Snapshot"], "1")
+        self.assertEqual(response["Content-Encoding"], "gzip")
+        self.assertEqual(response["X-Frame-Options"], "DENY")
+        self.assertEqual(response["X-Content-Type-Options"], "nosniff")
+        self.assertIn(b"Popular answer", gzip.decompress(response.content))
+
+        response = self.client.get(url)
+        self.assertNotIn("Content-Encoding", response)
+        self.assertIn(b"Popular answer", response.content)
+
+        self.authenticate()
+        response = self.client.get(url)
+        self.assertNotIn("X-Snapshot", response)
+        self.assertEqual(response.status_code, 200)
+
+    def test_no_csrf_token(self):
+        """
+        To make sure that no snapshot holds a CSRF token, which every
+        visitor would share
+        """
+        self.assertTrue(write_snapshot(self.question.pk))
+        with open(snapshot_path(self.question.pk), "rb") as file:
+            self.assertNotIn(b'name="csrfmiddlewaretoken"', file.read())
+
+        with (
+            mock.patch(
+                "qna.views.question.QuestionDetailView.get_template_names",
+                return_value=["qna/update_question.html"],
+            ),
+            self.assertLogs("qna.snapshots", "WARNING"),
+        ):
+            self.assertIsNone(render_question(self.question.pk))
+
+    def test_views_counted(self):
+        """
+        To make sure that the views of the question pages are logged, those
+        served from a snapshot included
+        """
+        url = reverse("question_detail", args=[self.question.pk])
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.get(url)
+            write_snapshot(self.question.pk)
+            self.client.get(url)
+            self.client.get(reverse("question_detail", args=[0]))
+        self.assertEqual(
+            [(event.kind, event.object_id) for event in event_buffer.events],
+            [(Event.QUESTION_VIEWED, self.question.pk)] * 2,
+        )
+
+    def test_invalidation(self):
+        """
+        To make sure that the snapshot is deleted once a change of an answer
+        commits and rendered again in the background, and deleted for good
+        with the question
+        """
+        write_snapshot(self.question.pk)
+        with (
+            mock.patch("qna.snapshots.snapshot_executor") as executor,
+            self.captureOnCommitCallbacks(execute=True),
+        ):
+            self.answer.content = "Edited answer"
+            self.answer.save()
+            self.assertTrue(os.path.exists(snapshot_path(self.question.pk)))
+        self.assertFalse(os.path.exists(snapshot_path(self.question.pk)))
+        executor.submit.assert_called_once_with(render_in_background, self.question.pk)
+
+        with mock.patch("qna.snapshots.connection"):
+            render_in_background(self.question.pk)
+        with open(snapshot_path(self.question.pk), "rb") as file:
+            self.assertIn(b"Edited answer", file.read())
+
+        with (
+            mock.patch("qna.snapshots.snapshot_executor") as executor,
+            self.captureOnCommitCallbacks(execute=True),
+        ):
+            self.question.delete()
+        with mock.patch("qna.snapshots.connection"):
+            render_in_background(self.question.pk)
+        self.assertFalse(os.path.exists(snapshot_path(self.question.pk)))
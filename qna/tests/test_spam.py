@@ -0,0 +1,147 @@
+import threading
+import time
+from unittest import mock
+
+from django.test import override_settings
+from django.urls import reverse
+
+from core.base_test import BaseTestCase
+from qna.models import Answer, Question, SpamFeature
+from qna.spam import SpamModel, is_spam, learn, refresh_executor, spam_filter
+
+SPAM = [
+    "Buy cheap watches online, best price discount click here",
+    "Cheap pills discount, click here to buy now best price",
+    "Best price casino bonus, click here and win money now",
+]
+HAM = [
+    "How do I read a file line by line in Django?",
+    "How do I fix a Django migration failing on a foreign key?",
+    "How do I cache a Django view?",
+]
+
+
+@override_settings(SPAM_MIN_DOCUMENTS=3, SPAM_THRESHOLD=0.9, SPAM_TIMEOUT=1)
+class SpamTestCase(BaseTestCase):
+    def setUp(self):
+        super().setUp()
+        learn(SPAM, spam=True)
+        learn(HAM, spam=False)
+        self.addCleanup(setattr, spam_filter, "model", spam_filter.model)
+        spam_filter.reload()
+        self.user = self.create_user()
+
+    def test_probability(self):
+        """
+        To make sure that the learned counts tell spam from legitimate
+        posts, and that an untrained filter does not decide
+        """
+        model = spam_filter.model
+        self.assertEqual(model.version, (3, 3))
+        self.assertGreater(model.probability("click here for a cheap discount"), 0.9)
+        self.assertLess(model.probability("How do I upload a file with Django?"), 0.1)
+
+        with override_settings(SPAM_MIN_DOCUMENTS=4):
+            self.assertIsNone(spam_filter.probability("click here"))
+        self.assertFalse(SpamModel([]).is_trained)
+
+    def test_learn_increments(self):
+        """
+        To make sure that learning adds to the stored counts
+        """
+        learn(["cheap cheap watches"], spam=True)
+        documents = SpamFeature.objects.get(bucket=-1)
+        self.assertEqual((documents.spam, documents.ham), (4, 3))
+
+    def test_quarantine(self):
+        """
+        To make sure that spam questions are held for review, hidden from
+        everyone but their author
+        """
+        self.authenticate(self.user)
+        self.make_post_request(
+            reverse("create_question"),
+            {"title": "Cheap watches", "content": "Best price, click here to buy"},
+        )
+        question = Question.objects.get()
+        self.assertIsNotNone(question.quarantined_at)
+        url = reverse("question_detail", args=[question.pk])
+        self.assertContains(self.make_get_request(url), "Held for review")
+
+        self.client.logout()
+        self.assertEqual(self.make_get_request(url).status_code, 404)
+        response = self.make_get_request(reverse("home"))
+        self.assertNotContains(response, "Cheap watches")
+
+        self.authenticate()
+        self.make_post_request(
+            reverse("create_answer", args=[question.pk]),
+            {"content": "How do I read a file in Django?"},
+        )
+        self.assertIsNone(Answer.objects.get().quarantined_at)
+
+    def test_timeout(self):
+        """
+        To make sure that posts are published when the filter is late
+        """
+
+        def slow(text):
+            time.sleep(0.2)
+            return 1.0
+
+        self.authenticate(self.user)
+        with override_settings(SPAM_TIMEOUT=0.01), mock.patch.object(
+            spam_filter, "probability", slow
+        ):
+            self.make_post_request(
+                reverse("create_question"),
+                {"title": "Cheap watches", "content": "Click here"},
+            )
+        self.assertIsNone(Question.objects.get().quarantined_at)
+
+    def test_refresh_apart(self):
+        """
+        To make sure that the model is reloaded by its own thread, so a slow
+        reload does not delay the checks
+        """
+        threads = []
+
+        def refresh():
+            threads.append(threading.current_thread().name)
+            spam_filter._refreshing = False
+
+        spam_filter.checked_at = 0
+        with mock.patch.object(spam_filter, "refresh", side_effect=refresh):
+            self.assertTrue(is_spam(SPAM[0]))
+            refresh_executor.submit(lambda: None).result()
+        self.assertEqual(len(threads), 1)
+        self.assertTrue(threads[0].startswith("spam-refresh"))
+
+    def test_moderation(self):
+        """
+        To make sure that the posts deleted by moderators are learned as
+        spam and the approved ones as legitimate
+        """
+        admin = self.create_user()
+        admin.is_staff = admin.is_superuser = True
+        admin.save()
+        self.authenticate(admin)
+        spam = Question.objects.create(
+            title="Casino", content="Win money", author=self.user
+        )
+        held = Question.objects.create(
+            title="Tuple", content="Tuples", author=self.user
+        )
+        Question.objects.filter(pk=held.pk).update(quarantined_at=held.created_at)
+        url = reverse("admin:qna_question_changelist")
+
+        self.make_post_request(
+            url, {"action": "soft_delete_selected", "_selected_action": [spam.pk]}
+        )
+        self.make_post_request(
+            url, {"action": "approve_selected", "_selected_action": [held.pk]}
+        )
+        held.refresh_from_db()
+        self.assertIsNone(held.quarantined_at)
+        documents = SpamFeature.objects.get(bucket=-1)
+        self.assertEqual((documents.spam, documents.ham), (4, 4))
@@ -0,0 +1,148 @@
+import time
+from datetime import timedelta
+from unittest import mock
+
+from django.test import override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from core.base_test import BaseTestCase
+from qna.events import event_buffer
+from qna.models import Answer, Event, Question, StatRollup
+from qna.rollups import purge_events, rollup
+
+
+class EventLogTestCase(BaseTestCase):
+    def setUp(self):
+        super().setUp()
+        event_buffer.events.clear()
+        self.addCleanup(event_buffer.events.clear)
+        # Earlier tests may have left the last write old enough to flush
+        event_buffer._last_flush = time.monotonic()
+
+    def test_record(self):
+        """
+        To make sure that the create and like paths log events once their
+        transaction commits, written in a single batch
+        """
+        user = self.create_user()
+        question = Question.objects.create(
+            title=self.faker.sentence(), content="Content", author=user
+        )
+        self.authenticate()
+        with (
+            mock.patch("qna.activity.feed_executor"),
+            self.captureOnCommitCallbacks(execute=True),
+        ):
+            self.make_post_request(
+                reverse("create_answer", args=[question.pk]), {"content": "Answer"}
+            )
+            answer = Answer.objects.get()
+            self.make_post_request(reverse("like_answer", args=[answer.pk]))
+        self.assertEqual(Event.objects.count(), 0)
+
+        with self.assertNumQueries(1):
+            self.assertEqual(event_buffer.flush(force=True), 2)
+        self.assertEqual(
+            list(Event.objects.order_by("pk").values_list("kind", "object_id")),
+            [(Event.ANSWER_CREATED, answer.pk), (Event.ANSWER_LIKED, answer.pk)],
+        )
+
+    @override_settings(EVENTS_BATCH_SIZE=2)
+    def test_flush_on_request_finished(self):
+        """
+        To make sure that requests write the buffered events once a batch
+        is full
+        """
+        event_buffer.add(Event(kind=Event.QUESTION_CREATED, created_at=timezone.now()))
+        self.make_get_request(reverse("home"))
+        self.assertEqual(Event.objects.count(), 0)
+        event_buffer.add(Event(kind=Event.QUESTION_CREATED, created_at=timezone.now()))
+        self.make_get_request(reverse("home"))
+        self.assertEqual(Event.objects.count(), 2)
+
+
+class RollupTestCase(BaseTestCase):
+    def setUp(self):
+        super().setUp()
+        self.hour = timezone.now().replace(minute=0, second=0, microsecond=0)
+
+    def log(self, kind, user_id, created_at):
+        Event.objects.create(kind=kind, user_id=user_id, created_at=created_at)
+
+    def values(self, period):
+        return {
+            (row.start, row.metric): row.value
+            for row in StatRollup.objects.filter(period=period)
+        }
+
+    def test_rollup(self):
+        """
+        To make sure that the rollups count the events and distinct users
+        per period, and that running them again updates the rows
+        """
+        previous_hour = self.hour - timedelta(hours=1)
+        self.log(Event.QUESTION_CREATED, 1, previous_hour)
+        self.log(Event.ANSWER_CREATED, 1, self.hour)
+        self.log(Event.ANSWER_CREATED, 2, self.hour + timedelta(minutes=5))
+
+        rollup(StatRollup.HOUR)
+        values = self.values(StatRollup.HOUR)
+        self.assertEqual(values[previous_hour, "questions"], 1)
+        self.assertEqual(values[self.hour, "answers"], 2)
+        self.assertEqual(values[self.hour, "active_users"], 2)
+
+        self.log(Event.ANSWER_CREATED, 1, self.hour + timedelta(minutes=10))
+        rollup(StatRollup.HOUR)
+        rollup(StatRollup.DAY)
+        values = self.values(StatRollup.HOUR)
+        self.assertEqual(values[self.hour, "answers"], 3)
+        self.assertEqual(values[self.hour, "active_users"], 2)
+        day_answers = sum(
+            value
+            for (_, metric), value in self.values(StatRollup.DAY).items()
+            if metric == "answers"
+        )
+        self.assertEqual(day_answers, 3)
+
+    @override_settings(EVENTS_RETENTION_DAYS=1)
+    def test_purge(self):
+        """
+        To make sure that only old events already rolled up are purged
+        """
+        self.log(Event.QUESTION_CREATED, 1, self.hour - timedelta(days=5))
+        self.assertEqual(purge_events(), 0)
+        self.log(Event.QUESTION_CREATED, 1, self.hour - timedelta(days=3))
+        self.log(Event.QUESTION_CREATED, 1, self.hour)
+        rollup(StatRollup.DAY)
+        # The last but one rolled up day is recomputed by the next rollup
+        self.assertEqual(purge_events(), 1)
+        self.assertEqual(Event.objects.count(), 2)
+
+    def test_views(self):
+        """
+        To make sure that staff members read the statistics from the
+        rollups
+        """
+        self.log(Event.QUESTION_CREATED, 1, self.hour)
+        rollup(StatRollup.DAY)
+        self.authenticate()
+        response = self.make_get_request(reverse("statistics"))
+        self.assertEqual(response.status_code, 302)
+
+        admin = self.create_user()
+        admin.is_staff = True
+        admin.save()
+        self.authenticate(admin)
+        response = self.make_get_request(reverse("statistics"))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.context["rows"][0][1][0], 1)
+
+        response = self.make_get_request(
+            reverse("statistics_api"), {"period": "hour", "count": 24}
+        )
+        self.assertEqual(response.json()["rows"], [])
+        response = self.make_get_request(reverse("statistics_api"), {"period": "week"})
+        self.assertEqual(response.status_code, 400)
+        response = self.make_get_request(reverse("statistics_api"))
+        self.assertEqual(response.json()["rows"][0]["questions"], 1)
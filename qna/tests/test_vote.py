@@ -0,0 +1,140 @@
+from django.urls import reverse
+
+from core.base_test import BaseTestCase
+from qna.models import Answer, Question, Vote
+from qna.votes import cast_vote
+
+
+class VoteTestCase(BaseTestCase):
+    def setUp(self):
+        super().setUp()
+        self.user = self.create_user()
+        self.other_user = self.create_user()
+        self.question = Question.objects.create(
+            title=self.faker.sentence(),
+            content=self.faker.paragraph(),
+            author=self.user,
+        )
+        self.answers = [
+            Answer.objects.create(
+                content=self.faker.paragraph(),
+                author=self.other_user,
+                question=self.question,
+            )
+            for _ in range(3)
+        ]
+        self.authenticate(self.user)
+
+    def vote(self, answer, value):
+        return self.make_post_request(
+            reverse("vote_answer", args=[answer.pk]), {"value": value}
+        )
+
+    def test_vote(self):
+        """
+        To make sure that votes change the score and voting the same way
+        again withdraws the vote
+        """
+        answer = self.answers[0]
+        response = self.vote(answer, "up")
+        self.assertEqual(response.status_code, 302)
+        answer.refresh_from_db()
+        self.assertEqual(answer.score, 1)
+
+        self.vote(answer, "down")
+        answer.refresh_from_db()
+        self.assertEqual(answer.score, -1)
+        self.assertEqual(Vote.objects.get().value, Vote.DOWN)
+
+        self.vote(answer, "down")
+        answer.refresh_from_db()
+        self.assertEqual(answer.score, 0)
+        self.assertFalse(Vote.objects.exists())
+
+    def test_score_sums_votes(self):
+        """
+        To make sure that the score is the sum of the votes of every user
+        """
+        answer = self.answers[0]
+        cast_vote(answer, self.user, Vote.UP)
+        cast_vote(answer, self.create_user(), Vote.UP)
+        cast_vote(answer, self.create_user(), Vote.DOWN)
+        answer.refresh_from_db()
+        self.assertEqual(answer.score, 1)
+
+    def test_invalid_vote(self):
+        """
+        To make sure that votes other than up and down are rejected
+        """
+        response = self.vote(self.answers[0], "sideways")
+        self.assertEqual(response.status_code, 400)
+
+    def test_own_answer(self):
+        """
+        To make sure that users cannot vote on their own answers
+        """
+        self.authenticate(self.other_user)
+        self.vote(self.answers[0], "up")
+        self.assertFalse(Vote.objects.exists())
+
+    def test_accept(self):
+        """
+        To make sure that the question author accepts a single answer
+        """
+        first, second, _ = self.answers
+        self.make_post_request(reverse("accept_answer", args=[first.pk]))
+        self.make_post_request(reverse("accept_answer", args=[second.pk]))
+        self.assertEqual(
+            list(Answer.objects.filter(is_accepted=True).values_list("pk", flat=True)),
+            [second.pk],
+        )
+
+        self.make_post_request(reverse("accept_answer", args=[second.pk]))
+        self.assertFalse(Answer.objects.filter(is_accepted=True).exists())
+
+    def test_accept_after_deleting_accepted(self):
+        """
+        To make sure that another answer can be accepted once the accepted
+        answer is deleted
+        """
+        first, second, _ = self.answers
+        self.make_post_request(reverse("accept_answer", args=[first.pk]))
+        Answer.objects.get(pk=first.pk).delete()
+        response = self.make_post_request(reverse("accept_answer", args=[second.pk]))
+        self.assertEqual(response.status_code, 302)
+        self.assertEqual(
+            list(
+                Answer.objects.with_trashed()
+                .filter(is_accepted=True)
+                .values_list("pk", flat=True)
+            ),
+            [second.pk],
+        )
+
+    def test_accept_by_other_user(self):
+        """
+        To make sure that only the question author can accept answers
+        """
+        self.authenticate(self.other_user)
+        response = self.make_post_request(
+            reverse("accept_answer", args=[self.answers[0].pk])
+        )
+        self.assertEqual(response.status_code, 404)
+        self.assertFalse(Answer.objects.filter(is_accepted=True).exists())
+
+    def test_ordering(self):
+        """
+        To make sure that the accepted answer comes first, then the answers
+        by score
+        """
+        first, second, third = self.answers
+        cast_vote(third, self.user, Vote.UP)
+        cast_vote(first, self.user, Vote.DOWN)
+        self.make_post_request(reverse("accept_answer", args=[second.pk]))
+
+        response = self.make_get_request(
+            reverse("question_detail", kwargs={"pk": self.question.pk})
+        )
+        answers = list(response.context["answers"])
+        self.assertEqual(answers, [second, third, first])
+        self.assertEqual(answers[1].user_vote, Vote.UP)
@@ -1,6 +1,15 @@
 from django.urls import path
 
-from qna.views import answer, question
+from qna.views import (
+    activity,
+    answer,
+    attachment,
+    feed,
+    live,
+    question,
+    sitemap,
+    statistics,
+)
 
 urlpatterns = [
     path(
@@ -13,11 +22,21 @@ urlpatterns = [
         question.QuestionCreateView.as_view(),
         name="create_question",
     ),
+    path(
+        "question/autocomplete",
+        question.QuestionAutocompleteView.as_view(),
+        name="autocomplete_questions",
+    ),
     path(
         "question/<int:pk>",
         question.QuestionDetailView.as_view(),
         name="question_detail",
     ),
+    path(
+        "question/<int:pk>/events",
+        live.QuestionEventsView.as_view(),
+        name="question_events",
+    ),
     path(
         "question/<int:pk>/update",
         question.QuestionUpdateView.as_view(),
@@ -28,6 +47,11 @@ urlpatterns = [
         question.QuestionDeleteView.as_view(),
         name="delete_question",
     ),
+    path(
+        "question/<int:pk>/follow",
+        question.FollowQuestionView.as_view(),
+        name="follow_question",
+    ),
     path(
         "question/<int:pk>/answer",
         answer.AnswerCreateView.as_view(),
@@ -48,4 +72,65 @@ urlpatterns = [
         answer.LikeAnswerView.as_view(),
         name="like_answer",
     ),
+    path(
+        "answer/<int:pk>/vote",
+        answer.VoteAnswerView.as_view(),
+        name="vote_answer",
+    ),
+    path(
+        "answer/<int:pk>/accept",
+        answer.AcceptAnswerView.as_view(),
+        name="accept_answer",
+    ),
+    path(
+        "user/<int:pk>/follow",
+        activity.FollowUserView.as_view(),
+        name="follow_user",
+    ),
+    path(
+        "activity",
+        activity.ActivityFeedView.as_view(),
+        name="activity_feed",
+    ),
+    path(
+        "attachment/<str:sha256>",
+        attachment.AttachmentView.as_view(),
+        name="attachment",
+    ),
+    path(
+        "attachment/<str:sha256>/thumbnail",
+        attachment.AttachmentView.as_view(),
+        {"thumbnail": True},
+        name="attachment_thumbnail",
+    ),
+    path(
+        "sitemap.xml",
+        sitemap.SitemapIndexView.as_view(),
+        name="sitemap_index",
+    ),
+    path(
+        "sitemap-<int:chunk>.xml",
+        sitemap.SitemapChunkView.as_view(),
+        name="sitemap_chunk",
+    ),
+    path(
+        "robots.txt",
+        sitemap.RobotsView.as_view(),
+        name="robots",
+    ),
+    path(
+        "feed.atom",
+        feed.LatestContentFeed(),
+        name="latest_feed",
+    ),
+    path(
+        "statistics",
+        statistics.StatisticsView.as_view(),
+        name="statistics",
+    ),
+    path(
+        "statistics.json",
+        statistics.StatisticsApiView.as_view(),
+        name="statistics_api",
+    ),
 ]
@@ -0,0 +1,63 @@
+from django.conf import settings
+from django.contrib import messages
+from django.contrib.auth.mixins import LoginRequiredMixin
+from django.http import Http404, HttpResponseBadRequest
+from django.shortcuts import redirect
+from django.utils.dateparse import parse_datetime
+from django.utils.http import url_has_allowed_host_and_scheme
+from django.views.generic import TemplateView, View
+
+from accounts.models import User
+from core.objects import get_cached_or_404
+from qna.activity import feed, follow_user, unfollow_user
+
+
+class ActivityFeedView(LoginRequiredMixin, TemplateView):
+    """
+    View showing the new questions of the followed users and the new
+    answers to the followed questions, newest first
+    """
+
+    template_name = "qna/activity_feed.html"
+
+    def get(self, request, *args, **kwargs):
+        self.before = None
+        if "before" in request.GET:
+            self.before = parse_datetime(request.GET["before"])
+            if self.before is None:
+                return HttpResponseBadRequest("The before date is invalid")
+        return super().get(request, *args, **kwargs)
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        items = feed(self.request.user, before=self.before)
+        context["items"] = items
+        # Pages are keyed by date so new entries never shift them
+        if len(items) == settings.FEED_PAGE_SIZE:
+            context["next_before"] = items[-1].created_at.isoformat()
+        return context
+
+
+class FollowUserView(LoginRequiredMixin, View):
+    """
+    View for following and unfollowing users
+    """
+
+    def post(self, request, *args, **kwargs):
+        followee = get_cached_or_404(User, self.kwargs["pk"])
+        if not followee.is_active:
+            raise Http404("No User matches the given query.")
+        if followee == request.user:
+            messages.error(request, "You cannot follow yourself.")
+        elif unfollow_user(request.user, followee):
+            messages.success(request, f"You unfollowed {followee.username}.")
+        else:
+            follow_user(request.user, followee)
+            messages.success(request, f"You are following {followee.username}!")
+
+        next_url = request.POST.get("next", "")
+        if not url_has_allowed_host_and_scheme(
+            next_url, {request.get_host()}, request.is_secure()
+        ):
+            next_url = "activity_feed"
+        return redirect(next_url)
@@ -1,12 +1,21 @@
 from django.contrib import messages
 from django.contrib.auth.mixins import LoginRequiredMixin
 from django.contrib.messages.views import SuccessMessageMixin
-from django.shortcuts import get_object_or_404, redirect
-from django.urls import reverse_lazy
+from django.http import Http404, HttpResponseBadRequest
+from django.shortcuts import redirect
+from django.urls import reverse, reverse_lazy
 from django.views.generic import CreateView, DeleteView, UpdateView, View
 
+from core.objects import CachedObjectMixin, get_cached_or_404
+from qna.activity import fan_out_answers, schedule_fan_out
+from qna.attachments import attach_files
+from qna.events import record
 from qna.forms import AnswerForm
-from qna.models import Answer, Question
+from qna.live import publish_like_count, publish_new_answer, publish_score
+from qna.models import Answer, Event, Question, Vote
+from qna.snapshots import invalidate_snapshots
+from qna.spam import screen
+from qna.votes import cast_vote, toggle_accepted
 
 
 class AnswerCreateView(LoginRequiredMixin, SuccessMessageMixin, CreateView):
@@ -21,26 +30,36 @@ class AnswerCreateView(LoginRequiredMixin, SuccessMessageMixin, CreateView):
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
-        context["question"] = get_object_or_404(Question, pk=self.kwargs["pk"])
+        context["question"] = get_cached_or_404(Question, self.kwargs["pk"])
         return context
 
     def form_valid(self, form):
-        question = get_object_or_404(Question, pk=self.kwargs["pk"])
+        question = get_cached_or_404(Question, self.kwargs["pk"])
 
         # Check if the user is trying to answer their own question
-        if self.request.user == question.author:
+        if question.author_id == self.request.user.pk:
             form.add_error(None, "You cannot answer your own question.")
             return self.form_invalid(form)
 
         form.instance.author = self.request.user
         form.instance.question = question
-        return super().form_valid(form)
+        if screen(form.instance):
+            self.success_message = "Your answer is held for review by a moderator."
+        response = super().form_valid(form)
+        attach_files(form.cleaned_data["images"], self.request.user, answer=self.object)
+        if self.object.quarantined_at is None:
+            publish_new_answer(self.object)
+            schedule_fan_out(fan_out_answers, [self.object.pk])
+        record(Event.ANSWER_CREATED, self.request.user, [self.object.pk])
+        return response
 
     def get_success_url(self):
         return reverse_lazy("question_detail", kwargs={"pk": self.kwargs["pk"]})
 
 
-class AnswerUpdateView(LoginRequiredMixin, SuccessMessageMixin, UpdateView):
+class AnswerUpdateView(
+    LoginRequiredMixin, SuccessMessageMixin, CachedObjectMixin, UpdateView
+):
     """
     View for updating answers
     """
@@ -50,14 +69,22 @@ class AnswerUpdateView(LoginRequiredMixin, SuccessMessageMixin, UpdateView):
     template_name = "qna/update_answer.html"
     success_message = "Your answer has been updated!"
 
-    def get_queryset(self):
-        return Answer.objects.filter(author=self.request.user)
+    owner_field = "author"
+
+    def form_valid(self, form):
+        if screen(form.instance):
+            self.success_message = "Your answer is held for review by a moderator."
+        response = super().form_valid(form)
+        attach_files(form.cleaned_data["images"], self.request.user, answer=self.object)
+        return response
 
     def get_success_url(self):
-        return reverse_lazy("question_detail", kwargs={"pk": self.object.question.pk})
+        return reverse_lazy("question_detail", kwargs={"pk": self.object.question_id})
 
 
-class AnswerDeleteView(LoginRequiredMixin, SuccessMessageMixin, DeleteView):
+class AnswerDeleteView(
+    LoginRequiredMixin, SuccessMessageMixin, CachedObjectMixin, DeleteView
+):
     """
     View for deleting answers
     """
@@ -66,11 +93,14 @@ class AnswerDeleteView(LoginRequiredMixin, SuccessMessageMixin, DeleteView):
     template_name = "qna/delete_answer.html"
     success_message = "Your answer has been deleted!"
 
-    def get_queryset(self):
-        return Answer.objects.filter(author=self.request.user)
+    owner_field = "author"
+
+    def form_valid(self, form):
+        record(Event.ANSWER_DELETED, self.request.user, [self.object.pk])
+        return super().form_valid(form)
 
     def get_success_url(self):
-        return reverse_lazy("question_detail", kwargs={"pk": self.object.question.pk})
+        return reverse_lazy("question_detail", kwargs={"pk": self.object.question_id})
 
 
 class LikeAnswerView(LoginRequiredMixin, View):
@@ -79,14 +109,69 @@ class LikeAnswerView(LoginRequiredMixin, View):
     """
 
     def post(self, request, *args, **kwargs):
-        answer = get_object_or_404(Answer, pk=self.kwargs["pk"])
-        question_pk = answer.question.pk
+        answer = get_cached_or_404(Answer, self.kwargs["pk"])
+        question_pk = answer.question_id
 
         if request.user in answer.likes.all():
             answer.likes.remove(request.user)
+            record(Event.ANSWER_UNLIKED, request.user, [answer.pk])
             messages.success(request, "You unliked this answer!")
         else:
             answer.likes.add(request.user)
+            record(Event.ANSWER_LIKED, request.user, [answer.pk])
             messages.success(request, "You liked this answer!")
+        publish_like_count(answer)
+        invalidate_snapshots([question_pk])
 
         return redirect(reverse_lazy("question_detail", kwargs={"pk": question_pk}))
+
+
+class VoteAnswerView(LoginRequiredMixin, View):
+    """
+    View for voting answers up or down, voting the same way again
+    withdraws the vote
+    """
+
+    values = {"up": Vote.UP, "down": Vote.DOWN}
+
+    def post(self, request, *args, **kwargs):
+        answer = get_cached_or_404(Answer, self.kwargs["pk"])
+        value = self.values.get(request.POST.get("value"))
+        if value is None:
+            return HttpResponseBadRequest("The vote must be up or down")
+
+        if answer.author_id == request.user.pk:
+            messages.error(request, "You cannot vote on your own answer.")
+        else:
+            current = (
+                Vote.objects.filter(answer=answer, user=request.user)
+                .values_list("value", flat=True)
+                .first()
+            )
+            score = cast_vote(answer, request.user, 0 if current == value else value)
+            publish_score(answer, score)
+
+        return redirect(
+            reverse("question_detail", kwargs={"pk": answer.question_id})
+            + f"#answer-{answer.pk}"
+        )
+
+
+class AcceptAnswerView(LoginRequiredMixin, View):
+    """
+    View for the author of a question to accept one of its answers
+    """
+
+    def post(self, request, *args, **kwargs):
+        answer = get_cached_or_404(Answer, self.kwargs["pk"])
+        question = get_cached_or_404(Question, answer.question_id)
+        if question.author_id != request.user.pk:
+            raise Http404("No Answer matches the given query.")
+        if toggle_accepted(answer):
+            messages.success(request, "You accepted this answer!")
+        else:
+            messages.success(request, "You withdrew the acceptance of this answer!")
+        return redirect(
+            reverse("question_detail", kwargs={"pk": answer.question_id})
+            + f"#answer-{answer.pk}"
+        )
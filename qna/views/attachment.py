@@ -0,0 +1,62 @@
+from django.conf import settings
+from django.db.models import Exists, OuterRef, Q
+from django.http import Http404
+from django.shortcuts import get_object_or_404
+from django.utils.cache import patch_cache_control
+from django.utils.decorators import method_decorator
+from django.views import View
+from django.views.decorators.http import condition
+
+from core.http import file_response
+from qna.models import Attachment, StoredFile
+
+
+def attachment_etag(request, sha256, thumbnail=False):
+    """
+    Returns the ETag of an attachment, its content never changes so it is
+    derived from the digest alone without reading the database
+    """
+    return f"{sha256}-thumbnail" if thumbnail else sha256
+
+
+@method_decorator(condition(etag_func=attachment_etag), name="get")
+class AttachmentView(View):
+    """
+    View for serving attached images and their thumbnails by SHA-256
+    digest, supporting range requests. Files are only served while they
+    are attached to a question or an answer that is not deleted.
+    """
+
+    def get(self, request, sha256, thumbnail=False):
+        attached = Attachment.objects.filter(stored_file=OuterRef("pk")).filter(
+            Q(question__isnull=False, question__deleted_at__isnull=True)
+            | Q(answer__isnull=False, answer__deleted_at__isnull=True)
+        )
+        stored_file = get_object_or_404(
+            StoredFile.objects.filter(Exists(attached)), sha256=sha256
+        )
+
+        if thumbnail:
+            file = stored_file.thumbnail
+            content_type = "image/png" if file.name.endswith(".png") else "image/jpeg"
+        else:
+            file = stored_file.file
+            content_type = stored_file.content_type
+        if not file:
+            raise Http404("The thumbnail has not been generated yet")
+        try:
+            file.open("rb")
+        except FileNotFoundError:
+            raise Http404("The file is missing from the storage")
+
+        response = file_response(
+            request,
+            file,
+            file.size,
+            content_type,
+            attachment_etag(request, sha256, thumbnail),
+        )
+        patch_cache_control(
+            response, public=True, max_age=settings.ATTACHMENT_CACHE_TIMEOUT
+        )
+        return response
@@ -0,0 +1,97 @@
+from django.conf import settings
+from django.contrib.syndication.views import Feed
+from django.db.models import Max
+from django.http import HttpResponse
+from django.urls import reverse, reverse_lazy
+from django.utils.decorators import method_decorator
+from django.utils.feedgenerator import Atom1Feed
+from django.views.decorators.http import condition
+
+from core.cache import tiered_cache
+from core.markdown import make_excerpt
+from qna.models import Answer, Question
+
+
+def feed_last_modified(request, *args, **kwargs):
+    """
+    Returns the last modification date of the content in the feed, read
+    from the `updated_at` indexes. It is kept on the request as both the
+    conditional GET check and the view need it.
+    """
+    if not hasattr(request, "feed_last_modified"):
+        dates = [
+            model.objects.with_trashed().aggregate(last=Max("updated_at"))["last"]
+            for model in (Question, Answer)
+        ]
+        request.feed_last_modified = max(filter(None, dates), default=None)
+    return request.feed_last_modified
+
+
+@method_decorator(condition(last_modified_func=feed_last_modified), name="__call__")
+class LatestContentFeed(Feed):
+    """
+    Atom feed of the most recent questions and answers, cached until any
+    of them changes
+    """
+
+    feed_type = Atom1Feed
+    title = "QnA Site"
+    subtitle = "Latest questions and answers"
+    link = reverse_lazy("home")
+
+    def __call__(self, request, *args, **kwargs):
+        last_modified = feed_last_modified(request)
+        content = tiered_cache.get_or_set(
+            f"feed:{request.get_host()}:"
+            f"{last_modified.timestamp() if last_modified else 0}",
+            lambda: self.render(request, *args, **kwargs),
+            settings.FEED_CACHE_TIMEOUT,
+        )
+        return HttpResponse(content, content_type=self.feed_type.content_type)
+
+    def render(self, request, *args, **kwargs):
+        return super().__call__(request, *args, **kwargs).content
+
+    def items(self):
+        limit = settings.FEED_ITEM_COUNT
+        questions = (
+            Question.objects.filter(quarantined_at__isnull=True)
+            .select_related("author")
+            .order_by("-created_at")[:limit]
+        )
+        answers = (
+            Answer.objects.filter(
+                quarantined_at__isnull=True, question__quarantined_at__isnull=True
+            )
+            .select_related("author", "question")
+            .order_by("-created_at")[:limit]
+        )
+        items = sorted(
+            [*questions, *answers], key=lambda item: item.created_at, reverse=True
+        )
+        return items[:limit]
+
+    def item_title(self, item):
+        if isinstance(item, Answer):
+            return f"Answer to: {item.question.title}"
+        return item.title
+
+    def item_description(self, item):
+        if isinstance(item, Answer):
+            return make_excerpt(item.content_html)
+        return item.excerpt
+
+    def item_link(self, item):
+        if isinstance(item, Answer):
+            url = reverse("question_detail", kwargs={"pk": item.question_id})
+            return f"{url}#answer-{item.pk}"
+        return reverse("question_detail", kwargs={"pk": item.pk})
+
+    def item_author_name(self, item):
+        return item.author.username
+
+    def item_pubdate(self, item):
+        return item.created_at
+
+    def item_updateddate(self, item):
+        return item.updated_at
@@ -0,0 +1,73 @@
+import asyncio
+import json
+
+from django.conf import settings
+from django.http import Http404, HttpResponse, StreamingHttpResponse
+from django.views.generic import View
+
+from core.pubsub import SubscriberLimitReached, broker
+from qna.live import question_topic
+from qna.models import Question
+
+
+class EventStream:
+    """
+    Server-sent events of a topic. The subscription ends with the stream
+    or when the response is closed: the handlers only close the outermost
+    generator of a streaming response when the client goes away, the
+    others are left to the garbage collector.
+    """
+
+    def __init__(self, topic):
+        self.topic = topic
+        self.subscription = None
+
+    def __aiter__(self):
+        return self.events()
+
+    async def events(self):
+        try:
+            self.subscription = broker.add_subscriber(self.topic)
+        except SubscriberLimitReached:
+            return
+        try:
+            yield f"retry: {settings.LIVE_UPDATES_RETRY_SECONDS * 1000}\n\n"
+            while True:
+                try:
+                    event = await asyncio.wait_for(
+                        self.subscription.get(),
+                        settings.LIVE_UPDATES_HEARTBEAT_SECONDS,
+                    )
+                except asyncio.TimeoutError:
+                    # Keeps proxies from closing idle connections
+                    yield ": heartbeat\n\n"
+                    continue
+                yield f"event: {event['type']}\ndata: {json.dumps(event)}\n\n"
+        finally:
+            self.close()
+
+    def close(self):
+        if self.subscription is not None:
+            broker.remove_subscriber(self.topic, self.subscription)
+
+
+class QuestionEventsView(View):
+    """
+    View streaming the live updates of a question as server-sent events
+    """
+
+    async def get(self, request, *args, **kwargs):
+        if not await Question.objects.filter(pk=self.kwargs["pk"]).aexists():
+            raise Http404("No question found matching the query")
+        if broker.subscriber_count >= settings.LIVE_UPDATES_MAX_SUBSCRIBERS:
+            response = HttpResponse(status=503)
+            response["Retry-After"] = settings.LIVE_UPDATES_RETRY_SECONDS
+            return response
+
+        response = StreamingHttpResponse(
+            EventStream(question_topic(self.kwargs["pk"])),
+            content_type="text/event-stream",
+        )
+        response["Cache-Control"] = "no-cache"
+        response["X-Accel-Buffering"] = "no"
+        return response
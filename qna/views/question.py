@@ -1,19 +1,47 @@
+from django.contrib import messages
 from django.contrib.auth.mixins import LoginRequiredMixin
 from django.contrib.messages.views import SuccessMessageMixin
-from django.urls import reverse_lazy
+from django.db.models import Count, Exists, OuterRef, Q, Subquery
+from django.http import JsonResponse
+from django.shortcuts import redirect
+from django.urls import reverse, reverse_lazy
 from django.views.generic import (
     CreateView,
     DeleteView,
     DetailView,
     ListView,
     UpdateView,
+    View,
 )
 
+from core.objects import CachedObjectMixin, get_cached_or_404
+from core.stale import StaleFallbackMixin
+from qna.activity import (
+    fan_out_questions,
+    follow_question,
+    schedule_fan_out,
+    unfollow_question,
+)
+from qna.attachments import attach_files
+from qna.autocomplete import autocomplete
+from qna.events import record
 from qna.forms import AnswerForm, QuestionForm
-from qna.models import Question
+from qna.models import Answer, Event, Question, QuestionFollow, UserFollow, Vote
+from qna.similarity import related_questions
+from qna.spam import screen
+
+
+def visible_to(queryset, user):
+    """
+    Filters out the questions or answers held for review, except those of
+    the user
+    """
+    if user.is_authenticated:
+        return queryset.filter(Q(quarantined_at__isnull=True) | Q(author=user))
+    return queryset.filter(quarantined_at__isnull=True)
 
 
-class QuestionListView(ListView):
+class QuestionListView(StaleFallbackMixin, ListView):
     """
     View for listing questions
     """
@@ -24,6 +52,21 @@ class QuestionListView(ListView):
     ordering = ["-created_at"]
     paginate_by = 10
 
+    def get_queryset(self):
+        # The list shows the precomputed excerpt, not the full content
+        return (
+            super()
+            .get_queryset()
+            .filter(quarantined_at__isnull=True)
+            .defer("content", "content_html")
+            .select_related("author")
+            .annotate(
+                answer_count=Count(
+                    "answers", filter=Q(answers__deleted_at__isnull=True)
+                )
+            )
+        )
+
 
 class QuestionCreateView(LoginRequiredMixin, SuccessMessageMixin, CreateView):
     """
@@ -38,13 +81,24 @@ class QuestionCreateView(LoginRequiredMixin, SuccessMessageMixin, CreateView):
 
     def form_valid(self, form):
         form.instance.author = self.request.user
-        return super().form_valid(form)
+        if screen(form.instance):
+            self.success_message = "Your question is held for review by a moderator."
+        response = super().form_valid(form)
+        attach_files(
+            form.cleaned_data["images"], self.request.user, question=self.object
+        )
+        record(Event.QUESTION_CREATED, self.request.user, [self.object.pk])
+        # Authors follow the answers to their questions
+        follow_question(self.request.user, self.object)
+        if self.object.quarantined_at is None:
+            schedule_fan_out(fan_out_questions, [self.object.pk])
+        return response
 
     def get_success_url(self):
         return reverse_lazy("question_detail", kwargs={"pk": self.object.pk})
 
 
-class QuestionDetailView(DetailView):
+class QuestionDetailView(StaleFallbackMixin, DetailView):
     """
     View for displaying a single question
     """
@@ -53,15 +107,51 @@ class QuestionDetailView(DetailView):
     template_name = "qna/question_detail.html"
     context_object_name = "question"
 
+    def get_queryset(self):
+        return visible_to(
+            super().get_queryset().select_related("author"), self.request.user
+        )
+
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
-        context["answers"] = self.object.answers.all()
+        context["attachments"] = self.object.attachments.select_related("stored_file")
+        answers = visible_to(
+            self.object.answers.select_related("author")
+            .prefetch_related("attachments__stored_file")
+            .annotate(like_count=Count("likes", distinct=True)),
+            self.request.user,
+        )
+        if self.request.user.is_authenticated:
+            answers = answers.annotate(
+                user_vote=Subquery(
+                    Vote.objects.filter(
+                        answer=OuterRef("pk"), user=self.request.user
+                    ).values("value")
+                ),
+                user_liked=Exists(
+                    Answer.likes.through.objects.filter(
+                        answer=OuterRef("pk"), user=self.request.user
+                    )
+                ),
+            )
+        # Ordered by the ranking index, accepted answer first then by score.
+        # Explicitly, the ordering of the model is dropped when grouping.
+        context["answers"] = answers.order_by("-is_accepted", "-score", "created_at")
+        context["related_questions"] = related_questions(self.object.pk)
         if self.request.user.is_authenticated:
             context["form"] = AnswerForm()
+            context["follows_question"] = QuestionFollow.objects.filter(
+                user=self.request.user, question=self.object
+            ).exists()
+            context["follows_author"] = UserFollow.objects.filter(
+                follower=self.request.user, followee=self.object.author_id
+            ).exists()
         return context
 
 
-class QuestionUpdateView(LoginRequiredMixin, SuccessMessageMixin, UpdateView):
+class QuestionUpdateView(
+    LoginRequiredMixin, SuccessMessageMixin, CachedObjectMixin, UpdateView
+):
     """
     View for updating questions
     """
@@ -71,14 +161,24 @@ class QuestionUpdateView(LoginRequiredMixin, SuccessMessageMixin, UpdateView):
     template_name = "qna/update_question.html"
     success_message = "Your question has been updated!"
 
-    def get_queryset(self):
-        return Question.objects.filter(author=self.request.user)
+    owner_field = "author"
+
+    def form_valid(self, form):
+        if screen(form.instance):
+            self.success_message = "Your question is held for review by a moderator."
+        response = super().form_valid(form)
+        attach_files(
+            form.cleaned_data["images"], self.request.user, question=self.object
+        )
+        return response
 
     def get_success_url(self):
         return reverse_lazy("question_detail", kwargs={"pk": self.object.pk})
 
 
-class QuestionDeleteView(LoginRequiredMixin, SuccessMessageMixin, DeleteView):
+class QuestionDeleteView(
+    LoginRequiredMixin, SuccessMessageMixin, CachedObjectMixin, DeleteView
+):
     """
     View for deleting questions
     """
@@ -88,5 +188,49 @@ class QuestionDeleteView(LoginRequiredMixin, SuccessMessageMixin, DeleteView):
     success_url = reverse_lazy("home")
     success_message = "Your question has been deleted!"
 
-    def get_queryset(self):
-        return Question.objects.filter(author=self.request.user)
+    owner_field = "author"
+
+    def form_valid(self, form):
+        record(Event.QUESTION_DELETED, self.request.user, [self.object.pk])
+        return super().form_valid(form)
+
+
+class FollowQuestionView(LoginRequiredMixin, View):
+    """
+    View for following and unfollowing questions
+    """
+
+    def post(self, request, *args, **kwargs):
+        question = get_cached_or_404(Question, self.kwargs["pk"])
+        if QuestionFollow.objects.filter(user=request.user, question=question).exists():
+            unfollow_question(request.user, question)
+            messages.success(request, "You unfollowed this question.")
+        else:
+            follow_question(request.user, question)
+            messages.success(request, "You are following this question!")
+
+        return redirect(reverse_lazy("question_detail", kwargs={"pk": question.pk}))
+
+
+class QuestionAutocompleteView(View):
+    """
+    View for autocompleting question titles
+    """
+
+    max_results = 10
+
+    def get(self, request, *args, **kwargs):
+        query = request.GET.get("q", "")
+        results = autocomplete(query, self.max_results) if query.strip() else []
+        return JsonResponse(
+            {
+                "results": [
+                    {
+                        "id": pk,
+                        "title": title,
+                        "url": reverse("question_detail", kwargs={"pk": pk}),
+                    }
+                    for pk, title in results
+                ]
+            }
+        )
@@ -0,0 +1,155 @@
+from django.conf import settings
+from django.db.models import F, Max
+from django.http import Http404, HttpResponse
+from django.urls import reverse
+from django.utils.decorators import method_decorator
+from django.utils.html import escape
+from django.views.decorators.http import condition
+from django.views.generic import View
+
+from core.cache import tiered_cache
+from qna.models import Question
+
+SITEMAP_NAMESPACE = "http://www.sitemaps.org/schemas/sitemap/0.9"
+
+
+def chunk_bounds(chunk):
+    """
+    Returns the primary key range `[start, end)` covered by a sitemap chunk
+    """
+    start = chunk * settings.SITEMAP_CHUNK_SIZE
+    return start, start + settings.SITEMAP_CHUNK_SIZE
+
+
+def questions_in_chunk(chunk):
+    """
+    Returns the questions of a chunk, deleted ones included, so a deletion
+    also moves the last modification date of its chunk
+    """
+    start, end = chunk_bounds(chunk)
+    return Question.objects.with_trashed().filter(pk__gte=start, pk__lt=end)
+
+
+def sitemap_last_modified(request, *args, **kwargs):
+    """
+    Returns the last modification date of any question. It is kept on the
+    request as both the conditional GET check and the view need it.
+    """
+    if not hasattr(request, "sitemap_last_modified"):
+        request.sitemap_last_modified = Question.objects.with_trashed().aggregate(
+            last=Max("updated_at")
+        )["last"]
+    return request.sitemap_last_modified
+
+
+def chunk_last_modified(request, chunk, *args, **kwargs):
+    """
+    Returns the last modification date of the questions of a chunk
+    """
+    if not hasattr(request, "sitemap_last_modified"):
+        request.sitemap_last_modified = questions_in_chunk(chunk).aggregate(
+            last=Max("updated_at")
+        )["last"]
+    return request.sitemap_last_modified
+
+
+def cache_key(request, name, last_modified):
+    return (
+        f"sitemap:{request.get_host()}:{name}:"
+        f"{last_modified.timestamp() if last_modified else 0}"
+    )
+
+
+def format_date(value):
+    return value.date().isoformat()
+
+
+@method_decorator(condition(last_modified_func=sitemap_last_modified), name="get")
+class SitemapIndexView(View):
+    """
+    View listing the sitemap chunks along with their last modification date
+    """
+
+    def render(self, request):
+        chunks = (
+            Question.objects.with_trashed()
+            .annotate(chunk=F("pk") / settings.SITEMAP_CHUNK_SIZE)
+            .values("chunk")
+            .annotate(last_modified=Max("updated_at"))
+            .order_by("chunk")
+        )
+        lines = [
+            '<?xml version="1.0" encoding="UTF-8"?>',
+            f'<sitemapindex xmlns="{SITEMAP_NAMESPACE}">',
+        ]
+        for row in chunks.iterator():
+            location = request.build_absolute_uri(
+                reverse("sitemap_chunk", kwargs={"chunk": row["chunk"]})
+            )
+            lines.append(
+                f"<sitemap><loc>{escape(location)}</loc>"
+                f"<lastmod>{format_date(row['last_modified'])}</lastmod></sitemap>"
+            )
+        lines.append("</sitemapindex>")
+        return "\n".join(lines)
+
+    def get(self, request, *args, **kwargs):
+        content = tiered_cache.get_or_set(
+            cache_key(request, "index", sitemap_last_modified(request)),
+            lambda: self.render(request),
+            settings.SITEMAP_CACHE_TIMEOUT,
+        )
+        return HttpResponse(content, content_type="application/xml")
+
+
+@method_decorator(condition(last_modified_func=chunk_last_modified), name="get")
+class SitemapChunkView(View):
+    """
+    View listing the live questions of a primary key range
+    """
+
+    def render(self, request, chunk):
+        questions = (
+            questions_in_chunk(chunk)
+            .filter(deleted_at__isnull=True, quarantined_at__isnull=True)
+            .order_by("pk")
+            .values_list("pk", "updated_at")
+        )
+        lines = [
+            '<?xml version="1.0" encoding="UTF-8"?>',
+            f'<urlset xmlns="{SITEMAP_NAMESPACE}">',
+        ]
+        for pk, updated_at in questions.iterator(chunk_size=2000):
+            location = request.build_absolute_uri(
+                reverse("question_detail", kwargs={"pk": pk})
+            )
+            lines.append(
+                f"<url><loc>{escape(location)}</loc>"
+                f"<lastmod>{format_date(updated_at)}</lastmod></url>"
+            )
+        lines.append("</urlset>")
+        return "\n".join(lines)
+
+    def get(self, request, chunk, *args, **kwargs):
+        last_modified = chunk_last_modified(request, chunk)
+        if last_modified is None:
+            raise Http404("Sitemap chunk does not exist")
+        content = tiered_cache.get_or_set(
+            cache_key(request, chunk, last_modified),
+            lambda: self.render(request, chunk),
+            settings.SITEMAP_CACHE_TIMEOUT,
+        )
+        return HttpResponse(content, content_type="application/xml")
+
+
+class RobotsView(View):
+    """
+    View pointing crawlers to the sitemap index
+    """
+
+    def get(self, request, *args, **kwargs):
+        sitemap_url = request.build_absolute_uri(reverse("sitemap_index"))
+        return HttpResponse(
+            f"User-agent: *\nAllow: /\nSitemap: {sitemap_url}\n",
+            content_type="text/plain",
+        )
@@ -0,0 +1,76 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.contrib.admin.views.decorators import staff_member_required
+from django.http import HttpResponseBadRequest, JsonResponse
+from django.utils import timezone
+from django.utils.decorators import method_decorator
+from django.views.generic import TemplateView, View
+
+from qna.models import StatRollup
+from qna.rollups import METRICS, statistics
+
+MAX_DAYS = 366
+
+
+def period_start(period, count):
+    """
+    Returns the start of the oldest of the last `count` periods
+    """
+    now = timezone.localtime()
+    if period == StatRollup.HOUR:
+        return now.replace(minute=0, second=0, microsecond=0) - timedelta(
+            hours=count - 1
+        )
+    return now.replace(hour=0, minute=0, second=0, microsecond=0) - timedelta(
+        days=count - 1
+    )
+
+
+@method_decorator(staff_member_required, name="dispatch")
+class StatisticsView(TemplateView):
+    """
+    View showing the daily statistics of the site, read from the rollups
+    only
+    """
+
+    template_name = "qna/statistics.html"
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        since = period_start(StatRollup.DAY, settings.STATISTICS_DAYS)
+        context["metrics"] = METRICS
+        context["rows"] = [
+            (start, [values[metric] for metric in METRICS])
+            for start, values in reversed(statistics(StatRollup.DAY, since))
+        ]
+        return context
+
+
+@method_decorator(staff_member_required, name="dispatch")
+class StatisticsApiView(View):
+    """
+    View returning the hourly or daily statistics of the site as JSON
+    """
+
+    def get(self, request, *args, **kwargs):
+        period = request.GET.get("period", StatRollup.DAY)
+        if period not in (StatRollup.HOUR, StatRollup.DAY):
+            return HttpResponseBadRequest("The period must be hour or day")
+        try:
+            count = int(request.GET.get("count", settings.STATISTICS_DAYS))
+        except ValueError:
+            return HttpResponseBadRequest("The count must be a number")
+        limit = MAX_DAYS * 24 if period == StatRollup.HOUR else MAX_DAYS
+        count = max(1, min(count, limit))
+
+        rows = statistics(period, period_start(period, count))
+        return JsonResponse(
+            {
+                "period": period,
+                "metrics": METRICS,
+                "rows": [
+                    {"start": start.isoformat(), **values} for start, values in rows
+                ],
+            }
+        )
@@ -0,0 +1,67 @@
+"""
+Votes on answers and the accepted answer of a question.
+
+The score of an answer is denormalized in `Answer.score` and changed by
+the difference a vote makes with a single `UPDATE ... SET score = score
++ delta`, so concurrent votes never lose updates and ordering answers by
+score never aggregates the votes.
+"""
+
+from django.db import IntegrityError, transaction
+from django.db.models import F
+
+from qna.models import Answer, Question, Vote
+from qna.snapshots import invalidate_snapshots
+
+
+def cast_vote(answer, user, value, retry=True):
+    """
+    Sets the vote of the user on the answer to `value`, `Vote.UP`,
+    `Vote.DOWN` or 0 to withdraw it, and returns the new score
+    """
+    try:
+        with transaction.atomic():
+            vote = (
+                Vote.objects.select_for_update()
+                .filter(answer=answer, user=user)
+                .first()
+            )
+            previous = vote.value if vote else 0
+            if value == previous:
+                return Answer.objects.with_trashed().get(pk=answer.pk).score
+
+            if vote is None:
+                Vote.objects.create(answer=answer, user=user, value=value)
+            elif value:
+                Vote.objects.filter(pk=vote.pk).update(value=value)
+            else:
+                vote.delete()
+            Answer.objects.with_trashed().filter(pk=answer.pk).update(
+                score=F("score") + value - previous
+            )
+            invalidate_snapshots([answer.question_id])
+            return Answer.objects.with_trashed().get(pk=answer.pk).score
+    except IntegrityError:
+        # A concurrent request of the same user created the vote first
+        if not retry:
+            raise
+        return cast_vote(answer, user, value, retry=False)
+
+
+def toggle_accepted(answer):
+    """
+    Accepts the answer, replacing the previously accepted answer of the
+    question, or withdraws the acceptance when it was already accepted
+    """
+    with transaction.atomic():
+        # Serializes the changes of the accepted answer of the question
+        list(Question.objects.select_for_update().filter(pk=answer.question_id))
+        accepted = not Answer.objects.filter(pk=answer.pk, is_accepted=True).exists()
+        # Soft deleted answers included, the constraint covers them too
+        Answer.objects.with_trashed().filter(
+            question_id=answer.question_id, is_accepted=True
+        ).update(is_accepted=False)
+        if accepted:
+            Answer.objects.filter(pk=answer.pk).update(is_accepted=True)
+        invalidate_snapshots([answer.question_id])
+    return accepted
@@ -56,11 +56,18 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    "core.middleware.TrafficCaptureMiddleware",
+    "core.middleware.MetricsMiddleware",
+    "core.middleware.SlowQueryMiddleware",
+    "qna.middleware.SnapshotMiddleware",
+    "core.middleware.LoadSheddingMiddleware",
+    "core.middleware.ObjectMemoMiddleware",
     "django.middleware.security.SecurityMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
     "django.middleware.csrf.CsrfViewMiddleware",
     "django.contrib.auth.middleware.AuthenticationMiddleware",
+    "core.middleware.ProfilingMiddleware",
     "django.contrib.messages.middleware.MessageMiddleware",
     "django.middleware.clickjacking.XFrameOptionsMiddleware",
 ]
@@ -86,6 +93,9 @@ TEMPLATES = [
 
 WSGI_APPLICATION = "qnasite.wsgi.application"
 
+# Warm up the application when the server imports it, see qnasite/warmup.py
+STARTUP_WARMUP = env.bool("STARTUP_WARMUP", default=not DEBUG)
+
 
 # Database
 # https://docs.djangoproject.com/en/5.2/ref/settings/#databases
@@ -94,7 +104,7 @@ if env("ENV_NAME", default="local") == "local":
     DATABASES = {
         "default": {
             "ENGINE": "django.db.backends.sqlite3",
-            "NAME": BASE_DIR / "db.sqlite3",
+            "NAME": env("SQLITE_PATH", default=str(BASE_DIR / "db.sqlite3")),
         }
     }
 else:
@@ -102,6 +112,60 @@ else:
         "default": env.db(),
     }
 
+# SQLite mode for several workers, see core/sqlite. Every connection runs
+# the pragmas: write-ahead logging so readers never block the writer,
+# fsync at checkpoints only, memory mapped reads and a larger page cache.
+# Transactions take the write lock when they begin, and writers wait up
+# to SQLITE_BUSY_TIMEOUT seconds for it.
+SQLITE_TUNED = env.bool("SQLITE_TUNED", default=True)
+SQLITE_BUSY_TIMEOUT = env.float("SQLITE_BUSY_TIMEOUT", default=20.0)
+SQLITE_PRAGMAS = {
+    "journal_mode": "WAL",
+    "synchronous": "NORMAL",
+    "mmap_size": env.int("SQLITE_MMAP_SIZE", default=256 * 1024 * 1024),
+    # Negative sizes are in KiB
+    "cache_size": -env.int("SQLITE_CACHE_KIB", default=64 * 1024),
+    "temp_store": "MEMORY",
+}
+if SQLITE_TUNED and DATABASES["default"]["ENGINE"] == "django.db.backends.sqlite3":
+    DATABASES["default"]["ENGINE"] = "core.sqlite"
+    DATABASES["default"]["OPTIONS"] = {
+        "init_command": ";".join(
+            f"PRAGMA {name}={value}" for name, value in SQLITE_PRAGMAS.items()
+        ),
+        "transaction_mode": "IMMEDIATE",
+        # Sets SQLite's busy_timeout
+        "timeout": SQLITE_BUSY_TIMEOUT,
+    }
+
+
+# Cache
+# https://docs.djangoproject.com/en/5.2/topics/cache/
+# Shared by all the workers, core.cache adds a per-process tier in front
+
+# The stale renderings served while the database is unavailable must not
+# be stored in it, see core/stale.py
+if env("ENV_NAME", default="local") == "local":
+    CACHES = {
+        "default": env.cache("CACHE_URL", default="locmemcache://"),
+        "stale": env.cache("STALE_CACHE_URL", default="locmemcache://stale"),
+    }
+else:
+    CACHES = {
+        "default": env.cache("CACHE_URL", default="dbcache://qnasite_cache"),
+        "stale": env.cache("STALE_CACHE_URL", default="filecache:///tmp/qnasite-stale"),
+    }
+
+TIERED_CACHE_LOCAL_MAX_ENTRIES = env.int("TIERED_CACHE_LOCAL_MAX_ENTRIES", default=1000)
+TIERED_CACHE_LOCAL_TIMEOUT = env.int("TIERED_CACHE_LOCAL_TIMEOUT", default=5)
+
+# Instances looked up by primary key, see core/objects.py
+OBJECT_CACHE_TIMEOUT = env.int("OBJECT_CACHE_TIMEOUT", default=300)
+
+STALE_TIMEOUT = env.int("STALE_TIMEOUT", default=60 * 60 * 24 * 7)
+STALE_MAX_PAGES = env.int("STALE_MAX_PAGES", default=10000)
+STALE_PROBE_INTERVAL = env.int("STALE_PROBE_INTERVAL", default=5)
+
 
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
@@ -144,6 +208,15 @@ STATIC_ROOT = BASE_DIR / "staticfiles"
 MEDIA_URL = "/media/"
 MEDIA_ROOT = BASE_DIR / "media"
 
+# Uploads are streamed to temporary files and hashed, see core/uploads.py
+FILE_UPLOAD_HANDLERS = ["core.uploads.HashingFileUploadHandler"]
+
+# Image attachments of questions and answers
+ATTACHMENT_MAX_SIZE = env.int("ATTACHMENT_MAX_SIZE", default=5 * 1024 * 1024)
+ATTACHMENT_MAX_COUNT = env.int("ATTACHMENT_MAX_COUNT", default=5)
+ATTACHMENT_THUMBNAIL_SIZE = env.int("ATTACHMENT_THUMBNAIL_SIZE", default=320)
+ATTACHMENT_CACHE_TIMEOUT = env.int("ATTACHMENT_CACHE_TIMEOUT", default=24 * 60 * 60)
+
 # Default primary key field type
 # https://docs.djangoproject.com/en/5.2/ref/settings/#default-auto-field
 
@@ -154,3 +227,117 @@ LOGIN_URL = "login"
 LOGOUT_REDIRECT_URL = "home"
 
 AUTH_USER_MODEL = "accounts.User"
+
+# Soft-deleted questions and answers are purged after this many days
+SOFT_DELETE_RETENTION_DAYS = env.int("SOFT_DELETE_RETENTION_DAYS", default=30)
+
+# Admin changelists count rows exactly up to this limit and use the query
+# planner estimate above it, bulk actions update this many rows at a time
+ADMIN_EXACT_COUNT_LIMIT = env.int("ADMIN_EXACT_COUNT_LIMIT", default=10000)
+ADMIN_ACTION_BATCH_SIZE = env.int("ADMIN_ACTION_BATCH_SIZE", default=1000)
+
+# Spam filter screening new posts, see qna/spam.py. Posts scoring above
+# the threshold are held for review, the check gives up and publishes the
+# post after the timeout.
+SPAM_FILTER_ENABLED = env.bool("SPAM_FILTER_ENABLED", default=True)
+SPAM_THRESHOLD = env.float("SPAM_THRESHOLD", default=0.95)
+SPAM_TIMEOUT = env.float("SPAM_TIMEOUT", default=0.05)
+SPAM_WORKERS = env.int("SPAM_WORKERS", default=2)
+SPAM_MIN_DOCUMENTS = env.int("SPAM_MIN_DOCUMENTS", default=20)
+SPAM_REFRESH_INTERVAL = env.int("SPAM_REFRESH_INTERVAL", default=60)
+
+# Event log of the site statistics, see qna/events.py. Workers write the
+# events in batches, `rollup_events` aggregates them into hourly and daily
+# rows and purges the events older than the retention.
+EVENTS_BATCH_SIZE = env.int("EVENTS_BATCH_SIZE", default=500)
+EVENTS_FLUSH_INTERVAL = env.float("EVENTS_FLUSH_INTERVAL", default=5.0)
+EVENTS_RETENTION_DAYS = env.int("EVENTS_RETENTION_DAYS", default=90)
+STATISTICS_DAYS = env.int("STATISTICS_DAYS", default=30)
+
+# Activity feeds, see qna/activity.py
+# Authors with more followers have their questions pulled when the feeds
+# are read instead of copied to the inbox of every follower
+FEED_FANOUT_LIMIT = env.int("FEED_FANOUT_LIMIT", default=1000)
+FEED_FANOUT_BATCH_SIZE = env.int("FEED_FANOUT_BATCH_SIZE", default=1000)
+FEED_INBOX_SIZE = env.int("FEED_INBOX_SIZE", default=500)
+# Each write trims the inbox with a probability of 1 / FEED_TRIM_EVERY
+FEED_TRIM_EVERY = env.int("FEED_TRIM_EVERY", default=20)
+FEED_PAGE_SIZE = env.int("FEED_PAGE_SIZE", default=20)
+
+# Question title autocomplete
+AUTOCOMPLETE_MAX_TITLES = env.int("AUTOCOMPLETE_MAX_TITLES", default=100000)
+AUTOCOMPLETE_REFRESH_SECONDS = env.int("AUTOCOMPLETE_REFRESH_SECONDS", default=30)
+AUTOCOMPLETE_RELOAD_SECONDS = env.int("AUTOCOMPLETE_RELOAD_SECONDS", default=3600)
+
+# Static snapshots of the most viewed questions, see qna/snapshots.py.
+# Rendered by `python manage.py render_snapshots`, run every few minutes.
+SNAPSHOT_DIR = env("SNAPSHOT_DIR", default="/tmp/qnasite-snapshots")
+SNAPSHOT_COUNT = env.int("SNAPSHOT_COUNT", default=100)
+SNAPSHOT_VIEWS_DAYS = env.int("SNAPSHOT_VIEWS_DAYS", default=7)
+SNAPSHOT_MAX_AGE = env.int("SNAPSHOT_MAX_AGE", default=10 * 60)
+
+# Live updates of questions over server-sent events
+# Use core.pubsub.UnixSocketTransport when running several workers
+LIVE_UPDATES_TRANSPORT = env(
+    "LIVE_UPDATES_TRANSPORT", default="core.pubsub.LocalTransport"
+)
+LIVE_UPDATES_SOCKET_DIR = env("LIVE_UPDATES_SOCKET_DIR", default="/tmp/qnasite-live")
+LIVE_UPDATES_MAX_SUBSCRIBERS = env.int("LIVE_UPDATES_MAX_SUBSCRIBERS", default=5000)
+LIVE_UPDATES_QUEUE_SIZE = 100
+LIVE_UPDATES_HEARTBEAT_SECONDS = 15
+LIVE_UPDATES_RETRY_SECONDS = 5
+
+# Metrics and readiness checks
+METRICS_DIR = env("METRICS_DIR", default="/tmp/qnasite-metrics")
+METRICS_WRITE_INTERVAL = env.float("METRICS_WRITE_INTERVAL", default=1.0)
+READINESS_TIMEOUT = env.float("READINESS_TIMEOUT", default=2.0)
+
+# Slow query log, see core/slow_queries.py. Reported with
+# `python manage.py report_slow_queries`.
+SLOW_QUERY_ENABLED = env.bool("SLOW_QUERY_ENABLED", default=True)
+SLOW_QUERY_THRESHOLD = env.float("SLOW_QUERY_THRESHOLD", default=0.1)
+SLOW_QUERY_LOG = env("SLOW_QUERY_LOG", default="/tmp/qnasite-slow-queries.jsonl")
+SLOW_QUERY_LOG_MAX_BYTES = env.int("SLOW_QUERY_LOG_MAX_BYTES", default=50 * 1024 * 1024)
+SLOW_QUERY_EXPLAIN_INTERVAL = env.int("SLOW_QUERY_EXPLAIN_INTERVAL", default=60 * 60)
+
+# Traffic capture, see core/traffic.py. Replayed with
+# `python manage.py replay_traffic`, replays compared with
+# `python manage.py compare_replays`.
+TRAFFIC_CAPTURE_RATE = env.float("TRAFFIC_CAPTURE_RATE", default=0.0)
+TRAFFIC_CAPTURE_LOG = env("TRAFFIC_CAPTURE_LOG", default="/tmp/qnasite-traffic.jsonl")
+TRAFFIC_CAPTURE_MAX_BYTES = env.int(
+    "TRAFFIC_CAPTURE_MAX_BYTES", default=100 * 1024 * 1024
+)
+
+# Sampling profiler, see core/profiling.py. Staff members profile a request
+# with the X-Profile header or the profile query parameter, a share of all
+# requests is profiled with PROFILER_SAMPLE_RATE.
+PROFILER_ENABLED = env.bool("PROFILER_ENABLED", default=True)
+PROFILER_SAMPLE_RATE = env.float("PROFILER_SAMPLE_RATE", default=0.0)
+PROFILER_INTERVAL = env.float("PROFILER_INTERVAL", default=0.005)
+PROFILER_DIR = env("PROFILER_DIR", default="/tmp/qnasite-profiles")
+PROFILER_MAX_FILES = env.int("PROFILER_MAX_FILES", default=500)
+
+# Load shedding, see core/middleware.py. Above the soft limits of
+# in-flight requests or queueing time a worker refuses low priority
+# requests, above the hard limit every request but the exempt ones.
+LOAD_SHEDDING_ENABLED = env.bool("LOAD_SHEDDING_ENABLED", default=True)
+LOAD_SHEDDING_SOFT_IN_FLIGHT = env.int("LOAD_SHEDDING_SOFT_IN_FLIGHT", default=32)
+LOAD_SHEDDING_HARD_IN_FLIGHT = env.int("LOAD_SHEDDING_HARD_IN_FLIGHT", default=64)
+LOAD_SHEDDING_SOFT_QUEUE_SECONDS = env.float(
+    "LOAD_SHEDDING_SOFT_QUEUE_SECONDS", default=1.0
+)
+LOAD_SHEDDING_HARD_QUEUE_SECONDS = env.float(
+    "LOAD_SHEDDING_HARD_QUEUE_SECONDS", default=5.0
+)
+LOAD_SHEDDING_MAX_ANONYMOUS_PAGE = env.int(
+    "LOAD_SHEDDING_MAX_ANONYMOUS_PAGE", default=5
+)
+LOAD_SHEDDING_RETRY_AFTER = env.int("LOAD_SHEDDING_RETRY_AFTER", default=10)
+LOAD_SHEDDING_EXEMPT_URLS = ["health_check", "readiness_check", "metrics"]
+
+# Sitemaps and feeds
+SITEMAP_CHUNK_SIZE = env.int("SITEMAP_CHUNK_SIZE", default=10000)
+SITEMAP_CACHE_TIMEOUT = env.int("SITEMAP_CACHE_TIMEOUT", default=60 * 60 * 24)
+FEED_ITEM_COUNT = env.int("FEED_ITEM_COUNT", default=50)
+FEED_CACHE_TIMEOUT = env.int("FEED_CACHE_TIMEOUT", default=60 * 60)
@@ -20,12 +20,15 @@ from django.conf.urls.static import static
 from django.contrib import admin
 from django.urls import include, path
 
-from qnasite.views import HealthCheckView
+from qnasite.views import HealthCheckView, MetricsView, ReadinessCheckView
 
 urlpatterns = [
+    path("admin/", admin.site.urls),
     path("", include("qna.urls")),
     path("accounts/", include("accounts.urls")),
     path("health", HealthCheckView.as_view(), name="health_check"),
+    path("ready", ReadinessCheckView.as_view(), name="readiness_check"),
+    path("metrics", MetricsView.as_view(), name="metrics"),
 ]
 
 if settings.DEBUG:
@@ -1,7 +1,77 @@
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeoutError
 
-from django.http import JsonResponse
+from django.conf import settings
+from django.core.cache import caches
+from django.db import connections
+from django.http import HttpResponse, JsonResponse
 from django.views import View
 
+from core.metrics import registry
+
+# Checks run in their own threads so a hanging database cannot hold the
+# request past the timeout
+check_executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix="readiness")
+
+
 class HealthCheckView(View):
     def get(self, request):
         return JsonResponse({"status": "ok"})
+
+
+def check_database():
+    connection = connections["default"]
+    try:
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT 1")
+            cursor.fetchone()
+    finally:
+        connection.close()
+
+
+def check_cache():
+    cache = caches["default"]
+    value = uuid.uuid4().hex
+    cache.set("readiness-check", value, 10)
+    if cache.get("readiness-check") != value:
+        raise RuntimeError("Cache did not return the value just stored")
+
+
+class ReadinessCheckView(View):
+    """
+    View reporting whether the database and the cache answer within
+    `READINESS_TIMEOUT` seconds, along with their round-trip latency
+    """
+
+    checks = {"database": check_database, "cache": check_cache}
+
+    def run_check(self, check):
+        started_at = time.perf_counter()
+        future = check_executor.submit(check)
+        try:
+            future.result(timeout=settings.READINESS_TIMEOUT)
+        except FutureTimeoutError:
+            return {"status": "timeout"}
+        except Exception as error:
+            return {"status": "error", "error": str(error)}
+        latency = (time.perf_counter() - started_at) * 1000
+        return {"status": "ok", "latency_ms": round(latency, 2)}
+
+    def get(self, request):
+        results = {name: self.run_check(check) for name, check in self.checks.items()}
+        ready = all(result["status"] == "ok" for result in results.values())
+        return JsonResponse(
+            {"status": "ok" if ready else "unavailable", "checks": results},
+            status=200 if ready else 503,
+        )
+
+
+class MetricsView(View):
+    """
+    View exposing the metrics of every worker in the Prometheus text format
+    """
+
+    def get(self, request):
+        return HttpResponse(registry.expose(), content_type="text/plain; version=0.0.4")
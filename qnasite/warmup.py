@@ -0,0 +1,92 @@
+"""
+Startup warmup of the application.
+
+With `gunicorn --preload` the application is imported once in the master
+process and the workers are forked from it. Doing the lazy work of the
+first requests there (building the URL resolvers, compiling templates,
+computing model metadata) means no worker pays for it, and freezing the
+garbage collector afterwards keeps those objects out of the collections,
+so the memory pages holding them stay shared between the workers instead
+of being copied on write. The entry points disable the collector before
+loading the application, so no collection leaves holes in those pages
+for the workers to fill.
+"""
+
+import gc
+from pathlib import Path
+
+from django.apps import apps
+from django.db import connections
+from django.template import TemplateDoesNotExist, TemplateSyntaxError
+from django.template.loader import get_template
+from django.urls import URLPattern, URLResolver, get_resolver
+
+
+def warm_url_resolvers():
+    """
+    Populates the reverse lookups and compiles the regular expression of
+    every URL pattern
+    """
+
+    def compile_patterns(resolver):
+        resolver.pattern.regex
+        resolver.reverse_dict
+        for pattern in resolver.url_patterns:
+            if isinstance(pattern, URLResolver):
+                compile_patterns(pattern)
+            elif isinstance(pattern, URLPattern):
+                pattern.pattern.regex
+
+    compile_patterns(get_resolver())
+
+
+def template_names():
+    """
+    Returns the names of the templates of the installed applications
+    """
+    for app_config in apps.get_app_configs():
+        directory = Path(app_config.path) / "templates"
+        for path in directory.rglob("*.html"):
+            yield path.relative_to(directory).as_posix()
+
+
+def warm_templates():
+    """
+    Compiles every template so the cached template loader keeps them
+    """
+    for name in template_names():
+        try:
+            get_template(name)
+        except (TemplateDoesNotExist, TemplateSyntaxError):
+            pass
+
+
+def warm_models():
+    """
+    Computes the field and relation metadata of every model
+    """
+    for model in apps.get_models():
+        options = model._meta
+        options.get_fields()
+        options.related_objects
+        options.concrete_fields
+        options.local_concrete_fields
+        options._property_names
+
+
+def freeze_objects():
+    """
+    Moves every object alive at this point to the permanent generation of
+    the garbage collector, and enables it again for the workers
+    """
+    gc.freeze()
+    gc.enable()
+
+
+def warmup():
+    warm_url_resolvers()
+    warm_templates()
+    warm_models()
+    # Forked workers must not share a database connection with the master
+    connections.close_all()
+    freeze_objects()
@@ -7,10 +7,27 @@ For more information on this file, see
 https://docs.djangoproject.com/en/5.2/howto/deployment/wsgi/
 """
 
+import gc
 import os
 
+from django.conf import settings
 from django.core.wsgi import get_wsgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'qnasite.settings')
 
+if settings.STARTUP_WARMUP:
+    # Until the warmup freezes the objects of the startup, see
+    # qnasite/warmup.py
+    gc.disable()
+
 application = get_wsgi_application()
+
+# Metrics of the workers of the previous runs, see core/metrics.py
+from core.metrics import registry  # noqa: E402
+
+registry.prune()
+
+if settings.STARTUP_WARMUP:
+    from qnasite.warmup import warmup
+
+    warmup()